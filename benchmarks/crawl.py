@@ -0,0 +1,286 @@
+"""Crawl throughput benchmark.
+
+Starts a ``SyntheticSite`` and crawls it once per engine, each run in a
+fresh subprocess so peak RSS and CPU time are measured in isolation. Run
+from the repository root::
+
+    python -m benchmarks.crawl --pages 1000 --fanout 8 --latency 5
+    python -m benchmarks.crawl --engines concurrent --workers 32 --json out.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.site import SiteSpec, SyntheticSite
+from src.threading_utils import is_gil_disabled
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from src.linkfetcher import Linkfetcher
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Webcrawler keyword arguments of each benchmarked engine
+ENGINES: dict[str, dict[str, Any]] = {
+    "sequential": {},
+    "concurrent": {"concurrent": True},
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Measurements of one benchmark run.
+
+    Attributes:
+        engine: Name of the crawl engine.
+        pages: Number of pages fetched.
+        seconds: Wall-clock duration of the crawl.
+        pages_per_second: Crawl throughput.
+        p50_ms: Median page fetch latency in milliseconds.
+        p99_ms: 99th percentile page fetch latency in milliseconds.
+        peak_rss_mb: Peak resident set size of the process, if available.
+        cpu_seconds: User and system CPU time of the crawl, if available.
+        python: Python version the benchmark ran on.
+        gil_disabled: Whether the GIL was disabled.
+    """
+
+    engine: str
+    pages: int
+    seconds: float
+    pages_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float | None
+    cpu_seconds: float | None
+    python: str
+    gil_disabled: bool
+
+
+class _TimedWebcrawler(Webcrawler):
+    """Webcrawler recording the latency of every page fetch."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.latencies: list[float] = []
+
+    def _fetch_url(self, url: str, *, thread_safe: bool = True) -> Linkfetcher:
+        start = time.perf_counter()
+        page = super()._fetch_url(url, thread_safe=thread_safe)
+        # list.append is atomic, also on free-threaded builds
+        self.latencies.append(time.perf_counter() - start)
+        return page
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Return a percentile of values by the nearest-rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _cpu_seconds() -> float | None:
+    """Return the user and system CPU time of this process."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb() -> float | None:
+    """Return the peak resident set size of this process in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_engine(
+    engine: str, url: str, *, depth: int = 0, workers: int | None = None
+) -> BenchmarkResult:
+    """Crawl a site with one engine in this process and measure it.
+
+    Args:
+        engine: Name of the engine in ``ENGINES``.
+        url: Root URL of the site.
+        depth: Maximum crawl depth, 0 for unlimited.
+        workers: Worker threads of concurrent engines.
+
+    Returns:
+        The measurements of the run.
+    """
+    crawler = _TimedWebcrawler(url, depth, max_workers=workers, **ENGINES[engine])
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    crawler.crawl()
+    seconds = time.perf_counter() - start
+    cpu_end = _cpu_seconds()
+    pages = len(crawler.latencies)
+    return BenchmarkResult(
+        engine=engine,
+        pages=pages,
+        seconds=seconds,
+        pages_per_second=pages / seconds if seconds else 0.0,
+        p50_ms=percentile(crawler.latencies, 0.50) * 1000,
+        p99_ms=percentile(crawler.latencies, 0.99) * 1000,
+        peak_rss_mb=_peak_rss_mb(),
+        cpu_seconds=None if cpu_start is None or cpu_end is None else cpu_end - cpu_start,
+        python=sys.version.split()[0],
+        gil_disabled=is_gil_disabled(),
+    )
+
+
+def run_isolated(
+    engine: str, url: str, *, depth: int = 0, workers: int | None = None
+) -> BenchmarkResult:
+    """Run ``run_engine`` in a fresh Python subprocess."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = Path(tmp) / "result.json"
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.crawl",
+            "--run",
+            engine,
+            "--url",
+            url,
+            "--depth",
+            str(depth),
+            "--result-file",
+            str(result_path),
+        ]
+        if workers is not None:
+            command += ["--workers", str(workers)]
+        # Crawler progress and error output would clutter the report
+        subprocess.run(
+            command,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=Path(__file__).resolve().parent.parent,
+            env={**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent.parent)},
+        )
+        return BenchmarkResult(**json.loads(result_path.read_text(encoding="utf-8")))
+
+
+def render(results: Sequence[BenchmarkResult], spec: SiteSpec) -> Table:
+    """Render benchmark results as a table."""
+    gil = "disabled" if is_gil_disabled() else "enabled"
+    table = Table(
+        title=f"Crawl benchmark: {spec.pages} pages, fanout {spec.fanout}, "
+        f"Python {sys.version.split()[0]} (GIL {gil})"
+    )
+    for column in ("engine", "pages", "seconds", "pages/s", "p50 ms", "p99 ms", "peak RSS MiB", "CPU s"):
+        table.add_column(column, justify="left" if column == "engine" else "right")
+    for result in results:
+        table.add_row(
+            result.engine,
+            str(result.pages),
+            f"{result.seconds:.2f}",
+            f"{result.pages_per_second:.1f}",
+            f"{result.p50_ms:.1f}",
+            f"{result.p99_ms:.1f}",
+            "-" if result.peak_rss_mb is None else f"{result.peak_rss_mb:.1f}",
+            "-" if result.cpu_seconds is None else f"{result.cpu_seconds:.2f}",
+        )
+    return table
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark crawl engines offline")
+    parser.add_argument("--pages", type=int, default=500, help="Pages on the site")
+    parser.add_argument("--fanout", type=int, default=10, help="Links per page")
+    parser.add_argument(
+        "--page-size", type=int, default=4096, help="Page body size in bytes"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=5.0, help="Mean response latency in ms"
+    )
+    parser.add_argument(
+        "--distribution",
+        choices=["fixed", "uniform", "exponential"],
+        default="exponential",
+        help="Response latency distribution",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of pages failing with 500"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the site")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=list(ENGINES),
+        default=list(ENGINES),
+        help="Engines to benchmark",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads")
+    parser.add_argument(
+        "--depth", type=int, default=0, help="Maximum crawl depth, 0 for unlimited"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per engine; the fastest is kept"
+    )
+    parser.add_argument("--json", type=str, default=None, help="Write results as JSON")
+    # Internal: run a single engine against an existing site
+    parser.add_argument("--run", choices=list(ENGINES), help=argparse.SUPPRESS)
+    parser.add_argument("--url", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", type=str, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> list[BenchmarkResult]:
+    """Run the benchmark."""
+    args = parse_args(argv)
+    if args.run:
+        result = run_engine(args.run, args.url, depth=args.depth, workers=args.workers)
+        Path(args.result_file).write_text(json.dumps(asdict(result)), encoding="utf-8")
+        return [result]
+
+    spec = SiteSpec(
+        pages=args.pages,
+        fanout=args.fanout,
+        page_size=args.page_size,
+        latency=args.latency / 1000,
+        distribution=args.distribution,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    results: list[BenchmarkResult] = []
+    with SyntheticSite(spec) as site:
+        for engine in args.engines:
+            runs = [
+                run_isolated(engine, site.url, depth=args.depth, workers=args.workers)
+                for _ in range(args.repeat)
+            ]
+            results.append(min(runs, key=lambda run: run.seconds))
+    Console().print(render(results, spec))
+    if args.json:
+        payload = {"site": asdict(spec), "results": [asdict(r) for r in results]}
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Micro-benchmarks of the threading primitives.
+
+Measures the throughput of ``ThreadSafeCounter``, ``ThreadSafeSet``,
+``ThreadSafeList`` and ``parallel_map`` across thread counts. Results are
+written as JSON so runs on different releases and builds (GIL enabled or
+free-threaded) can be compared::
+
+    python -m benchmarks.primitives --json before.json
+    python -m benchmarks.primitives --json after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rich.console import Console
+from rich.table import Table
+
+from src.threading_utils import (
+    ThreadSafeCounter,
+    ThreadSafeList,
+    ThreadSafeSet,
+    WorkerPool,
+    is_gil_disabled,
+    parallel_map,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+# Builds the per-thread function of a workload from (threads, ops_per_thread)
+type Workload = Callable[[int, int], Callable[[int], None]]
+
+DEFAULT_THREADS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+@dataclass(frozen=True)
+class PrimitiveResult:
+    """Throughput of one benchmark at one thread count.
+
+    Attributes:
+        benchmark: Name of the benchmark.
+        threads: Number of threads.
+        ops: Total number of operations.
+        seconds: Wall-clock duration of the fastest run.
+        ops_per_second: Operations per second.
+    """
+
+    benchmark: str
+    threads: int
+    ops: int
+    seconds: float
+    ops_per_second: float
+
+
+def _counter_increment(threads: int, ops: int) -> Callable[[int], None]:
+    counter = ThreadSafeCounter()
+
+    def work(_: int) -> None:
+        increment = counter.increment
+        for _ in range(ops):
+            increment()
+
+    return work
+
+
+def _set_add_disjoint(threads: int, ops: int) -> Callable[[int], None]:
+    shared: ThreadSafeSet[int] = ThreadSafeSet()
+
+    def work(index: int) -> None:
+        add = shared.add
+        for item in range(index * ops, (index + 1) * ops):
+            add(item)
+
+    return work
+
+
+def _set_add_contended(threads: int, ops: int) -> Callable[[int], None]:
+    shared: ThreadSafeSet[int] = ThreadSafeSet()
+
+    def work(_: int) -> None:
+        # Every thread adds the same keys, as when workers race on a URL
+        add = shared.add
+        for item in range(ops):
+            add(item)
+
+    return work
+
+
+def _set_contains(threads: int, ops: int) -> Callable[[int], None]:
+    shared: ThreadSafeSet[int] = ThreadSafeSet()
+    for item in range(1024):
+        shared.add(item)
+
+    def work(_: int) -> None:
+        contains = shared.contains
+        for item in range(ops):
+            contains(item & 2047)
+
+    return work
+
+
+def _list_append(threads: int, ops: int) -> Callable[[int], None]:
+    shared: ThreadSafeList[int] = ThreadSafeList()
+
+    def work(_: int) -> None:
+        append = shared.append
+        for item in range(ops):
+            append(item)
+
+    return work
+
+
+def _parallel_map(threads: int, ops: int) -> Callable[[int], None]:
+    items = list(range(threads * ops))
+
+    def work(index: int) -> None:
+        # parallel_map manages its own threads, so only thread 0 drives it
+        if index == 0:
+            parallel_map(abs, items, max_workers=threads)
+
+    return work
+
+
+def _pool_imap_chunked(threads: int, ops: int) -> Callable[[int], None]:
+    items = list(range(threads * ops))
+    pool = WorkerPool(threads)
+
+    def work(index: int) -> None:
+        # Like parallel_map, the pool is driven by thread 0 only
+        if index == 0:
+            for _ in pool.imap(abs, items, chunksize=256):
+                pass
+            pool.shutdown()
+
+    return work
+
+
+WORKLOADS: dict[str, Workload] = {
+    "counter.increment": _counter_increment,
+    "set.add (disjoint)": _set_add_disjoint,
+    "set.add (contended)": _set_add_contended,
+    "set.contains": _set_contains,
+    "list.append": _list_append,
+    "parallel_map": _parallel_map,
+    "pool.imap (chunked)": _pool_imap_chunked,
+}
+
+
+def measure(workload: Workload, threads: int, ops: int, repeat: int = 3) -> float:
+    """Return the fastest wall-clock time of running a workload on threads.
+
+    All threads are released together from a barrier; the time runs from
+    the release until the last thread finishes.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        work = workload(threads, ops)
+        # Pool workloads start their own workers, so they are driven by one thread
+        count = 1 if workload in (_parallel_map, _pool_imap_chunked) else threads
+        barrier = threading.Barrier(count + 1)
+
+        def run(
+            index: int,
+            work: Callable[[int], None] = work,
+            barrier: threading.Barrier = barrier,
+        ) -> None:
+            barrier.wait()
+            work(index)
+
+        workers = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(
+    benchmarks: Sequence[str] = tuple(WORKLOADS),
+    thread_counts: Sequence[int] = DEFAULT_THREADS,
+    ops: int = 20_000,
+    repeat: int = 3,
+) -> list[PrimitiveResult]:
+    """Run the benchmarks at every thread count.
+
+    Args:
+        benchmarks: Names of the workloads to run.
+        thread_counts: Thread counts to measure.
+        ops: Operations per thread.
+        repeat: Runs per measurement; the fastest is kept.
+
+    Returns:
+        One result per benchmark and thread count.
+    """
+    results: list[PrimitiveResult] = []
+    for name in benchmarks:
+        for threads in thread_counts:
+            seconds = measure(WORKLOADS[name], threads, ops, repeat)
+            total = threads * ops
+            results.append(
+                PrimitiveResult(name, threads, total, seconds, total / seconds)
+            )
+    return results
+
+
+def environment() -> dict[str, Any]:
+    """Describe the interpreter the benchmarks ran on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": sys.implementation.name,
+        "gil_disabled": is_gil_disabled(),
+        "cpu_count": os.cpu_count(),
+        "platform": sys.platform,
+    }
+
+
+def render(
+    results: Sequence[PrimitiveResult],
+    baseline: Sequence[PrimitiveResult] = (),
+) -> Table:
+    """Render results as a table of ops/s by benchmark and thread count.
+
+    If a baseline is given, each cell also shows the ratio to it.
+    """
+    before = {(r.benchmark, r.threads): r.ops_per_second for r in baseline}
+    thread_counts = sorted({r.threads for r in results})
+    gil = "disabled" if is_gil_disabled() else "enabled"
+    table = Table(title=f"Primitive throughput, ops/s (Python {sys.version.split()[0]}, GIL {gil})")
+    table.add_column("benchmark")
+    for threads in thread_counts:
+        table.add_column(f"{threads} thr", justify="right")
+    for name in dict.fromkeys(r.benchmark for r in results):
+        cells: list[str] = []
+        by_threads = {r.threads: r for r in results if r.benchmark == name}
+        for threads in thread_counts:
+            result = by_threads.get(threads)
+            if result is None:
+                cells.append("-")
+                continue
+            cell = f"{result.ops_per_second:,.0f}"
+            old = before.get((name, threads))
+            if old:
+                cell += f" ({result.ops_per_second / old:.2f}x)"
+            cells.append(cell)
+        table.add_row(name, *cells)
+    return table
+
+
+def load(path: str | Path) -> list[PrimitiveResult]:
+    """Load results written with ``--json``."""
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [PrimitiveResult(**result) for result in payload["results"]]
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the threading primitives")
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(WORKLOADS),
+        default=list(WORKLOADS),
+        help="Benchmarks to run",
+    )
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_THREADS),
+        help="Thread counts to measure (default: 1 to 128)",
+    )
+    parser.add_argument(
+        "--ops", type=int, default=20_000, help="Operations per thread"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per measurement; the fastest is kept"
+    )
+    parser.add_argument("--json", type=str, default=None, help="Write results as JSON")
+    parser.add_argument(
+        "--compare", type=str, default=None, help="JSON results to compare against"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> list[PrimitiveResult]:
+    """Run the benchmarks."""
+    args = parse_args(argv)
+    results = run(args.benchmarks, args.threads, args.ops, args.repeat)
+    baseline = load(args.compare) if args.compare else []
+    Console().print(render(results, baseline))
+    if args.json:
+        payload = {"environment": environment(), "results": [asdict(r) for r in results]}
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return results
+
+
+if __name__ == "__main__":
+    main()
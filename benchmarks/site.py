@@ -0,0 +1,190 @@
+"""Synthetic website server for offline benchmarks.
+
+``SyntheticSite`` serves a deterministic site of ``pages`` HTML pages on
+localhost. Page 0 is the root and page ``n`` is served at ``/p/<n>``. Each
+page links to ``fanout`` other pages, is padded to ``page_size`` bytes, is
+delayed by a latency drawn from a configurable distribution, and a fixed
+fraction of pages fails with a 500.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Literal, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+LatencyDistribution = Literal["fixed", "uniform", "exponential"]
+
+
+def page_path(page: int) -> str:
+    """Return the path of a page; page 0 is the site root."""
+    return "/" if page == 0 else f"/p/{page}"
+
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """Shape of a synthetic site.
+
+    Attributes:
+        pages: Number of pages on the site.
+        fanout: Number of links on each page.
+        page_size: Minimum size of each page body in bytes.
+        latency: Mean response latency in seconds.
+        distribution: Distribution of the response latency.
+        error_rate: Fraction of pages answering with HTTP 500.
+        seed: Seed of the link structure, latencies and errors.
+    """
+
+    pages: int = 500
+    fanout: int = 10
+    page_size: int = 4096
+    latency: float = 0.005
+    distribution: LatencyDistribution = "exponential"
+    error_rate: float = 0.0
+    seed: int = 0
+
+    def links(self, page: int) -> list[int]:
+        """Return the pages linked from a page.
+
+        Page ``n`` always links to page ``n + 1`` so every page is reachable
+        from page 0; the other links are pseudo-random.
+        """
+        rng = random.Random(self.seed * 1_000_003 + page)
+        targets = [(page + 1) % self.pages]
+        targets += [rng.randrange(self.pages) for _ in range(self.fanout - 1)]
+        return targets
+
+    def fails(self, page: int) -> bool:
+        """Check whether a page answers with an error."""
+        return random.Random(self.seed * 7_919 + page).random() < self.error_rate
+
+    def delay(self, rng: random.Random) -> float:
+        """Draw a response latency."""
+        if self.latency <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            return rng.uniform(0, 2 * self.latency)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.latency)
+        return self.latency
+
+    def render(self, page: int) -> bytes:
+        """Render the HTML body of a page."""
+        anchors = "".join(
+            f'<a href="{page_path(target)}">{target}</a>\n' for target in self.links(page)
+        )
+        body = f"<html><head><title>Page {page}</title></head><body>\n{anchors}"
+        padding = max(0, self.page_size - len(body) - len("<p></p></body></html>"))
+        return f"{body}<p>{'x' * padding}</p></body></html>".encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve pages of the owning server's ``SiteSpec``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Serve a synthetic page."""
+        site: SyntheticSite = self.server.site  # type: ignore[attr-defined]
+        spec = site.spec
+        time.sleep(spec.delay(site.rng()))
+        page = self._page_number()
+        site.count_request()
+        if page is None or page >= spec.pages:
+            self._reply(404, b"not found")
+        elif spec.fails(page):
+            self._reply(500, b"synthetic error")
+        else:
+            self._reply(200, spec.render(page))
+
+    def _page_number(self) -> int | None:
+        """Parse the page number of the request path."""
+        if self.path == "/":
+            return 0
+        prefix, _, number = self.path.rpartition("/")
+        if prefix != "/p" or not number.isdigit():
+            return None
+        return int(number)
+
+    def _reply(self, status: int, payload: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence request logging."""
+
+
+class SyntheticSite:
+    """Serve a ``SiteSpec`` on a local port in a background thread."""
+
+    def __init__(self, spec: SiteSpec, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize the server without starting it.
+
+        Args:
+            spec: Shape of the site.
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free port.
+        """
+        self.spec = spec
+        self.requests = 0
+        self._address = (host, port)
+        self._server: ThreadingHTTPServer | None = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Get the root URL of the running site."""
+        if self._server is None:
+            raise RuntimeError("site is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def rng(self) -> random.Random:
+        """Return the latency random generator of the calling thread."""
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = random.Random(self.spec.seed ^ threading.get_ident())
+        return rng
+
+    def count_request(self) -> None:
+        """Count a served request."""
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> Self:
+        """Start serving in a daemon thread."""
+        self._server = ThreadingHTTPServer(self._address, _Handler)
+        self._server.daemon_threads = True
+        self._server.site = self  # type: ignore[attr-defined]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> Self:
+        """Start the site on entering the runtime context."""
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Stop the site on exit."""
+        self.stop()
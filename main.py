@@ -4,16 +4,35 @@ from __future__ import annotations
 
 import argparse
 import time
+from contextlib import nullcontext
 from functools import wraps
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from src import LOGGER, __version__, is_gil_disabled
-from src.linkfetcher import USER_AGENTS, BrowserType, Linkfetcher
-from src.webcrawler import Webcrawler
+from src import LOGGER, __version__
+from src.useragents import USER_AGENTS
 
+# The crawler stack (bs4, rich, urllib, the engines) is imported inside the
+# functions that need it, so --help and --version start fast
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from src.batch import BatchStats
+    from src.cache import ResponseCache
+    from src.dns import DNSCache
+    from src.extract import ExtractionSpec
+    from src.linkcheck import LinkChecker
+    from src.linkgraph import LinkGraphWriter
+    from src.metrics import CrawlMetrics
+    from src.profiling import StageProfiler
+    from src.recrawl import RevisitScheduler
+    from src.resources import ResourceFilter
+    from src.sinks import ResultSink
+    from src.timeouts import TimeoutPolicy, Timeouts
+    from src.useragents import BrowserType
+    from src.warc import WarcWriter
+    from src.webcrawler import Webcrawler
+
 
 def timethis[**P, R](func: Callable[P, R]) -> Callable[P, R]:
     """Decorator to measure execution time of a function."""
@@ -48,13 +67,20 @@ Examples:
     %(prog)s --links http://example.com
         Only fetch links from the target URL
 
+    %(prog)s --batch urls.txt -o links.jsonl
+        Fetch the links of every URL in urls.txt concurrently as JSON lines
+
     %(prog)s --browser firefox http://example.com
         Crawl using Firefox User-Agent
+
+    %(prog)s -f jsonl -o links.jsonl.gz http://example.com
+        Stream discovered links as compressed JSON lines
         """,
     )
 
     parser.add_argument(
         "url",
+        nargs="?",
         help="Target URL to start crawling",
     )
 
@@ -66,6 +92,23 @@ Examples:
         help="Only fetch links for target URL (don't crawl)",
     )
 
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Fetch the links of every URL in FILE (one per line, - for stdin) "
+        "concurrently and write them as JSON lines",
+    )
+
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        default=False,
+        help="Check every discovered link with HEAD (or a ranged GET) and "
+        "report broken links with the pages referring to them",
+    )
+
     parser.add_argument(
         "-d",
         "--depth",
@@ -99,6 +142,223 @@ Examples:
         help="Number of worker threads for concurrent mode (auto-detected if not set)",
     )
 
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="File to stream discovered links to, compressed by .gz/.bz2/.xz "
+        "extension (default: stdout)",
+    )
+
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        choices=["lines", "jsonl", "csv"],
+        default="lines",
+        help="Output format for discovered links (default: lines)",
+    )
+
+    parser.add_argument(
+        "-s",
+        "--sitemaps",
+        action="store_true",
+        default=False,
+        help="Seed the crawl from the site's sitemaps (robots.txt or /sitemap.xml)",
+    )
+
+    parser.add_argument(
+        "-g",
+        "--graph",
+        type=str,
+        default=None,
+        help="Record the link graph to PATH.edges and PATH.nodes",
+    )
+
+    parser.add_argument(
+        "--max-redirects",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Maximum length of a redirect chain across crawl hops (default: 10)",
+    )
+
+    parser.add_argument(
+        "--all-links",
+        action="store_true",
+        default=False,
+        help="Also follow image maps, frames, <link rel=next|prev|canonical> and "
+        "meta refresh links, not only anchors",
+    )
+
+    parser.add_argument(
+        "--skip-resources",
+        action="store_true",
+        default=False,
+        help="Do not fetch images, documents, archives and media, and stop "
+        "downloading responses that are not HTML",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--retries",
+        type=int,
+        default=0,
+        help="Retry transient fetch failures up to N times with backoff and "
+        "stop dispatching to hosts that keep failing (default: 0)",
+    )
+
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Total time allowed to fetch one page in seconds (default: 60)",
+    )
+
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=10.0,
+        help="Time allowed to connect to a host in seconds (default: 10)",
+    )
+
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=30.0,
+        help="Time allowed for each socket read in seconds (default: 30)",
+    )
+
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="Wall-clock budget of the whole crawl in seconds (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--dns-cache",
+        action="store_true",
+        default=False,
+        help="Cache DNS resolutions in process and resolve hosts ahead of fetching",
+    )
+
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Serve responses from and store them into an on-disk SQLite cache",
+    )
+
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=86400.0,
+        help="Seconds a cached response is served for (default: 86400)",
+    )
+
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=1024.0,
+        metavar="MB",
+        help="Size budget of the cached bodies in megabytes (default: 1024)",
+    )
+
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        default=False,
+        help="Serve every fetch from --cache and never use the network",
+    )
+
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Record page changes in FILE and only refetch pages likely to have changed",
+    )
+
+    parser.add_argument(
+        "--revisit-budget",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Maximum number of known pages fetched again (default: unlimited)",
+    )
+
+    parser.add_argument(
+        "--revisit-threshold",
+        type=float,
+        default=0.5,
+        help="Minimum probability of a change to fetch a known page again (default: 0.5)",
+    )
+
+    parser.add_argument(
+        "--warc",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Archive the fetched responses as .warc.gz files in DIR",
+    )
+
+    parser.add_argument(
+        "--warc-size",
+        type=float,
+        default=1024.0,
+        metavar="MB",
+        help="Start a new WARC file once the current one reaches MB (default: 1024)",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Write crawl metrics in the Prometheus text format when done",
+    )
+
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Append JSON snapshots of the crawl metrics to FILE periodically",
+    )
+
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between JSON metrics snapshots (default: 10)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Time the crawl stages and print a breakdown when done",
+    )
+
+    parser.add_argument(
+        "--profile-dump",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Sample thread stacks and write one collapsed-stack file per thread to DIR",
+    )
+
+    parser.add_argument(
+        "--trace-locks",
+        action="store_true",
+        default=False,
+        help="Trace lock acquisitions, wait and hold times and print a report",
+    )
+
     parser.add_argument(
         "-v",
         "--version",
@@ -106,24 +366,98 @@ Examples:
         version=f"%(prog)s {__version__}",
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.url is None and args.batch is None:
+        parser.error("the following arguments are required: url (or --batch)")
+    if args.replay and args.cache is None:
+        parser.error("--replay requires --cache")
+    return args
+
+
+def open_cache(args: argparse.Namespace) -> ResponseCache | None:
+    """Open the response cache selected on the command line, if any."""
+    if args.cache is None:
+        return None
+    from src.cache import ResponseCache
+
+    return ResponseCache(
+        args.cache,
+        ttl=args.cache_ttl,
+        max_bytes=int(args.cache_size * 1024 * 1024),
+        replay=args.replay,
+    )
 
 
-def getlinks(url: str, browser: BrowserType = "chromium") -> list[tuple[int, str]]:
+def getlinks(
+    url: str,
+    browser: BrowserType = "chromium",
+    *,
+    cache: ResponseCache | None = None,
+    extraction: ExtractionSpec | None = None,
+) -> list[tuple[int, str]]:
     """Get links from the Linkfetcher class.
 
     Args:
         url: The URL to fetch links from.
         browser: Browser User-Agent to use.
+        cache: Optional response cache.
+        extraction: Which links to extract; anchors by default.
 
     Returns:
         A list of tuples containing (index, url).
     """
-    page = Linkfetcher(url, browser=browser)
+    from src.extract import ANCHORS
+    from src.linkfetcher import Linkfetcher
+
+    page = Linkfetcher(url, browser=browser, cache=cache, extraction=extraction or ANCHORS)
     page.linkfetch()
     return [(index, url_link) for index, url_link in enumerate(page)]
 
 
+def batchlinks(
+    source: str,
+    output: str | None = None,
+    browser: BrowserType = "chromium",
+    *,
+    max_workers: int | None = None,
+    timeouts: Timeouts | None = None,
+    dns_cache: DNSCache | None = None,
+    cache: ResponseCache | None = None,
+) -> BatchStats:
+    """Fetch the links of a list of URLs and stream them as JSON lines.
+
+    Args:
+        source: File with one URL per line, or ``-`` for standard input.
+        output: File to write the results to, compressed by its extension.
+            Defaults to standard output.
+        browser: Browser User-Agent to use.
+        max_workers: Maximum number of URLs fetched at once.
+        timeouts: Connect, read and total timeouts of each fetch.
+        dns_cache: Optional shared DNS cache.
+        cache: Optional response cache.
+
+    Returns:
+        The aggregate throughput of the batch.
+    """
+    import sys
+
+    from src.batch import BatchFetcher, read_urls
+    from src.sinks import open_sink
+
+    fetcher = BatchFetcher(
+        browser,
+        max_workers=max_workers,
+        timeouts=timeouts,
+        dns_cache=dns_cache,
+        cache=cache,
+    )
+    lines = sys.stdin if source == "-" else Path(source).open(encoding="utf-8")  # noqa: SIM115
+    with lines, open_sink(output, "jsonl") as sink:
+        for result in fetcher.fetch(read_urls(lines)):
+            sink.stream.write(result.to_json() + "\n")
+    return fetcher.stats
+
+
 @timethis
 def crawl(
     url: str,
@@ -132,6 +466,22 @@ def crawl(
     *,
     concurrent: bool = False,
     max_workers: int | None = None,
+    sink: ResultSink | None = None,
+    graph: LinkGraphWriter | None = None,
+    sitemaps: bool = False,
+    retries: int = 0,
+    timeouts: TimeoutPolicy | None = None,
+    budget: float | None = None,
+    dns_cache: DNSCache | None = None,
+    metrics: CrawlMetrics | None = None,
+    profiler: StageProfiler | None = None,
+    link_checker: LinkChecker | None = None,
+    resource_filter: ResourceFilter | None = None,
+    cache: ResponseCache | None = None,
+    warc: WarcWriter | None = None,
+    revisit: RevisitScheduler | None = None,
+    extraction: ExtractionSpec | None = None,
+    max_redirects: int = 10,
 ) -> Webcrawler:
     """Crawl the given URL to the specified depth.
 
@@ -141,16 +491,55 @@ def crawl(
         browser: Browser User-Agent to use.
         concurrent: If True, use concurrent crawling with thread pool.
         max_workers: Maximum number of worker threads for concurrent mode.
+        sink: Optional result sink receiving each link as it is discovered.
+        graph: Optional link graph writer recording every crawled edge.
+        sitemaps: If True, seed the crawl from the site's sitemaps.
+        retries: Number of retries for transient fetch failures. A non-zero
+            value also enables per-host circuit breaking.
+        timeouts: Fetch timeouts, defaulting to ``TimeoutPolicy()``.
+        budget: Optional wall-clock budget of the crawl in seconds.
+        dns_cache: Optional shared DNS cache.
+        metrics: Optional crawl metrics to record into.
+        profiler: Optional profiler timing the crawl stages.
+        link_checker: Optional checker of every discovered link.
+        resource_filter: Optional filter of non-HTML resources.
+        cache: Optional response cache.
+        warc: Optional WARC writer archiving the fetched responses.
+        revisit: Optional scheduler of incremental re-crawls.
+        extraction: Which links to extract and follow; anchors by default.
+        max_redirects: Maximum length of a chain of redirects. Fetches stop
+            at the first redirect and its target is crawled as its own hop.
 
     Returns:
         The Webcrawler instance with results.
     """
+    from src.extract import ANCHORS
+    from src.retry import CircuitBreaker, RetryPolicy
+    from src.webcrawler import Webcrawler
+
     webcrawler = Webcrawler(
         url,
         depth,
         browser=browser,
         concurrent=concurrent,
         max_workers=max_workers,
+        sink=sink,
+        graph=graph,
+        sitemaps=sitemaps,
+        retry=RetryPolicy(max_retries=retries) if retries > 0 else None,
+        circuit_breaker=CircuitBreaker() if retries > 0 else None,
+        timeouts=timeouts,
+        budget=budget,
+        dns_cache=dns_cache,
+        metrics=metrics,
+        profiler=profiler,
+        link_checker=link_checker,
+        resource_filter=resource_filter,
+        cache=cache,
+        warc=warc,
+        revisit=revisit,
+        extraction=extraction or ANCHORS,
+        max_redirects=max_redirects,
     )
     webcrawler.crawl()
     return webcrawler
@@ -159,10 +548,46 @@ def crawl(
 def main() -> None:
     """Main entry point for the crawler."""
     args = parse_args()
+
+    from src.threading_utils import is_gil_disabled
+
     url = args.url
     browser: BrowserType = args.browser
     concurrent = args.concurrent
     workers = args.workers
+    cache = open_cache(args)
+
+    if args.batch:
+        from src.dns import DNSCache
+        from src.timeouts import Timeouts
+
+        dns_cache = DNSCache() if args.dns_cache else None
+        stats = batchlinks(
+            args.batch,
+            args.output,
+            browser,
+            max_workers=workers,
+            timeouts=Timeouts(args.connect_timeout, args.read_timeout, args.timeout),
+            dns_cache=dns_cache,
+            cache=cache,
+        )
+        if dns_cache is not None:
+            dns_cache.close()
+        if cache is not None:
+            cache.close()
+        # Statistics go to stderr, so they never mix with JSON lines on stdout
+        LOGGER.info(
+            "Batch: %d URLs (%d failed), %d links, %d bytes in %.2fs "
+            "(%.1f URLs/s, %.0f bytes/s)",
+            stats.urls,
+            stats.failed,
+            stats.links,
+            stats.bytes,
+            stats.elapsed,
+            stats.urls_per_second,
+            stats.bytes_per_second,
+        )
+        raise SystemExit(0)
 
     # Show GIL status for debugging/info
     if is_gil_disabled():
@@ -170,32 +595,150 @@ def main() -> None:
     elif concurrent:
         print("Running with GIL enabled (limited parallelism)")
 
+    from src.extract import ALL_LINKS, ANCHORS
+
+    extraction = ALL_LINKS if args.all_links else ANCHORS
     if args.links:
-        links = getlinks(url, browser=browser)
+        links = getlinks(url, browser=browser, cache=cache, extraction=extraction)
+        if cache is not None:
+            cache.close()
         for index, link in links:
             LOGGER.info("Link %d: %s", index, link)
         raise SystemExit(0)
 
+    from rich.console import Console
+
+    from src.dns import DNSCache
+    from src.linkcheck import LinkChecker
+    from src.linkgraph import LinkGraphWriter
+    from src.locktrace import LockTracer
+    from src.metrics import CrawlMetrics, SnapshotWriter
+    from src.profiling import SamplingProfiler, StageProfiler
+    from src.recrawl import CrawlHistory, RevisitScheduler
+    from src.resources import ResourceFilter
+    from src.sinks import open_sink
+    from src.timeouts import TimeoutPolicy, Timeouts
+    from src.warc import WarcWriter
+
     depth = args.depth
 
-    webcrawler = crawl(
-        url,
-        depth,
-        browser=browser,
-        concurrent=concurrent,
-        max_workers=workers,
-    )
     print("CRAWLER STARTED:")
     print(f"{url}, will crawl upto depth {depth}")
     print(f"Using {browser} User-Agent")
     if concurrent:
         print(f"Concurrent mode: enabled (workers: {workers or 'auto'})")
-    print("\n".join(webcrawler.urls))
+    graph = LinkGraphWriter(args.graph) if args.graph else None
+    warc = None
+    if args.warc:
+        warc = WarcWriter(args.warc, max_file_size=int(args.warc_size * 1024 * 1024))
+    revisit = None
+    if args.history:
+        revisit = RevisitScheduler(
+            CrawlHistory(args.history),
+            budget=args.revisit_budget,
+            threshold=args.revisit_threshold,
+        )
+    metrics = CrawlMetrics() if args.metrics or args.metrics_json else None
+    snapshots = None
+    if metrics is not None and args.metrics_json:
+        snapshots = SnapshotWriter(
+            metrics.registry,
+            Path(args.metrics_json).open("a", encoding="utf-8"),  # noqa: SIM115
+            args.metrics_interval,
+        )
+    profiler = None
+    if args.profile:
+        profiler = StageProfiler(metrics.registry if metrics is not None else None)
+    sampler = SamplingProfiler().start() if args.profile_dump else None
+    lock_tracer = None
+    if args.trace_locks:
+        lock_tracer = LockTracer(metrics.registry if metrics is not None else None)
+    # Only locks created while the tracer is active are traced
+    tracing = lock_tracer if lock_tracer is not None else nullcontext()
+    with tracing, open_sink(args.output, args.format) as sink:
+        dns_cache = DNSCache() if args.dns_cache else None
+        fetch_timeouts = Timeouts(args.connect_timeout, args.read_timeout, args.timeout)
+        link_checker = None
+        if args.check_links:
+            link_checker = LinkChecker(browser, timeouts=fetch_timeouts, dns_cache=dns_cache)
+        webcrawler = crawl(
+            url,
+            depth,
+            browser=browser,
+            concurrent=concurrent,
+            max_workers=workers,
+            sink=sink,
+            graph=graph,
+            sitemaps=args.sitemaps,
+            retries=args.retries,
+            timeouts=TimeoutPolicy(fetch_timeouts),
+            budget=args.budget,
+            dns_cache=dns_cache,
+            metrics=metrics,
+            profiler=profiler,
+            link_checker=link_checker,
+            resource_filter=ResourceFilter() if args.skip_resources else None,
+            cache=cache,
+            warc=warc,
+            revisit=revisit,
+            extraction=extraction,
+            max_redirects=args.max_redirects,
+        )
+        if link_checker is not None:
+            link_checker.wait()
+    if sampler is not None:
+        sampler.stop()
+        paths = sampler.write(args.profile_dump)
+        print(f"Stack samples of {len(paths)} threads written to {args.profile_dump}")
+    if dns_cache is not None:
+        dns_cache.close()
+    if cache is not None:
+        cache.close()
+    if revisit is not None:
+        revisit.history.close()
+    if snapshots is not None:
+        snapshots.close()
+        snapshots.stream.close()
+    if metrics is not None and args.metrics:
+        Path(args.metrics).write_text(metrics.registry.to_prometheus(), encoding="utf-8")
+    if graph is not None:
+        graph.close()
+        print(f"Link graph: {graph.edge_count} edges written to {args.graph}")
+    if warc is not None:
+        warc.close()
+        print(f"WARC: {warc.records} responses in {len(warc.files)} files in {args.warc}")
     print("=" * 100)
     print("Crawler Statistics")
     print("=" * 100)
     print(f"No of links Found: {webcrawler.links}")
     print(f"No of followed:     {webcrawler.followed}")
+    print(f"Redirected URLs:    {len(webcrawler.redirects)}")
+    if args.skip_resources:
+        print(f"Skipped resources:  {webcrawler.skipped}")
+    if revisit is not None:
+        print(f"Not yet due:        {webcrawler.fresh} known pages")
+    if cache is not None:
+        print(f"Cache:              {cache.hits} hits, {cache.misses} misses")
+    if metrics is not None:
+        latency = metrics.fetch_seconds.sample()
+        print(
+            f"Fetch latency:      p50 {latency.quantile(0.5) * 1000:.0f}ms, "
+            f"p99 {latency.quantile(0.99) * 1000:.0f}ms over {latency.count} fetches"
+        )
+        print(f"Bytes received:     {metrics.response_bytes.value():.0f}")
+        print(f"Worker utilization: {metrics.utilization.value():.0%}")
+    if link_checker is not None:
+        broken = link_checker.broken()
+        print(f"Links checked:      {len(link_checker)} ({link_checker.requests} requests)")
+        print(f"Broken links:       {len(broken)}")
+        for link in broken:
+            print(f"  {link.status or link.error} {link.url}")
+            for referrer in link.referrers:
+                print(f"    <- {referrer}")
+    if profiler is not None:
+        Console().print(profiler.report())
+    if lock_tracer is not None:
+        Console().print(lock_tracer.report())
 
 
 if __name__ == "__main__":
@@ -1,16 +1,21 @@
 """Version and logging configuration for pycrawler."""
 
+import importlib
 import logging
+from typing import TYPE_CHECKING, Any
 
-from src.threading_utils import (
-    ThreadSafeCounter,
-    ThreadSafeList,
-    ThreadSafeSet,
-    get_optimal_worker_count,
-    get_python_build_info,
-    is_gil_disabled,
-    parallel_map,
-)
+if TYPE_CHECKING:
+    from src.threading_utils import (
+        ThreadSafeCounter,
+        ThreadSafeList,
+        ThreadSafeSet,
+        WorkerPool,
+        get_optimal_worker_count,
+        get_python_build_info,
+        is_gil_disabled,
+        parallel_map,
+        shared_pool,
+    )
 
 __version__: str = "4.1.0"
 
@@ -21,16 +26,46 @@ HANDLER.setFormatter(FORMATTER)
 LOGGER.addHandler(HANDLER)
 LOGGER.setLevel(logging.INFO)
 
-# Re-export threading utilities for convenience
+# Re-export threading utilities for convenience. They are imported on first
+# access so that importing the package (e.g. for --version) stays cheap.
+_LAZY_EXPORTS: dict[str, str] = {
+    "ThreadSafeCounter": "src.threading_utils",
+    "ThreadSafeList": "src.threading_utils",
+    "ThreadSafeSet": "src.threading_utils",
+    "WorkerPool": "src.threading_utils",
+    "get_optimal_worker_count": "src.threading_utils",
+    "get_python_build_info": "src.threading_utils",
+    "is_gil_disabled": "src.threading_utils",
+    "parallel_map": "src.threading_utils",
+    "shared_pool": "src.threading_utils",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a lazily re-exported name on first access."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the module attributes, including the lazy exports."""
+    return sorted([*globals(), *_LAZY_EXPORTS])
+
 
 __all__ = [
     "LOGGER",
     "ThreadSafeCounter",
     "ThreadSafeList",
     "ThreadSafeSet",
+    "WorkerPool",
     "__version__",
     "get_optimal_worker_count",
     "get_python_build_info",
     "is_gil_disabled",
     "parallel_map",
+    "shared_pool",
 ]
@@ -0,0 +1,194 @@
+"""Batch link fetching.
+
+``BatchFetcher`` fetches the links of many independent URLs concurrently in
+one process, instead of paying interpreter start-up, DNS resolution and TLS
+context set-up once per URL. URLs are read lazily and results are yielded as
+soon as each fetch completes, so inputs of any size run in constant memory::
+
+    fetcher = BatchFetcher(max_workers=32)
+    with Path("urls.txt").open() as lines:
+        for result in fetcher.fetch(read_urls(lines)):
+            print(result.to_json())
+    print(fetcher.stats.urls_per_second)
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+from src.linkfetcher import Linkfetcher
+from src.threading_utils import shared_pool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from src.cache import ResponseCache
+    from src.dns import DNSCache
+    from src.threading_utils import WorkerPool
+    from src.timeouts import Timeouts
+    from src.useragents import BrowserType
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult:
+    """The links of one URL of a batch.
+
+    Attributes:
+        url: The fetched URL.
+        status: HTTP status of the response, None if none was received.
+        links: Links found on the page.
+        error: Description of the fetch error, if any.
+        elapsed: Wall-clock time of the fetch in seconds.
+        bytes: Size of the response body.
+    """
+
+    url: str
+    status: int | None
+    links: list[str]
+    error: str | None
+    elapsed: float
+    bytes: int
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the URL was fetched without error."""
+        return self.error is None
+
+    def to_json(self) -> str:
+        """Serialize the result as a single JSON line."""
+        return json.dumps(asdict(self))
+
+
+@dataclass(slots=True)
+class BatchStats:
+    """Aggregate throughput of a batch.
+
+    Attributes:
+        urls: Number of URLs fetched.
+        failed: Number of URLs whose fetch failed.
+        links: Total number of links found.
+        bytes: Total size of the response bodies.
+        elapsed: Wall-clock time of the batch in seconds.
+    """
+
+    urls: int = 0
+    failed: int = 0
+    links: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    def add(self, result: BatchResult) -> None:
+        """Account for a completed URL."""
+        self.urls += 1
+        self.failed += not result.ok
+        self.links += len(result.links)
+        self.bytes += result.bytes
+
+    @property
+    def urls_per_second(self) -> float:
+        """Get the number of URLs fetched per second."""
+        return self.urls / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Get the number of body bytes received per second."""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def read_urls(lines: Iterable[str]) -> Iterator[str]:
+    """Read URLs one per line, skipping blank lines and ``#`` comments."""
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+class BatchFetcher:
+    """Fetch the links of many independent URLs concurrently."""
+
+    def __init__(
+        self,
+        browser: BrowserType = "chromium",
+        *,
+        max_workers: int | None = None,
+        timeouts: Timeouts | None = None,
+        dns_cache: DNSCache | None = None,
+        pool: WorkerPool | None = None,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        """Initialize the fetcher.
+
+        Args:
+            browser: Browser User-Agent to use.
+            max_workers: Maximum number of URLs fetched at once. Defaults to
+                the size of the pool.
+            timeouts: Connect, read and total timeouts of each fetch.
+            dns_cache: Optional shared DNS cache. Hosts are resolved in the
+                background as their URLs are read.
+            pool: Pool to fetch on. Defaults to ``shared_pool()``.
+            cache: Optional response cache pages are served from and
+                stored into.
+        """
+        self.browser: BrowserType = browser
+        self.timeouts: Timeouts | None = timeouts
+        self.dns_cache: DNSCache | None = dns_cache
+        self.pool: WorkerPool = pool or shared_pool()
+        self.max_workers: int = max_workers or self.pool.max_workers
+        self.cache: ResponseCache | None = cache
+        self.stats = BatchStats()
+
+    def _fetch(self, url: str) -> BatchResult:
+        """Fetch the links of a single URL on a worker thread."""
+        # Thread-safe mode also keeps rich's single live display out of workers
+        page = Linkfetcher(
+            url,
+            browser=self.browser,
+            thread_safe=True,
+            timeouts=self.timeouts,
+            dns_cache=self.dns_cache,
+            cache=self.cache,
+        )
+        start = time.perf_counter()
+        try:
+            page.linkfetch()
+        except Exception as e:
+            page.error = e
+        elapsed = time.perf_counter() - start
+        error = None if page.error is None else str(page.error)
+        return BatchResult(
+            url, page.status, page.urls, error, elapsed, page.timings.bytes
+        )
+
+    def _prefetched(self, urls: Iterable[str]) -> Iterator[str]:
+        """Start resolving the host of each URL as it is read."""
+        for url in urls:
+            if self.dns_cache is not None:
+                self.dns_cache.prefetch_url(url)
+            yield url
+
+    def fetch(self, urls: Iterable[str]) -> Iterator[BatchResult]:
+        """Fetch the links of each URL, yielding results as they complete.
+
+        Results come in completion order, not input order. ``stats`` is
+        updated as each result is yielded.
+
+        Args:
+            urls: URLs to fetch; may be a lazy iterable such as a file.
+
+        Yields:
+            The result of each URL.
+        """
+        start = time.perf_counter()
+        results = self.pool.imap(
+            self._fetch,
+            self._prefetched(urls),
+            ordered=False,
+            max_in_flight=self.max_workers,
+        )
+        for result in results:
+            self.stats.add(result)
+            self.stats.elapsed = time.perf_counter() - start
+            yield result
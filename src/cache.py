@@ -0,0 +1,246 @@
+"""On-disk HTTP response cache.
+
+``ResponseCache`` stores fetched responses in a SQLite database so repeated
+crawls, tests and benchmarks can be served without the network. Bodies are
+content-addressed by their SHA-256 digest, so pages with identical content
+are stored once. Entries expire after a TTL, and the least recently used
+ones are evicted once the bodies exceed a size budget. In replay mode every
+fetch is served from the cache, however old, and a URL that is not cached
+fails instead of reaching the network.
+
+The database may be shared by concurrent processes::
+
+    with ResponseCache("crawl-cache.sqlite3") as cache:
+        Webcrawler(url, depth, cache=cache).crawl()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+# Eviction frees space down to this fraction of the size budget, so it does
+# not run again on the next insert
+EVICTION_LOW_WATER = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    digest BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    location TEXT
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS bodies (
+    digest BLOB PRIMARY KEY,
+    body BLOB NOT NULL
+);
+"""
+
+
+class CacheMissError(LookupError):
+    """A URL is not in the cache of a replay-only fetch."""
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """A response served from the cache.
+
+    Attributes:
+        status: HTTP status of the response.
+        content_type: The ``Content-Type`` header, if any.
+        body: The response body; empty for error responses.
+        fetched_at: Wall-clock time the response was fetched at.
+        location: The ``Location`` header of a redirect, if any.
+    """
+
+    status: int
+    content_type: str | None
+    body: bytes
+    fetched_at: float
+    location: str | None = None
+
+
+class ResponseCache:
+    """A thread-safe SQLite cache of HTTP responses."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttl: float | None = 86400.0,
+        max_bytes: int | None = 1 << 30,
+        replay: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open or create a cache database.
+
+        Args:
+            path: Path of the SQLite database.
+            ttl: Seconds a response is served for after being fetched. None
+                keeps responses until they are evicted.
+            max_bytes: Size budget of the stored bodies. Least recently used
+                responses are evicted beyond it. None disables eviction.
+            replay: If True, serve every fetch from the cache regardless of
+                the TTL and never fetch from the network.
+            clock: Wall-clock time source, replaceable for testing.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self._clock = clock
+        self._lock = new_lock("ResponseCache")
+        self._db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        self._size = self._stored_bytes()
+        self.hits = 0
+        self.misses = 0
+
+    def _migrate(self) -> None:
+        """Add the columns missing from databases created by older versions."""
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "location" not in columns:
+            with self._db:
+                self._db.execute("ALTER TABLE responses ADD COLUMN location TEXT")
+
+    def _stored_bytes(self) -> int:
+        """Return the total size of the stored bodies."""
+        (size,) = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM bodies"
+        ).fetchone()
+        return size
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the stored bodies in bytes."""
+        with self._lock:
+            return self._size
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Return the cached response of a URL, or None if it is not fresh.
+
+        In replay mode, stale responses are returned as well.
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, content_type, body, fetched_at, location FROM responses "
+                "JOIN bodies USING (digest) WHERE url = ?",
+                (url,),
+            ).fetchone()
+            fresh = row is not None and (
+                self.replay or self.ttl is None or now - row[3] <= self.ttl
+            )
+            if not fresh:
+                self.misses += 1
+                return None
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url)
+                )
+            self.hits += 1
+        return CachedResponse(*row)
+
+    def put(
+        self,
+        url: str,
+        status: int,
+        content_type: str | None,
+        body: bytes = b"",
+        *,
+        location: str | None = None,
+    ) -> None:
+        """Store the response of a URL, replacing any previous one.
+
+        Args:
+            url: The requested URL.
+            status: HTTP status of the response.
+            content_type: The ``Content-Type`` header, if any.
+            body: The response body.
+            location: The ``Location`` header of a redirect that was not
+                followed, so that replays can follow it in turn.
+        """
+        digest = hashlib.sha256(body).digest()
+        now = self._clock()
+        with self._lock:
+            with self._db:
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO bodies (digest, body) VALUES (?, ?)",
+                    (digest, body),
+                ).rowcount
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, status, content_type, digest, now, now, location),
+                )
+            if inserted:
+                self._size += len(body)
+            if self.max_bytes is not None and self._size > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICTION_LOW_WATER))
+
+    def _evict(self, target: int) -> None:
+        """Evict least recently used responses until the bodies fit ``target``."""
+        with self._db:
+            while True:
+                # Bodies of replaced responses are only reclaimed here
+                self._db.execute(
+                    "DELETE FROM bodies WHERE digest NOT IN "
+                    "(SELECT digest FROM responses)"
+                )
+                self._size = self._stored_bytes()
+                if self._size <= target:
+                    return
+                # Bodies shared with newer responses survive, hence the loop
+                excess = self._size - target
+                urls: list[tuple[str]] = []
+                rows = self._db.execute(
+                    "SELECT url, LENGTH(body) FROM responses JOIN bodies "
+                    "USING (digest) ORDER BY accessed_at"
+                )
+                for url, size in rows:
+                    urls.append((url,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                if not urls:
+                    return
+                self._db.executemany("DELETE FROM responses WHERE url = ?", urls)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the database on exit."""
+        self.close()
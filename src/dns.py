@@ -0,0 +1,273 @@
+"""Shared DNS resolution cache.
+
+``urllib`` resolves the host of every new connection through the system
+resolver. ``DNSCache`` keeps resolutions in process with a TTL and LRU
+eviction, caches failures for a shorter time, and can resolve hosts in the
+background as soon as their URLs are queued so that lookups happen off the
+fetch critical path. ``open_connection`` and ``DNSCache.create_connection``
+are drop-in replacements for ``socket.create_connection`` used by the HTTP
+handlers; the former also times resolution and connect.
+"""
+
+from __future__ import annotations
+
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from src import LOGGER
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from src.metrics import FetchTimings
+
+# A getaddrinfo() result entry: (family, type, proto, canonname, sockaddr)
+type AddrInfo = tuple[Any, ...]
+type Resolver = Callable[[str, int], list[AddrInfo]]
+
+DEFAULT_PORTS: dict[str, int] = {"http": 80, "https": 443}
+
+
+def system_resolver(host: str, port: int) -> list[AddrInfo]:
+    """Resolve a host with the system resolver."""
+    return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+
+
+class DNSCache:
+    """A thread-safe DNS cache with TTL, LRU eviction and negative caching.
+
+    Concurrent lookups of the same host share a single resolution.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver = system_resolver,
+        *,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        max_entries: int = 10_000,
+        prefetch_workers: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            resolver: Function resolving (host, port) to getaddrinfo() entries.
+            ttl: Seconds a successful resolution is cached.
+            negative_ttl: Seconds a failed resolution is cached.
+            max_entries: Maximum number of cached hosts; the least recently
+                used are evicted first.
+            prefetch_workers: Number of background threads for prefetching.
+            clock: Monotonic time source, replaceable for testing.
+        """
+        self.resolver = resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prefetch_workers = prefetch_workers
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        # (host, port) -> (expiry, addresses or the resolution error)
+        self._entries: OrderedDict[
+            tuple[str, int], tuple[float, list[AddrInfo] | OSError]
+        ] = OrderedDict()
+        self._inflight: dict[tuple[str, int], Future[list[AddrInfo]]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = new_lock("DNSCache")
+
+    def _lookup(self, key: tuple[str, int]) -> list[AddrInfo] | OSError | None:
+        """Return a fresh cached entry, dropping an expired one. Needs the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if expiry <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: tuple[str, int], value: list[AddrInfo] | OSError) -> None:
+        """Cache a resolution result. Needs the lock."""
+        ttl = self.negative_ttl if isinstance(value, OSError) else self.ttl
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _resolve_into(
+        self, key: tuple[str, int], future: Future[list[AddrInfo]]
+    ) -> None:
+        """Resolve a host, cache the outcome and complete its future."""
+        try:
+            addresses = self.resolver(*key)
+        except Exception as error:
+            with self._lock:
+                # Only resolution failures are cached, not resolver bugs
+                if isinstance(error, OSError):
+                    self._store(key, error)
+                del self._inflight[key]
+            future.set_exception(error)
+        else:
+            with self._lock:
+                self._store(key, addresses)
+                del self._inflight[key]
+            future.set_result(addresses)
+
+    def _claim(
+        self, key: tuple[str, int]
+    ) -> tuple[list[AddrInfo] | OSError | None, Future[list[AddrInfo]], bool]:
+        """Find a cached entry or the in-flight resolution of a host.
+
+        Returns:
+            The cached value (if any), the resolution future and whether the
+            caller owns the future and must perform the resolution.
+        """
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached, Future(), False
+            self.misses += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                return None, future, False
+            future = Future()
+            self._inflight[key] = future
+            return None, future, True
+
+    def resolve(self, host: str, port: int) -> list[AddrInfo]:
+        """Resolve a host, from the cache if possible.
+
+        Args:
+            host: Host name.
+            port: Port number.
+
+        Returns:
+            The getaddrinfo() entries of the host.
+
+        Raises:
+            OSError: If the host cannot be resolved (possibly cached).
+        """
+        key = (host, port)
+        cached, future, owner = self._claim(key)
+        if isinstance(cached, OSError):
+            raise cached
+        if cached is not None:
+            return cached
+        if owner:
+            self._resolve_into(key, future)
+        return future.result()
+
+    def prefetch(self, host: str, port: int) -> None:
+        """Resolve a host in the background unless cached or in flight."""
+        key = (host, port)
+        with self._lock:
+            if self._lookup(key) is not None or key in self._inflight:
+                return
+            future: Future[list[AddrInfo]] = Future()
+            self._inflight[key] = future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers, thread_name_prefix="dns"
+                )
+            executor = self._executor
+        executor.submit(self._resolve_into, key, future)
+        LOGGER.debug("Prefetching DNS for %s:%d", host, port)
+
+    def prefetch_url(self, url: str) -> None:
+        """Prefetch the resolution of a URL's host."""
+        parts = socket_address(url)
+        if parts is not None:
+            self.prefetch(*parts)
+
+    def create_connection(
+        self,
+        address: tuple[str, int],
+        timeout: float | None = None,
+        source_address: tuple[str, int] | None = None,
+        **_: Any,
+    ) -> socket.socket:
+        """Connect to an address like ``socket.create_connection``.
+
+        Resolution goes through the cache; see ``open_connection``.
+        """
+        return open_connection(address, timeout, source_address, resolver=self.resolve)
+
+    def __len__(self) -> int:
+        """Return the number of cached hosts."""
+        with self._lock:
+            return len(self._entries)
+
+    def close(self) -> None:
+        """Stop the prefetch threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def open_connection(
+    address: tuple[str, int],
+    timeout: float | None = socket._GLOBAL_DEFAULT_TIMEOUT,  # type: ignore[attr-defined]
+    source_address: tuple[str, int] | None = None,
+    *,
+    resolver: Resolver = system_resolver,
+    timings: FetchTimings | None = None,
+) -> socket.socket:
+    """Connect to an address like ``socket.create_connection``.
+
+    Each resolved address is tried in turn until one connects.
+
+    Args:
+        address: (host, port) to connect to.
+        timeout: Connect timeout in seconds.
+        source_address: Optional local (host, port) to bind to.
+        resolver: Function resolving the host, such as ``DNSCache.resolve``.
+        timings: If given, receives the resolution and connect durations.
+
+    Raises:
+        OSError: If resolution fails or no address accepts the connection.
+    """
+    host, port = address
+    start = time.perf_counter()
+    addresses = resolver(host, port)
+    resolved = time.perf_counter()
+    if timings is not None:
+        timings.dns = resolved - start
+    error: OSError | None = None
+    for family, type_, proto, _, sockaddr in addresses:
+        sock = socket.socket(family, type_, proto)
+        try:
+            # socket.create_connection() uses a sentinel for "no timeout given"
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:  # type: ignore[attr-defined]
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+        except OSError as exc:
+            error = exc
+            sock.close()
+        else:
+            if timings is not None:
+                timings.connect = time.perf_counter() - resolved
+            return sock
+    raise error if error is not None else OSError(f"No addresses for {host}")
+
+
+def socket_address(url: str) -> tuple[str, int] | None:
+    """Return the (host, port) a URL connects to, or None if it has no host."""
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return None
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    return parts.hostname, port or DEFAULT_PORTS.get(parts.scheme, 80)
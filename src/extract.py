@@ -0,0 +1,210 @@
+"""Typed link extraction.
+
+An ``ExtractionSpec`` lists which elements and attributes of a page hold
+links and what kind of link each one is: ``navigation`` (anchors, image maps,
+frames, ``<link rel=next>``), ``canonical``, ``resource`` (images, scripts,
+stylesheets, ``srcset`` candidates) or ``redirect`` (``<meta http-equiv=refresh>``).
+Pages are parsed once, building only the elements the spec names, and every
+link is resolved against the document base URL, which honors ``<base href>``::
+
+    spec = ALL_LINKS
+    base, tags = spec.parse(html, url)
+    for link in spec.links(tags, base):
+        print(link.kind, link.url)
+"""
+
+from __future__ import annotations
+
+import re
+import urllib.parse
+from dataclasses import dataclass
+from html import escape
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from bs4 import Tag
+
+type LinkKind = Literal["navigation", "canonical", "resource", "redirect"]
+
+# content="5; url=/next" of <meta http-equiv="refresh">
+_REFRESH_URL = re.compile(
+    r"""^\s*[\d.]*\s*[;,]?\s*(?:url\s*=\s*)?(['"]?)(?P<url>.*?)\1\s*$""",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Link:
+    """A link found on a page.
+
+    Attributes:
+        url: The absolute URL of the link.
+        kind: What the link is used for.
+        tag: Name of the element the link was found on.
+    """
+
+    url: str
+    kind: LinkKind
+    tag: str
+
+
+def resolve(base: str, href: str) -> str:
+    """Resolve a link against the base URL of its document."""
+    return urllib.parse.urljoin(base, escape(href.strip()))
+
+
+def refresh_url(content: str) -> str | None:
+    """Return the target of a ``<meta http-equiv=refresh>`` content, if any."""
+    match = _REFRESH_URL.match(content)
+    if match is None or not match["url"]:
+        return None
+    return match["url"]
+
+
+def srcset_urls(srcset: str) -> list[str]:
+    """Return the URLs of the image candidates of a ``srcset`` attribute."""
+    return [
+        candidate.split()[0]
+        for candidate in srcset.split(",")
+        if candidate.strip()
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractionSpec:
+    """Which links to extract from a page, and which of them to follow.
+
+    Attributes:
+        attributes: ``(tag, attribute, kind)`` triples of elements holding
+            a link in an attribute.
+        link_rels: ``(rel, kind)`` pairs of ``<link>`` relations whose
+            ``href`` is extracted.
+        srcset: Extract the candidates of ``srcset`` attributes of ``<img>``
+            and ``<source>`` as resources.
+        meta_refresh: Extract the target of ``<meta http-equiv=refresh>`` as
+            a redirect.
+        follow: Kinds of links added to the URLs of a page, and so crawled.
+    """
+
+    attributes: tuple[tuple[str, str, LinkKind], ...] = (("a", "href", "navigation"),)
+    link_rels: tuple[tuple[str, LinkKind], ...] = ()
+    srcset: bool = False
+    meta_refresh: bool = False
+    follow: frozenset[LinkKind] = frozenset({"navigation", "canonical", "redirect"})
+
+    @property
+    def tags(self) -> list[str]:
+        """Get the names of the elements the spec reads."""
+        tags = {"base", *(tag for tag, _, _ in self.attributes)}
+        if self.link_rels:
+            tags.add("link")
+        if self.srcset:
+            tags.update(("img", "source"))
+        if self.meta_refresh:
+            tags.add("meta")
+        return sorted(tags)
+
+    def parse(self, content: str, url: str) -> tuple[str, list[Tag]]:
+        """Parse a page, building only the elements the spec reads.
+
+        Args:
+            content: The HTML of the page.
+            url: The URL the page was fetched from.
+
+        Returns:
+            The base URL of the document and its elements in document order.
+        """
+        # Deferred so that importing the module (e.g. for the CLI) stays cheap
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        tags = self.tags
+        soup = BeautifulSoup(content, "html.parser", parse_only=SoupStrainer(tags))
+        elements = soup.find_all(tags)
+        # Only the first <base href> counts, wherever it is in the document
+        base = next(
+            (
+                element.get("href")
+                for element in elements
+                if element.name == "base" and isinstance(element.get("href"), str)
+            ),
+            None,
+        )
+        return (url if base is None else resolve(url, base)), elements
+
+    def links(self, tags: Iterable[Tag], base: str) -> Iterator[Link]:
+        """Extract the links of parsed elements.
+
+        Args:
+            tags: Elements returned by ``parse``.
+            base: The base URL returned by ``parse``.
+
+        Yields:
+            Each link, in document order.
+        """
+        by_tag: dict[str, list[tuple[str, LinkKind]]] = {}
+        for tag, attribute, kind in self.attributes:
+            by_tag.setdefault(tag, []).append((attribute, kind))
+        rels = dict(self.link_rels)
+        for element in tags:
+            name = element.name
+            for attribute, kind in by_tag.get(name, ()):
+                value = element.get(attribute)
+                if isinstance(value, str):
+                    yield Link(resolve(base, value), kind, name)
+            if name == "link" and rels:
+                href = element.get("href")
+                rel = element.get("rel") or ()
+                for token in rel.split() if isinstance(rel, str) else rel:
+                    kind = rels.get(token.lower())
+                    if kind is not None and isinstance(href, str):
+                        yield Link(resolve(base, href), kind, name)
+                        break
+            elif name in ("img", "source") and self.srcset:
+                srcset = element.get("srcset")
+                if isinstance(srcset, str):
+                    for candidate in srcset_urls(srcset):
+                        yield Link(resolve(base, candidate), "resource", name)
+            elif name == "meta" and self.meta_refresh:
+                equiv = element.get("http-equiv")
+                content = element.get("content")
+                if (
+                    isinstance(equiv, str)
+                    and equiv.lower() == "refresh"
+                    and isinstance(content, str)
+                    and (target := refresh_url(content)) is not None
+                ):
+                    yield Link(resolve(base, target), "redirect", name)
+
+
+# Anchors only, the default of Linkfetcher
+ANCHORS = ExtractionSpec()
+
+# Every kind of link
+ALL_LINKS = ExtractionSpec(
+    attributes=(
+        ("a", "href", "navigation"),
+        ("area", "href", "navigation"),
+        ("frame", "src", "navigation"),
+        ("iframe", "src", "navigation"),
+        ("audio", "src", "resource"),
+        ("embed", "src", "resource"),
+        ("img", "src", "resource"),
+        ("script", "src", "resource"),
+        ("source", "src", "resource"),
+        ("video", "src", "resource"),
+    ),
+    link_rels=(
+        ("canonical", "canonical"),
+        ("next", "navigation"),
+        ("prev", "navigation"),
+        ("alternate", "navigation"),
+        ("stylesheet", "resource"),
+        ("icon", "resource"),
+        ("preload", "resource"),
+        ("modulepreload", "resource"),
+    ),
+    srcset=True,
+    meta_refresh=True,
+)
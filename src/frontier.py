@@ -0,0 +1,187 @@
+"""Priority-based URL frontier.
+
+The frontier orders queued URLs by a score computed by a pluggable scorer,
+so depth-limited crawls fetch the most valuable pages first. It is a binary
+heap with O(log n) push, pop and re-prioritization.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+
+@dataclass(frozen=True, slots=True)
+class ScoreContext:
+    """Information available to a scorer about a queued URL.
+
+    Attributes:
+        url: The URL being scored.
+        depth: The crawl depth at which the URL was discovered.
+        inlinks: Number of links to the URL seen so far.
+        priority: Priority hint for the URL (e.g. from a sitemap), if any.
+        lastmod: Last modification date hint (e.g. from a sitemap), if any.
+    """
+
+    url: str
+    depth: int
+    inlinks: int
+    priority: float | None = None
+    lastmod: str | None = None
+
+
+type Scorer = Callable[[ScoreContext], float]
+
+
+def breadth_first(context: ScoreContext) -> float:
+    """Score shallower URLs higher, giving breadth-first order."""
+    return -float(context.depth)
+
+
+def by_inlinks(context: ScoreContext) -> float:
+    """Score URLs by the number of links pointing at them."""
+    return float(context.inlinks)
+
+
+def by_priority(context: ScoreContext, default: float = 0.5) -> float:
+    """Score URLs by their priority hint, such as a sitemap ``<priority>``."""
+    return context.priority if context.priority is not None else default
+
+
+def by_lastmod(context: ScoreContext) -> float:
+    """Score recently modified URLs higher, in days since the epoch.
+
+    URLs without a parseable W3C datetime ``lastmod`` hint score zero.
+    """
+    if not context.lastmod:
+        return 0.0
+    try:
+        modified = datetime.fromisoformat(context.lastmod.replace("Z", "+00:00"))
+    except ValueError:
+        return 0.0
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=UTC)
+    return modified.timestamp() / 86400
+
+
+def by_pattern(patterns: Mapping[str, float], default: float = 0.0) -> Scorer:
+    """Build a scorer from URL regex patterns.
+
+    Args:
+        patterns: Mapping of regular expression to score. The first pattern
+            that matches the URL determines its score.
+        default: Score of URLs matching no pattern.
+
+    Returns:
+        The scorer function.
+    """
+    compiled = [(re.compile(pattern), score) for pattern, score in patterns.items()]
+
+    def score(context: ScoreContext) -> float:
+        for pattern, value in compiled:
+            if pattern.search(context.url):
+                return value
+        return default
+
+    return score
+
+
+def weighted(*scorers: tuple[Scorer, float]) -> Scorer:
+    """Combine scorers into a weighted sum.
+
+    Args:
+        scorers: Pairs of (scorer, weight).
+
+    Returns:
+        The combined scorer function.
+    """
+
+    def score(context: ScoreContext) -> float:
+        return sum(weight * scorer(context) for scorer, weight in scorers)
+
+    return score
+
+
+class PriorityFrontier:
+    """A priority queue of URL IDs, highest score first.
+
+    URLs with equal scores are served in insertion order. Pushing a URL that
+    is already queued re-prioritizes it if the new score is higher; the
+    outdated heap entry is invalidated rather than removed.
+
+    This class is thread-safe.
+    """
+
+    _REMOVED = -1
+
+    def __init__(self) -> None:
+        """Initialize an empty frontier."""
+        self._heap: list[list[float | int]] = []
+        self._entries: dict[int, list[float | int]] = {}
+        self._counter = itertools.count()
+        self._lock = new_lock("PriorityFrontier")
+
+    def push(self, url_id: int, depth: int, score: float = 0.0) -> bool:
+        """Queue a URL or raise the priority of an already queued one.
+
+        A re-prioritized URL keeps the shallowest depth it was queued at.
+
+        Args:
+            url_id: ID of the URL in the URL table.
+            depth: Crawl depth of the URL.
+            score: Priority of the URL; higher scores are popped first.
+
+        Returns:
+            True if the URL was queued or re-prioritized, False otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(url_id)
+            if entry is not None:
+                if -entry[0] >= score:
+                    return False
+                entry[2] = self._REMOVED
+                depth = min(depth, int(entry[3]))
+            entry = [-score, next(self._counter), url_id, depth]
+            self._entries[url_id] = entry
+            heapq.heappush(self._heap, entry)
+            return True
+
+    def pop(self) -> tuple[int, int]:
+        """Remove and return the highest priority URL.
+
+        Returns:
+            A tuple of (url_id, depth).
+
+        Raises:
+            IndexError: If the frontier is empty.
+        """
+        with self._lock:
+            while self._heap:
+                _, _, url_id, depth = heapq.heappop(self._heap)
+                if url_id != self._REMOVED:
+                    del self._entries[int(url_id)]
+                    return int(url_id), int(depth)
+            raise IndexError("pop from an empty frontier")
+
+    def __contains__(self, url_id: object) -> bool:
+        """Check whether a URL ID is queued."""
+        with self._lock:
+            return url_id in self._entries
+
+    def __len__(self) -> int:
+        """Return the number of queued URLs."""
+        with self._lock:
+            return len(self._entries)
+
+    def __bool__(self) -> bool:
+        """Return True if any URL is queued."""
+        return len(self) > 0
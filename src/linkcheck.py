@@ -0,0 +1,318 @@
+"""Broken link checking.
+
+``LinkChecker`` checks whether links are alive without downloading their
+bodies: each URL gets a ``HEAD`` request, falling back to a ``GET`` of its
+first byte for servers that refuse ``HEAD``. Results are cached by URL
+(without fragment), so each link is checked once per checker however many
+pages refer to it, and the referring pages of broken links are kept for the
+report. Links a crawl is going to fetch anyway are deferred rather than
+checked: the outcome of their fetch is recorded instead, and only those
+never fetched are checked once the crawl ends. A fetched link that redirects
+takes the outcome of its target, as if the redirect had been followed::
+
+    checker = LinkChecker()
+    Webcrawler(url, depth, link_checker=checker).crawl()
+    checker.wait()
+    for link in checker.broken():
+        print(link.status, link.url, link.referrers)
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import urllib.parse
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError
+from urllib.request import Request, build_opener
+
+from src.dns import open_connection, system_resolver
+from src.locktrace import new_lock
+from src.threading_utils import ThreadSafeCounter, shared_pool
+from src.timeouts import TimeoutHTTPHandler, TimeoutHTTPSHandler, Timeouts
+from src.useragents import USER_AGENTS
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from src.dns import DNSCache
+    from src.threading_utils import WorkerPool
+    from src.useragents import BrowserType
+
+# Statuses of servers that reject or mishandle HEAD; the link is re-checked
+# with a ranged GET
+HEAD_FALLBACK_STATUSES: frozenset[int] = frozenset({400, 403, 405, 501})
+
+# Links with other schemes (mailto:, tel:, javascript:) are not checked
+CHECKED_SCHEMES: tuple[str, ...] = ("http", "https")
+
+
+@dataclass(frozen=True, slots=True)
+class LinkStatus:
+    """The outcome of checking a link.
+
+    Attributes:
+        url: The checked URL, without fragment.
+        status: HTTP status of the response, None if none was received.
+        error: Description of the error, if the check failed.
+        method: The HTTP method of the final request.
+    """
+
+    url: str
+    status: int | None
+    error: str | None
+    method: str
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the link is alive."""
+        return self.error is None and self.status is not None and self.status < 400
+
+
+@dataclass(frozen=True, slots=True)
+class BrokenLink:
+    """A broken link and the pages referring to it.
+
+    Attributes:
+        url: The broken URL.
+        status: HTTP status of the response, None if none was received.
+        error: Description of the error.
+        referrers: Pages linking to the URL, in discovery order.
+    """
+
+    url: str
+    status: int | None
+    error: str | None
+    referrers: tuple[str, ...]
+
+
+def link_key(url: str) -> str | None:
+    """Return the cache key of a link, or None if it is not checked."""
+    url, _ = urllib.parse.urldefrag(url)
+    if urllib.parse.urlsplit(url).scheme not in CHECKED_SCHEMES:
+        return None
+    return url
+
+
+class LinkChecker:
+    """A thread-safe, caching checker of link liveness.
+
+    Links are checked in the background on a worker pool as they are
+    submitted; ``wait`` blocks until every submitted link is checked.
+    """
+
+    def __init__(
+        self,
+        browser: BrowserType = "chromium",
+        *,
+        timeouts: Timeouts | None = None,
+        dns_cache: DNSCache | None = None,
+        pool: WorkerPool | None = None,
+    ) -> None:
+        """Initialize the checker.
+
+        Args:
+            browser: Browser User-Agent to use.
+            timeouts: Connect and read timeouts of each check. Defaults to
+                ``Timeouts()``.
+            dns_cache: Optional shared DNS cache used to resolve hosts.
+            pool: Pool to check links on. Defaults to ``shared_pool()``.
+        """
+        self.agent: str = USER_AGENTS.get(browser, USER_AGENTS["chromium"])
+        self.timeouts: Timeouts = timeouts if timeouts is not None else Timeouts()
+        self.pool: WorkerPool = pool or shared_pool()
+        resolver = dns_cache.resolve if dns_cache is not None else system_resolver
+        connect = partial(open_connection, resolver=resolver)
+        self._opener = build_opener(
+            TimeoutHTTPHandler(self.timeouts.read, connect),
+            TimeoutHTTPSHandler(self.timeouts.read, connect),
+        )
+        self._results: dict[str, LinkStatus] = {}
+        self._pending: dict[str, Future[None]] = {}
+        # Links expected to be recorded by a fetch, in submission order
+        self._deferred: dict[str, None] = {}
+        # Redirecting links waiting on the outcome of their target
+        self._redirected: dict[str, list[str]] = {}
+        # Referrers are dropped once a link is known to be alive
+        self._referrers: dict[str, list[str]] = {}
+        self._lock = new_lock("LinkChecker")
+        self._requests = ThreadSafeCounter()
+
+    @property
+    def requests(self) -> int:
+        """Get the number of HTTP requests made."""
+        return self._requests.value
+
+    def __len__(self) -> int:
+        """Return the number of links checked."""
+        with self._lock:
+            return len(self._results)
+
+    def _open(self, url: str, method: str) -> tuple[int | None, Exception | None]:
+        """Send a bodiless request and return its status and error."""
+        request = Request(url, headers={"User-Agent": self.agent}, method=method)
+        if method == "GET":
+            request.add_header("Range", "bytes=0-0")
+        self._requests.increment()
+        try:
+            with self._opener.open(request, timeout=self.timeouts.connect) as response:
+                return response.status, None
+        except HTTPError as error:
+            error.close()
+            return error.code, error
+        except Exception as error:
+            return None, error
+
+    def _request(self, url: str) -> LinkStatus:
+        """Check a link with HEAD, falling back to a ranged GET."""
+        method = "HEAD"
+        status, error = self._open(url, method)
+        if status in HEAD_FALLBACK_STATUSES:
+            method = "GET"
+            status, error = self._open(url, method)
+        return LinkStatus(url, status, None if error is None else str(error), method)
+
+    def _store(self, result: LinkStatus) -> None:
+        """Cache a result, forgetting the referrers of a live link.
+
+        Links redirecting to the URL get the same outcome.
+        """
+        with self._lock:
+            self._results[result.url] = result
+            self._pending.pop(result.url, None)
+            self._deferred.pop(result.url, None)
+            if result.ok:
+                self._referrers.pop(result.url, None)
+            sources = self._redirected.pop(result.url, [])
+        for source in sources:
+            self._store(LinkStatus(source, result.status, result.error, result.method))
+
+    def _check_pending(self, key: str) -> None:
+        """Check a submitted link on a worker thread."""
+        try:
+            result = self._request(key)
+        except Exception as e:
+            result = LinkStatus(key, None, str(e), "HEAD")
+        self._store(result)
+
+    def check(self, url: str) -> LinkStatus | None:
+        """Check a link now, or return its cached result.
+
+        Returns:
+            The status of the link, or None if its scheme is not checked.
+        """
+        key = link_key(url)
+        if key is None:
+            return None
+        with self._lock:
+            cached = self._results.get(key)
+        if cached is not None:
+            return cached
+        result = self._request(key)
+        self._store(result)
+        return result
+
+    def _refer(self, key: str, referrer: str | None) -> LinkStatus | None:
+        """Record a referrer of a link and return its cached result.
+
+        Must be called with the lock held.
+        """
+        cached = self._results.get(key)
+        if referrer is not None and (cached is None or not cached.ok):
+            self._referrers.setdefault(key, []).append(referrer)
+        return cached
+
+    def submit(self, url: str, referrer: str | None = None) -> None:
+        """Queue a link for checking, recording the page referring to it.
+
+        Links already checked or queued are not checked again.
+        """
+        key = link_key(url)
+        if key is None:
+            return
+        with self._lock:
+            if self._refer(key, referrer) is not None or key in self._pending:
+                return
+            self._deferred.pop(key, None)
+            self._pending[key] = self.pool.submit(self._check_pending, key)
+
+    def defer(self, url: str, referrer: str | None = None) -> None:
+        """Record a link that is going to be fetched, without checking it.
+
+        The outcome of the fetch is expected through ``record``; deferred
+        links that are never recorded are checked by ``check_deferred``.
+        """
+        key = link_key(url)
+        if key is None:
+            return
+        with self._lock:
+            if self._refer(key, referrer) is None and key not in self._pending:
+                self._deferred[key] = None
+
+    def redirect(self, url: str, target: str) -> None:
+        """Record that a fetched link redirects to a target that was not fetched.
+
+        The link takes the outcome of the target once it is known. Both stay
+        deferred until then, so a link whose target is never fetched is
+        checked by ``check_deferred``, following its redirects.
+        """
+        key = link_key(url)
+        if key is None:
+            return
+        target_key = link_key(target)
+        if target_key is None:
+            # Redirects to other schemes are not followed by the checker either
+            self._store(LinkStatus(key, None, f"Redirect to {target}", "GET"))
+            return
+        with self._lock:
+            cached = self._results.get(target_key)
+            if cached is None:
+                self._redirected.setdefault(target_key, []).append(key)
+                self._deferred.setdefault(key)
+                if target_key not in self._pending:
+                    self._deferred.setdefault(target_key)
+        if cached is not None:
+            self._store(LinkStatus(key, cached.status, cached.error, cached.method))
+
+    def check_deferred(self) -> None:
+        """Queue the deferred links that were not fetched for checking."""
+        with self._lock:
+            keys = list(self._deferred)
+        for key in keys:
+            self.submit(key)
+
+    def record(self, url: str, status: int | None, error: Exception | None) -> None:
+        """Cache the outcome of a full fetch of a URL, such as a crawled page."""
+        key = link_key(url)
+        if key is not None:
+            self._store(LinkStatus(key, status, None if error is None else str(error), "GET"))
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until every submitted link is checked.
+
+        Raises:
+            TimeoutError: If links are still pending after ``timeout`` seconds.
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                return
+            _, not_done = concurrent.futures.wait(pending, timeout)
+            if not_done:
+                raise TimeoutError(f"{len(not_done)} links are still being checked")
+
+    def broken(self) -> list[BrokenLink]:
+        """Return the broken links checked so far, sorted by URL."""
+        with self._lock:
+            return [
+                BrokenLink(
+                    url,
+                    result.status,
+                    result.error,
+                    tuple(self._referrers.get(url, ())),
+                )
+                for url, result in sorted(self._results.items())
+                if not result.ok
+            ]
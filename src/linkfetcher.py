@@ -1,50 +1,35 @@
 """Linkfetcher Class."""
 
 
-import threading
-import urllib.parse
-import urllib.request
+import time
+from array import array
 from collections.abc import Iterator
-from html import escape
-from typing import Literal
+from contextlib import AbstractContextManager
+from email.message import Message
+from functools import partial
+from http import HTTPStatus
 from urllib.error import HTTPError, URLError
 from urllib.request import OpenerDirector, Request, build_opener
 
-from bs4 import BeautifulSoup
-from rich.progress import track
-
 from src import LOGGER, __version__
+from src.cache import CacheMissError, ResponseCache
+from src.dns import DNSCache, open_connection, system_resolver
+from src.extract import ANCHORS, ExtractionSpec, Link
+from src.locktrace import new_lock
+from src.metrics import FetchTimings
+from src.profiling import NO_STAGE, StageProfiler
+from src.recrawl import CrawlHistory
+from src.redirects import RedirectingHandler, RedirectMap
+from src.resources import ResourceFilter
 from src.threading_utils import ThreadSafeList
+from src.timeouts import Deadline, TimeoutHTTPHandler, TimeoutHTTPSHandler, Timeouts
+from src.urltable import URLTable
+from src.useragents import USER_AGENTS, BrowserType
+from src.warc import WarcWriter
 
-# Browser User-Agent strings (latest stable versions as of 2025)
-USER_AGENTS: dict[str, str] = {
-    "chromium": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    ),
-    "firefox": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:134.0) "
-        "Gecko/20100101 Firefox/134.0"
-    ),
-    "brave": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36 Brave/131"
-    ),
-    "safari": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) "
-        "AppleWebKit/605.1.15 (KHTML, like Gecko) "
-        "Version/18.2 Safari/605.1.15"
-    ),
-    "edge": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0"
-    ),
-}
-
-BrowserType = Literal["chromium", "firefox", "brave", "safari", "edge"]
+# Response bodies are read with read1() in chunks of at most this size, so a
+# trickling body returns control often enough to check the total deadline
+READ_CHUNK_SIZE = 65536
 
 
 class Linkfetcher:
@@ -60,6 +45,18 @@ class Linkfetcher:
         browser: BrowserType = "chromium",
         *,
         thread_safe: bool = False,
+        url_table: URLTable | None = None,
+        timeouts: Timeouts | None = None,
+        dns_cache: DNSCache | None = None,
+        profiler: StageProfiler | None = None,
+        resource_filter: ResourceFilter | None = None,
+        cache: ResponseCache | None = None,
+        warc: WarcWriter | None = None,
+        history: CrawlHistory | None = None,
+        extraction: ExtractionSpec = ANCHORS,
+        redirects: RedirectMap | None = None,
+        max_redirects: int = RedirectingHandler.max_redirections,
+        follow_redirects: bool = True,
     ) -> None:
         """Initialize the Linkfetcher.
 
@@ -67,39 +64,97 @@ class Linkfetcher:
             url: The URL to fetch links from.
             browser: Browser User-Agent to use.
             thread_safe: If True, use thread-safe data structures internally.
+            url_table: Shared URL table to intern discovered URLs into. A
+                private table is created when omitted.
+            timeouts: Connect, read and total timeouts of the fetch. Defaults
+                to ``Timeouts()``.
+            dns_cache: Optional shared DNS cache used to resolve hosts.
+            profiler: Optional profiler timing the stages of the fetch.
+            resource_filter: Optional filter of the response ``Content-Type``.
+                Responses it rejects are closed without reading the body and
+                marked as ``skipped``.
+            cache: Optional response cache. Fresh cached responses are used
+                instead of the network, and fetched responses are stored.
+            warc: Optional WARC writer the responses read from the network
+                are archived to.
+            history: Optional crawl history the bodies read from the network
+                are recorded into.
+            extraction: Which links to extract from the page, and which of
+                them to follow. Defaults to anchors only.
+            redirects: Optional redirect map the redirect chain of the fetch
+                is recorded into.
+            max_redirects: Maximum number of redirects followed.
+            follow_redirects: If False, a redirect is not followed: the fetch
+                ends with its status, no links and ``redirect_to`` set.
         """
         self.url: str = url
         self._thread_safe = thread_safe
-        self._lock = threading.Lock()
+        self._lock = new_lock("Linkfetcher")
+        self.url_table: URLTable = url_table if url_table is not None else URLTable()
+        self.timeouts: Timeouts = timeouts if timeouts is not None else Timeouts()
+        self.dns_cache: DNSCache | None = dns_cache
+        self.profiler: StageProfiler | None = profiler
+        self.resource_filter: ResourceFilter | None = resource_filter
+        self.cache: ResponseCache | None = cache
+        self.warc: WarcWriter | None = warc
+        self.history: CrawlHistory | None = history
+        self.extraction: ExtractionSpec = extraction
+        self.redirects: RedirectMap | None = redirects
+        self.max_redirects: int = max_redirects
+        self.follow_redirects: bool = follow_redirects
+        self._redirect_handler: RedirectingHandler | None = None
+
+        # Discovered URLs are held as IDs into the (possibly shared) URL table
+        self._ids: array[int] = array("q")
+        self._seen: set[int] = set()
 
         # Use thread-safe collections when requested
         if thread_safe:
-            self._urls_safe: ThreadSafeList[str] = ThreadSafeList()
             self._broken_urls_safe: ThreadSafeList[str] = ThreadSafeList()
         else:
-            self._urls: list[str] = []
             self._broken_urls: list[str] = []
 
+        self.status: int | None = None
+        self.error: Exception | None = None
+        self.content_type: str | None = None
+        self.skipped: bool = False
+        # The URL that served the page, after redirects
+        self.final_url: str = url
+        self.hops: int = 0
+        # The target of a redirect that was not followed
+        self.redirect_to: str | None = None
+        # Every link extracted from the page, followed or not
+        self.links: list[Link] = []
+        self.timings: FetchTimings = FetchTimings()
+
         self.__version__: str = __version__
         self.browser: BrowserType = browser
         self.agent: str = USER_AGENTS.get(browser, USER_AGENTS["chromium"])
 
+    @property
+    def ids(self) -> array[int]:
+        """Get the IDs of the discovered URLs in the URL table."""
+        if self._thread_safe:
+            with self._lock:
+                return array("q", self._ids)
+        return self._ids
+
     @property
     def urls(self) -> list[str]:
         """Get the list of discovered URLs."""
-        if self._thread_safe:
-            return self._urls_safe.to_list()
-        return self._urls
+        return list(self.url_table.materialize(self.ids))
 
     @urls.setter
     def urls(self, value: list[str]) -> None:
         """Set the URLs list."""
+        ids = array("q", map(self.url_table.intern, value))
         if self._thread_safe:
             with self._lock:
-                self._urls_safe = ThreadSafeList()
-                self._urls_safe.extend(value)
+                self._ids = ids
+                self._seen = set(ids)
         else:
-            self._urls = value
+            self._ids = ids
+            self._seen = set(ids)
 
     @property
     def broken_urls(self) -> list[str]:
@@ -124,22 +179,15 @@ class Linkfetcher:
 
     def __getitem__(self, x: int) -> str:
         """Get item by index."""
-        if self._thread_safe:
-            return self._urls_safe.to_list()[x]
-        return self._urls[x]
+        return self.url_table[self.ids[x]]
 
     def __len__(self) -> int:
         """Return the number of URLs found."""
-        if self._thread_safe:
-            return len(self._urls_safe)
-        return len(self._urls)
+        return len(self._ids)
 
     def __iter__(self) -> Iterator[str]:
         """Iterate over the URLs."""
-        if self._thread_safe:
-            yield from self._urls_safe
-        else:
-            yield from self._urls
+        yield from self.url_table.materialize(self.ids)
 
     def open(self) -> tuple[Request, OpenerDirector]:
         """Open the URL with urllib.request.
@@ -149,9 +197,26 @@ class Linkfetcher:
         """
         url = self.url
         request = Request(url)
-        handle = build_opener()
+        resolver = (
+            self.dns_cache.resolve if self.dns_cache is not None else system_resolver
+        )
+        connect = partial(open_connection, resolver=resolver, timings=self.timings)
+        self._redirect_handler = RedirectingHandler(
+            self.max_redirects, follow=self.follow_redirects
+        )
+        handle = build_opener(
+            TimeoutHTTPHandler(self.timeouts.read, connect),
+            TimeoutHTTPSHandler(self.timeouts.read, connect),
+            self._redirect_handler,
+        )
         return (request, handle)
 
+    def _stage(self, name: str) -> AbstractContextManager[object]:
+        """Time a block as a profiler stage, if profiling is enabled."""
+        if self.profiler is None:
+            return NO_STAGE
+        return self.profiler.stage(name)
+
     def _add_url(self, url: str) -> bool:
         """Add a URL to the collection if not already present.
 
@@ -161,19 +226,20 @@ class Linkfetcher:
         Returns:
             True if the URL was added, False if it was already present.
         """
+        url_id = self.url_table.intern(url)
         if self._thread_safe:
             # Use lock for thread-safe check-then-add
             with self._lock:
-                current = self._urls_safe.to_list()
-                if url not in current:
-                    self._urls_safe.append(url)
-                    return True
-                return False
-        else:
-            if url not in self._urls:
-                self._urls.append(url)
-                return True
+                return self._add_id(url_id)
+        return self._add_id(url_id)
+
+    def _add_id(self, url_id: int) -> bool:
+        """Record a URL ID unless it was already discovered on this page."""
+        if url_id in self._seen:
             return False
+        self._seen.add(url_id)
+        self._ids.append(url_id)
+        return True
 
     def _add_broken_url(self, url: str) -> None:
         """Add a broken URL to the collection."""
@@ -182,41 +248,195 @@ class Linkfetcher:
         else:
             self._broken_urls.append(url)
 
+    def _rejected(self, start: float) -> bool:
+        """Check the response Content-Type against the resource filter.
+
+        A rejected response is marked as skipped.
+        """
+        resource_filter = self.resource_filter
+        if resource_filter is None or resource_filter.allow_type(self.content_type):
+            return False
+        self.skipped = True
+        self.timings.total = time.perf_counter() - start
+        LOGGER.debug("Skipping %s (%s)", self.url, self.content_type)
+        return True
+
+    def _redirected(self, final_url: str) -> None:
+        """Record the redirect chain that led to the final URL, if any."""
+        self.final_url = final_url
+        handler = self._redirect_handler
+        if handler is None or not handler.chain:
+            return
+        self.hops = len(handler.chain) - 1
+        if self.redirects is not None:
+            self.redirects.record(handler.chain)
+
+    def _download(
+        self, handle: OpenerDirector, request: Request, start: float
+    ) -> bytes | None:
+        """Fetch the response body, from the response cache if possible.
+
+        Args:
+            handle: Opener used on a cache miss.
+            request: The request of the page.
+            start: ``time.perf_counter()`` at the start of the fetch.
+
+        Returns:
+            The body, or None if the resource filter rejected the response or
+            a redirect was not followed.
+
+        Raises:
+            HTTPError: For error responses, including cached ones.
+            CacheMissError: If the page is not cached in replay mode.
+        """
+        timings = self.timings
+        cache = self.cache
+        cached = cache.get(self.url) if cache is not None else None
+        if cached is not None and cached.location is not None and self.follow_redirects:
+            # Only redirects that were not followed are cached, and the
+            # page they lead to is not cached under this URL
+            cached = None
+        if cached is not None:
+            timings.ttfb = time.perf_counter() - start
+            self.status = cached.status
+            self.content_type = cached.content_type
+            if cached.location is not None:
+                self.redirect_to = cached.location
+                if self.redirects is not None:
+                    self.redirects.record([self.url, cached.location])
+                return None
+            if cached.status >= 400:
+                headers = Message()
+                if cached.content_type is not None:
+                    headers["Content-Type"] = cached.content_type
+                status = cached.status
+                reason = HTTPStatus(status).phrase if status in HTTPStatus else ""
+                raise HTTPError(self.url, cached.status, reason, headers, None)
+            return None if self._rejected(start) else cached.body
+        if cache is not None and cache.replay:
+            self.error = CacheMissError(f"{self.url} is not in the response cache")
+            LOGGER.warning("%s", self.error)
+            raise self.error
+
+        deadline = Deadline(self.timeouts.total)
+        try:
+            with self._stage("request"):
+                response = handle.open(request, timeout=self.timeouts.connect)
+        except HTTPError as error:
+            handler = self._redirect_handler
+            if handler is not None and handler.location is not None:
+                with error:
+                    timings.ttfb = time.perf_counter() - start
+                    body = error.read()
+                self.status = error.code
+                self.redirect_to = handler.location
+                if self.redirects is not None:
+                    self.redirects.record(handler.chain)
+                content_type = error.headers.get("Content-Type")
+                if cache is not None:
+                    cache.put(self.url, error.code, content_type, location=handler.location)
+                if self.warc is not None:
+                    self.warc.write_response(
+                        self.url, error.code, error.reason, error.headers.items(), body
+                    )
+                return None
+            # A failed redirect chain (too long, or looping) has no final URL
+            if error.code >= 400:
+                self._redirected(error.url)
+            # Server errors are transient and not worth replaying
+            if cache is not None and error.code < 500:
+                cache.put(self.url, error.code, error.headers.get("Content-Type"))
+            raise
+        with response, self._stage("read"):
+            timings.ttfb = time.perf_counter() - start
+            self._redirected(response.url)
+            self.status = response.status
+            self.content_type = response.headers.get("Content-Type")
+            if self._rejected(start):
+                # Closing the response abandons the body unread
+                return None
+            chunks: list[bytes] = []
+            while chunk := response.read1(READ_CHUNK_SIZE):
+                chunks.append(chunk)
+                deadline.check(f"Fetching {self.url}")
+        body = b"".join(chunks)
+        if cache is not None:
+            cache.put(self.url, response.status, self.content_type, body)
+        if self.warc is not None:
+            self.warc.write_response(
+                response.url,
+                response.status,
+                response.reason,
+                response.headers.items(),
+                body,
+            )
+        if self.history is not None:
+            self.history.observe(self.url, body)
+        return body
+
     def _get_crawled_urls(self, handle: OpenerDirector, request: Request) -> None:
         """Parse HTML content and extract URLs.
 
         Main method where the crawler HTML content is parsed with
-        BeautifulSoup and URLs are extracted from anchor tags.
+        BeautifulSoup in a single pass, and the links named by the extraction
+        spec are extracted and resolved against the document base URL.
 
         This method is thread-safe when thread_safe=True is set during init.
         """
+        # Deferred so that importing the module (e.g. for the CLI) stays cheap
+        from rich.progress import track
+
+        timings = self.timings
+        stage = self._stage
+        spec = self.extraction
+        start = time.perf_counter()
         try:
-            content = handle.open(request).read().decode("utf-8", errors="replace")
-            soup = BeautifulSoup(content, "html.parser")
-            tags = soup("a")
-            for tag in track(tags):
-                href = tag.get("href")
-                if isinstance(href, str):
-                    url = urllib.parse.urljoin(self.url, escape(href))
+            body = self._download(handle, request, start)
+            if body is None:
+                return
+            parsing = time.perf_counter()
+            timings.total = parsing - start
+            timings.bytes = len(body)
+            with stage("parse"):
+                content = body.decode("utf-8", errors="replace")
+                base, tags = spec.parse(content, self.final_url)
+            with stage("extract"):
+                # rich allows only one live progress display at a time, so
+                # concurrent fetchers iterate without one
+                self.links = list(
+                    spec.links(tags if self._thread_safe else track(tags), base)
+                )
+                urls = [link.url for link in self.links if link.kind in spec.follow]
+            with stage("dedup"):
+                for url in urls:
                     self._add_url(url)
+            timings.parse = time.perf_counter() - parsing
 
         except HTTPError as error:
+            # The error response headers are the first and only bytes read
+            timings.ttfb = timings.total = time.perf_counter() - start
+            self.status = error.code
+            self.error = error
             self._add_broken_url(error.url)
             if error.code == 404:
                 LOGGER.warning("%s -> %s", error, error.url)
             else:
                 LOGGER.warning("%s for %s", error, error.url)
 
-        except URLError as error:
-            LOGGER.fatal("%s for %s", error, self.url)
-            raise URLError("URL entered is Incorrect") from error
+        except (URLError, TimeoutError) as error:
+            # Reported by the caller, once retries are exhausted
+            timings.total = time.perf_counter() - start
+            self.error = error
+            LOGGER.debug("Fetching %s failed: %s", self.url, error)
+            raise
 
     def linkfetch(self) -> None:
         """Fetch all links from the URL.
 
         Public method to call the internal methods for link fetching.
         """
-        request, handle = self.open()
+        with self._stage("open"):
+            request, handle = self.open()
         self._add_headers(request)
         if handle:
             self._get_crawled_urls(handle, request)
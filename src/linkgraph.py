@@ -0,0 +1,290 @@
+"""Link graph export and analysis.
+
+The crawler records every source -> target edge it observes as a pair of
+URL table IDs. Edges are streamed to a compact binary file and the URL of
+each ID is appended to a companion nodes file, so a graph of any size can
+be written in constant memory and later memory-mapped for analysis.
+
+On-disk layout for a graph written to ``<path>``:
+
+- ``<path>.edges``: an 8 byte magic header followed by little-endian
+  ``uint32`` (source, target) pairs.
+- ``<path>.nodes``: one UTF-8 URL per ``\\n``-terminated line, line number
+  ``n`` being URL ID ``n``. Backslashes, line feeds and carriage returns
+  within URLs are escaped as ``\\\\``, ``\\n`` and ``\\r``.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from types import TracebackType
+
+    from src.urltable import URLTable
+
+MAGIC = b"PCLGRAPH"
+
+_ESCAPES = {"\\": "\\\\", "\n": "\\n", "\r": "\\r"}
+_UNESCAPES = {"\\": "\\", "n": "\n", "r": "\r"}
+_ESCAPED = re.compile(r"[\\\n\r]")
+_UNESCAPED = re.compile(r"\\(.)")
+
+
+def _little_endian(values: array[int]) -> array[int]:
+    """Return the array in little-endian byte order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def _escape(url: str) -> str:
+    """Escape the characters that would break a URL across lines."""
+    return _ESCAPED.sub(lambda match: _ESCAPES[match[0]], url)
+
+
+def _unescape(line: str) -> str:
+    """Reverse ``_escape``."""
+    return _UNESCAPED.sub(lambda match: _UNESCAPES.get(match[1], match[0]), line)
+
+
+class LinkGraphWriter:
+    """Stream link graph edges to disk.
+
+    Edges are buffered in an ``array`` and flushed in blocks. The writer is
+    fed from the crawl scheduling thread only and needs no locking.
+    """
+
+    def __init__(self, path: str | Path, *, buffer_size: int = 65536) -> None:
+        """Open the graph files for writing.
+
+        Args:
+            path: Base path of the graph; ``.edges`` and ``.nodes`` are appended.
+            buffer_size: Number of edges to buffer before flushing to disk.
+        """
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.url_table: URLTable | None = None
+        self.edge_count = 0
+        self._buffer: array[int] = array("I")
+        self._nodes_written = 0
+        self._edges: BinaryIO = Path(f"{path}.edges").open("wb")  # noqa: SIM115
+        self._nodes: BinaryIO = Path(f"{path}.nodes").open("wb")  # noqa: SIM115
+        self._edges.write(MAGIC)
+
+    def attach(self, url_table: URLTable) -> None:
+        """Attach the URL table the edge IDs refer to."""
+        self.url_table = url_table
+
+    def add_edges(self, source: int, targets: Iterable[int]) -> None:
+        """Record edges from one source page to each of its targets.
+
+        Args:
+            source: URL ID of the page the links were found on.
+            targets: URL IDs of the linked pages.
+        """
+        buffer = self._buffer
+        for target in targets:
+            buffer.append(source)
+            buffer.append(target)
+            self.edge_count += 1
+        if len(buffer) >= self.buffer_size * 2:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered edges and any newly interned node URLs to disk."""
+        if self._buffer:
+            self._edges.write(_little_endian(self._buffer).tobytes())
+            self._buffer = array("I")
+        if self.url_table is not None:
+            end = len(self.url_table)
+            for url_id in range(self._nodes_written, end):
+                url = _escape(self.url_table[url_id])
+                self._nodes.write(url.encode("utf-8") + b"\n")
+            self._nodes_written = end
+        self._edges.flush()
+        self._nodes.flush()
+
+    def close(self) -> None:
+        """Flush remaining data and close the graph files."""
+        if self._edges.closed:
+            return
+        self.flush()
+        self._edges.close()
+        self._nodes.close()
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the writer on exit."""
+        self.close()
+
+
+class LinkGraph:
+    """A memory-mapped link graph written by ``LinkGraphWriter``.
+
+    Edges stay in the memory-mapped file; derived structures such as the
+    compressed sparse row (CSR) adjacency are built lazily on first use.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Memory-map a graph written to ``path``.
+
+        Args:
+            path: Base path of the graph, as given to ``LinkGraphWriter``.
+
+        Raises:
+            ValueError: If the edges file does not carry the expected header.
+        """
+        self.path = Path(path)
+        with Path(f"{path}.edges").open("rb") as handle:
+            size = Path(f"{path}.edges").stat().st_size
+            self._mmap = (
+                mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                if size
+                else None
+            )
+        if self._mmap is None or self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}.edges is not a link graph file")
+        self._view = memoryview(self._mmap)[len(MAGIC) :]
+        self._pairs: memoryview | array[int]
+        if sys.byteorder == "big":
+            self._pairs = _little_endian(array("I", self._view.tobytes()))
+        else:
+            self._pairs = self._view.cast("I")
+        nodes_path = Path(f"{path}.nodes")
+        # Not str.splitlines(), which also splits at U+2028, U+0085 and others
+        lines = nodes_path.read_bytes().split(b"\n")[:-1] if nodes_path.exists() else []
+        self._urls = [_unescape(line.decode("utf-8")) for line in lines]
+        highest = max(self._pairs) + 1 if len(self._pairs) else 0
+        self.node_count: int = max(len(self._urls), highest)
+        self._csr: tuple[array[int], array[int]] | None = None
+
+    @property
+    def edge_count(self) -> int:
+        """Get the number of edges in the graph."""
+        return len(self._pairs) // 2
+
+    def url(self, node: int) -> str:
+        """Return the URL of a node ID."""
+        return self._urls[node]
+
+    def edges(self) -> Iterator[tuple[int, int]]:
+        """Iterate over (source, target) pairs."""
+        pairs = self._pairs
+        for i in range(0, len(pairs), 2):
+            yield pairs[i], pairs[i + 1]
+
+    def in_degree(self) -> array[int]:
+        """Return the number of inbound links of every node."""
+        degrees = array("I", bytes(4 * self.node_count))
+        pairs = self._pairs
+        for i in range(1, len(pairs), 2):
+            degrees[pairs[i]] += 1
+        return degrees
+
+    def out_degree(self) -> array[int]:
+        """Return the number of outbound links of every node."""
+        degrees = array("I", bytes(4 * self.node_count))
+        pairs = self._pairs
+        for i in range(0, len(pairs), 2):
+            degrees[pairs[i]] += 1
+        return degrees
+
+    def csr(self) -> tuple[array[int], array[int]]:
+        """Return the outbound adjacency in compressed sparse row form.
+
+        Returns:
+            A tuple of ``offsets`` and ``targets`` arrays where the targets of
+            node ``n`` are ``targets[offsets[n]:offsets[n + 1]]``.
+        """
+        if self._csr is None:
+            offsets = array("Q", bytes(8 * (self.node_count + 1)))
+            for node, degree in enumerate(self.out_degree()):
+                offsets[node + 1] = offsets[node] + degree
+            cursor = array("Q", offsets[:-1])
+            targets = array("I", bytes(4 * self.edge_count))
+            for source, target in self.edges():
+                targets[cursor[source]] = target
+                cursor[source] += 1
+            self._csr = (offsets, targets)
+        return self._csr
+
+    def orphans(self) -> list[int]:
+        """Return the IDs of nodes that no other node links to."""
+        return [node for node, degree in enumerate(self.in_degree()) if degree == 0]
+
+    def pagerank(
+        self, damping: float = 0.85, iterations: int = 30, tolerance: float = 1e-9
+    ) -> array[float]:
+        """Rank nodes with the PageRank power iteration.
+
+        Rank held by nodes without outbound links is spread evenly across
+        all nodes.
+
+        Args:
+            damping: Probability of following a link rather than jumping.
+            iterations: Maximum number of power iterations.
+            tolerance: Stop once the total rank change drops below this.
+
+        Returns:
+            The rank of every node, summing to one.
+        """
+        n = self.node_count
+        if n == 0:
+            return array("d")
+        offsets, targets = self.csr()
+        ranks = array("d", [1.0 / n]) * n
+        for _ in range(iterations):
+            dangling = 0.0
+            contributions = array("d", bytes(8 * n))
+            for node in range(n):
+                start, end = offsets[node], offsets[node + 1]
+                if start == end:
+                    dangling += ranks[node]
+                    continue
+                share = ranks[node] / (end - start)
+                for i in range(start, end):
+                    contributions[targets[i]] += share
+            base = (1.0 - damping) / n + damping * dangling / n
+            new_ranks = array("d", (base + damping * c for c in contributions))
+            delta = sum(abs(a - b) for a, b in zip(new_ranks, ranks, strict=True))
+            ranks = new_ranks
+            if delta < tolerance:
+                break
+        return ranks
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if isinstance(self._pairs, memoryview):
+            self._pairs.release()
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the graph on exit."""
+        self.close()
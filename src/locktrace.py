@@ -0,0 +1,199 @@
+"""Opt-in lock contention tracing.
+
+Shared structures create their locks with ``new_lock(name)``. Normally this
+returns a plain ``threading.Lock``; while a ``LockTracer`` is active it
+returns a ``TracedLock`` that records, per lock name, every acquisition, the
+time spent waiting for the lock and the time it was held. All instances
+with the same name (say every ``ThreadSafeSet``) are aggregated together,
+which shows which shared structure limits scaling as threads are added.
+
+Tracing only affects locks created while the tracer is active, so it must
+be entered before the crawler and its structures are built::
+
+    with LockTracer() as tracer:
+        Webcrawler(url, depth, concurrent=True).crawl()
+    Console().print(tracer.report())
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Self
+
+from src.metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from rich.table import Table
+
+    from src.metrics import Histogram, HistogramSample
+
+# Uncontended lock operations take well under a microsecond
+LOCK_BUCKETS: tuple[float, ...] = (
+    1e-7,
+    2.5e-7,
+    5e-7,
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    1e-2,
+    1e-1,
+    1.0,
+)
+
+_active: LockTracer | None = None
+
+
+class TracedLock:
+    """A ``threading.Lock`` recording its wait and hold times."""
+
+    __slots__ = ("_acquired_at", "_contended", "_hold", "_labels", "_lock", "_wait", "name")
+
+    def __init__(self, name: str, tracer: LockTracer) -> None:
+        """Initialize the lock.
+
+        Args:
+            name: Name the lock's statistics are aggregated under.
+            tracer: Tracer recording the statistics.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._labels = (name,)
+        self._wait: Histogram = tracer.wait_seconds
+        self._hold: Histogram = tracer.hold_seconds
+        self._contended = tracer.contended
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Acquire the lock, recording how long the caller waited."""
+        if self._lock.acquire(False):
+            wait = 0.0
+        elif not blocking:
+            return False
+        else:
+            start = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            wait = time.perf_counter() - start
+            self._contended.inc(1, self._labels)
+        self._wait.observe(wait, self._labels)
+        self._acquired_at = time.perf_counter()
+        return True
+
+    def release(self) -> None:
+        """Release the lock, recording how long it was held."""
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        self._hold.observe(held, self._labels)
+
+    def locked(self) -> bool:
+        """Return True if the lock is held."""
+        return self._lock.locked()
+
+    def __enter__(self) -> bool:
+        """Acquire the lock."""
+        return self.acquire()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Release the lock."""
+        self.release()
+
+
+type Lock = threading.Lock | TracedLock
+
+
+def new_lock(name: str) -> Lock:
+    """Create a lock, traced if a ``LockTracer`` is active.
+
+    Args:
+        name: Name of the structure owning the lock, such as ``URLTable``.
+    """
+    tracer = _active
+    if tracer is None:
+        return threading.Lock()
+    return TracedLock(name, tracer)
+
+
+class LockTracer:
+    """Collect acquisition, wait and hold statistics of traced locks."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        """Initialize the tracer.
+
+        Args:
+            registry: Registry the lock metrics are registered into, so they
+                are exported with the crawl metrics. A private registry is
+                used when omitted.
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.wait_seconds = self.registry.histogram(
+            "pycrawler_lock_wait_seconds", "Time spent waiting for a lock", ("lock",), LOCK_BUCKETS
+        )
+        self.hold_seconds = self.registry.histogram(
+            "pycrawler_lock_hold_seconds", "Time a lock was held", ("lock",), LOCK_BUCKETS
+        )
+        self.contended = self.registry.counter(
+            "pycrawler_lock_contended_total", "Acquisitions that had to wait", ("lock",)
+        )
+        self._previous: LockTracer | None = None
+
+    def samples(self) -> dict[str, tuple[HistogramSample, HistogramSample, int]]:
+        """Return the (wait, hold, contended) statistics of every lock name."""
+        waits = self.wait_seconds.samples()
+        holds = self.hold_seconds.samples()
+        contended = self.contended.samples()
+        return {
+            labels[0]: (
+                waits[labels],
+                holds.get(labels, self.hold_seconds.sample(labels)),
+                int(contended.get(labels, 0)),
+            )
+            for labels in waits
+        }
+
+    def report(self) -> Table:
+        """Render lock statistics, most waited-for lock first."""
+        from rich.table import Table
+
+        table = Table(title="Lock contention")
+        columns = ("lock", "acquisitions", "contended", "wait ms", "wait p99 µs",
+                   "hold ms", "hold p99 µs")
+        for column in columns:
+            table.add_column(column, justify="left" if column == "lock" else "right")
+        rows = sorted(self.samples().items(), key=lambda item: -item[1][0].sum)
+        for name, (wait, hold, contended) in rows:
+            table.add_row(
+                name,
+                str(wait.count),
+                f"{contended / wait.count:.1%}" if wait.count else "-",
+                f"{wait.sum * 1000:.2f}",
+                f"{wait.quantile(0.99) * 1e6:.1f}",
+                f"{hold.sum * 1000:.2f}",
+                f"{hold.quantile(0.99) * 1e6:.1f}",
+            )
+        return table
+
+    def __enter__(self) -> Self:
+        """Trace the locks created until exit."""
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Stop tracing newly created locks."""
+        global _active
+        _active, self._previous = self._previous, None
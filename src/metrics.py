@@ -0,0 +1,547 @@
+"""Crawl metrics: counters, gauges and histograms with exporters.
+
+Metrics aggregate per thread: every thread updates its own shard without
+taking a lock, and shards are only summed when the registry is collected.
+This keeps recording cheap on the fetch hot path, with or without the GIL.
+Collected metrics are exported as Prometheus text or as JSON snapshots,
+optionally written periodically by a ``SnapshotWriter``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Literal, Self
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from types import TracebackType
+
+MetricType = Literal["counter", "gauge", "histogram"]
+type Labels = tuple[str, ...]
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class _Shards[S]:
+    """Per-thread shards of a metric.
+
+    Each thread writes only to its own shard. Shards of finished threads are
+    kept so their values are not lost.
+    """
+
+    def __init__(self, factory: Callable[[], S]) -> None:
+        self._factory = factory
+        self._local = threading.local()
+        self._all: list[S] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> S:
+        """Return the calling thread's shard, creating it on first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = self._factory()
+            with self._lock:
+                self._all.append(shard)
+            return shard
+
+    def all(self) -> list[S]:
+        """Return every shard."""
+        with self._lock:
+            return list(self._all)
+
+
+class Metric(ABC):
+    """Base class of registered metrics."""
+
+    type: MetricType
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        """Initialize the metric.
+
+        Args:
+            name: Metric name, such as ``pycrawler_fetch_seconds``.
+            help: Description of the metric.
+            labelnames: Names of the labels; values are passed positionally.
+        """
+        self.name = name
+        self.help = help
+        self.labelnames: tuple[str, ...] = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> dict[Labels, Any]:
+        """Return the current value of every label combination."""
+
+
+class Counter(Metric):
+    """A monotonically increasing value."""
+
+    type: MetricType = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        """Initialize the counter."""
+        super().__init__(name, help, labelnames)
+        self._shards: _Shards[dict[Labels, float]] = _Shards(dict)
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        """Increase the counter of a label combination."""
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        """Return the value of a label combination."""
+        return self.samples().get(labels, 0.0)
+
+    def samples(self) -> dict[Labels, float]:
+        """Return the summed value of every label combination."""
+        totals: dict[Labels, float] = {}
+        for shard in self._shards.all():
+            for labels, value in shard.copy().items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+
+class Gauge(Counter):
+    """A value that goes up and down.
+
+    ``inc`` and ``dec`` are aggregated per thread like a counter and may be
+    called from any thread. ``set`` replaces the value and is meant for a
+    single writer, such as the crawl scheduler. A gauge may instead be
+    computed by a function when it is collected.
+    """
+
+    type: MetricType = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        """Initialize the gauge."""
+        super().__init__(name, help, labelnames)
+        self._set: dict[Labels, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def dec(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        """Decrease the gauge of a label combination."""
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        """Set the gauge of a label combination."""
+        self._set[labels] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabelled) gauge with a function when collected."""
+        self._function = function
+
+    def samples(self) -> dict[Labels, float]:
+        """Return the value of every label combination."""
+        if self._function is not None:
+            return {(): self._function()}
+        totals = super().samples()
+        for labels, value in self._set.copy().items():
+            totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+
+@dataclass(frozen=True, slots=True)
+class HistogramSample:
+    """Collected state of a histogram.
+
+    Attributes:
+        buckets: Upper bounds of the buckets, without ``+Inf``.
+        counts: Observations per bucket, non-cumulative; the last entry
+            counts observations above the highest bound.
+        sum: Sum of all observations.
+        count: Number of observations.
+    """
+
+    buckets: tuple[float, ...]
+    counts: tuple[int, ...]
+    sum: float
+    count: int
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Histogram(Metric):
+    """Observations counted into buckets."""
+
+    type: MetricType = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name.
+            help: Description of the metric.
+            labelnames: Names of the labels.
+            buckets: Increasing upper bounds of the buckets.
+        """
+        super().__init__(name, help, labelnames)
+        self.buckets: tuple[float, ...] = tuple(buckets)
+        # Per label combination: bucket counts followed by [sum, count]
+        self._shards: _Shards[dict[Labels, list[float]]] = _Shards(dict)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Record an observation."""
+        shard = self._shards.local()
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0.0] * (len(self.buckets) + 3)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def time(self, labels: Labels = ()) -> _Timer:
+        """Return a context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def sample(self, labels: Labels = ()) -> HistogramSample:
+        """Return the collected state of a label combination."""
+        return self.samples().get(
+            labels, HistogramSample(self.buckets, (0,) * (len(self.buckets) + 1), 0.0, 0)
+        )
+
+    def samples(self) -> dict[Labels, HistogramSample]:
+        """Return the collected state of every label combination."""
+        totals: dict[Labels, list[float]] = {}
+        for shard in self._shards.all():
+            for labels, state in shard.copy().items():
+                total = totals.setdefault(labels, [0.0] * len(state))
+                for i, value in enumerate(list(state)):
+                    total[i] += value
+        return {
+            labels: HistogramSample(
+                self.buckets, tuple(int(c) for c in state[:-2]), state[-2], int(state[-1])
+            )
+            for labels, state in totals.items()
+        }
+
+
+class _Timer:
+    """Observe the duration of a block into a histogram."""
+
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: Histogram, labels: Labels) -> None:
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> Self:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, self._labels)
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a Prometheus label set."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a Prometheus sample value."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """A named collection of metrics.
+
+    Metrics are created on first request and returned on later requests
+    with the same name, so independent components can share them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get[M: Metric](self, cls: type[M], name: str, *args: Any) -> M:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            if not isinstance(metric, cls) or type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def metrics(self) -> list[Metric]:
+        """Return the registered metrics in registration order."""
+        with self._lock:
+            return list(self._metrics.values())
+
+    def to_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for labels, value in sorted(metric.samples().items()):
+                if isinstance(value, HistogramSample):
+                    names = (*metric.labelnames, "le")
+                    cumulative = 0
+                    bounds = [*(_format_value(b) for b in value.buckets), "+Inf"]
+                    for bound, count in zip(bounds, value.counts, strict=True):
+                        cumulative += count
+                        label_set = _format_labels(names, (*labels, bound))
+                        lines.append(f"{metric.name}_bucket{label_set} {cumulative}")
+                    label_set = _format_labels(metric.labelnames, labels)
+                    lines.append(f"{metric.name}_sum{label_set} {_format_value(value.sum)}")
+                    lines.append(f"{metric.name}_count{label_set} {value.count}")
+                else:
+                    label_set = _format_labels(metric.labelnames, labels)
+                    lines.append(f"{metric.name}{label_set} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """Export all metrics as a JSON-serializable snapshot."""
+        metrics: dict[str, Any] = {}
+        for metric in self.metrics():
+            values: list[dict[str, Any]] = []
+            for labels, value in sorted(metric.samples().items()):
+                entry: dict[str, Any] = {"labels": dict(zip(metric.labelnames, labels, strict=True))}
+                if isinstance(value, HistogramSample):
+                    entry.update(
+                        count=value.count,
+                        sum=value.sum,
+                        p50=value.quantile(0.5),
+                        p99=value.quantile(0.99),
+                        buckets=dict(
+                            zip([*map(str, value.buckets), "+Inf"], value.counts, strict=True)
+                        ),
+                    )
+                else:
+                    entry["value"] = value
+                values.append(entry)
+            metrics[metric.name] = {"type": metric.type, "help": metric.help, "values": values}
+        return {"timestamp": time.time(), "metrics": metrics}
+
+
+class SnapshotWriter:
+    """Periodically write JSON snapshots of a registry, one per line.
+
+    Snapshots are written from a background thread every ``interval``
+    seconds, and a final snapshot is written on close.
+    """
+
+    def __init__(
+        self, registry: MetricsRegistry, stream: IO[str], interval: float = 10.0
+    ) -> None:
+        """Start writing snapshots.
+
+        Args:
+            registry: Registry to snapshot.
+            stream: Text stream the JSON lines are written to.
+            interval: Seconds between snapshots.
+        """
+        self.registry = registry
+        self.stream = stream
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        """Write one snapshot."""
+        self.stream.write(json.dumps(self.registry.snapshot(), allow_nan=False, default=str) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Stop the background thread and write a final snapshot."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the writer on exit."""
+        self.close()
+
+
+@dataclass(slots=True)
+class FetchTimings:
+    """Timings of a single page fetch, in seconds.
+
+    Attributes:
+        dns: Host name resolution time, if a new connection was resolved.
+        connect: TCP connection time, if a new connection was made.
+        ttfb: Time from the start of the fetch to the response headers.
+        total: Time from the start of the fetch to the end of the body.
+        parse: Time spent parsing the page and extracting links.
+        bytes: Size of the response body.
+    """
+
+    dns: float | None = None
+    connect: float | None = None
+    ttfb: float | None = None
+    total: float | None = None
+    parse: float | None = None
+    bytes: int = 0
+
+
+class CrawlMetrics:
+    """The metrics recorded by a crawl.
+
+    Attributes mirror the exported metric names without the
+    ``pycrawler_`` prefix.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        """Register the crawl metrics.
+
+        Args:
+            registry: Registry to register into. A new one is created when
+                omitted.
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        r = self.registry
+        self.fetch_seconds = r.histogram("pycrawler_fetch_seconds", "Total page fetch time")
+        self.dns_seconds = r.histogram("pycrawler_dns_seconds", "Host name resolution time")
+        self.connect_seconds = r.histogram("pycrawler_connect_seconds", "TCP connect time")
+        self.ttfb_seconds = r.histogram(
+            "pycrawler_ttfb_seconds", "Time from fetch start to response headers"
+        )
+        self.parse_seconds = r.histogram(
+            "pycrawler_parse_seconds", "Page parsing and link extraction time"
+        )
+        self.response_bytes = r.counter(
+            "pycrawler_response_bytes_total", "Response body bytes received"
+        )
+        self.responses = r.counter(
+            "pycrawler_responses_total", "Responses by HTTP status code", ("status",)
+        )
+        self.errors = r.counter(
+            "pycrawler_fetch_errors_total", "Failed fetches by error type", ("error",)
+        )
+        self.frontier_size = r.gauge("pycrawler_frontier_size", "URLs queued in the frontier")
+        self.in_flight = r.gauge(
+            "pycrawler_in_flight_requests", "Requests in flight per host", ("host",)
+        )
+        self.workers = r.gauge("pycrawler_workers", "Fetch worker threads")
+        self.busy_seconds = r.counter(
+            "pycrawler_worker_busy_seconds_total", "Time workers spent fetching"
+        )
+        self.utilization = r.gauge(
+            "pycrawler_worker_utilization", "Fraction of worker time spent fetching"
+        )
+        self._started = time.perf_counter()
+        self.utilization.set_function(self._utilization)
+
+    def start(self, workers: int) -> None:
+        """Mark the start of a crawl with the given number of workers."""
+        self._started = time.perf_counter()
+        self.workers.set(workers)
+
+    def _utilization(self) -> float:
+        """Return the busy fraction of the available worker time."""
+        workers = self.workers.value()
+        elapsed = time.perf_counter() - self._started
+        if workers <= 0 or elapsed <= 0:
+            return 0.0
+        return min(1.0, self.busy_seconds.value() / (workers * elapsed))
+
+    def observe_fetch(
+        self, timings: FetchTimings, status: int | None, error: BaseException | None
+    ) -> None:
+        """Record the outcome and timings of a page fetch."""
+        if timings.total is not None:
+            self.fetch_seconds.observe(timings.total)
+            self.busy_seconds.inc(timings.total)
+        if timings.dns is not None:
+            self.dns_seconds.observe(timings.dns)
+        if timings.connect is not None:
+            self.connect_seconds.observe(timings.connect)
+        if timings.ttfb is not None:
+            self.ttfb_seconds.observe(timings.ttfb)
+        if timings.parse is not None:
+            self.parse_seconds.observe(timings.parse)
+        if timings.bytes:
+            self.response_bytes.inc(timings.bytes)
+        if status is not None:
+            self.responses.inc(1, (str(status),))
+        if error is not None and status is None:
+            self.errors.inc(1, (type(error).__name__,))
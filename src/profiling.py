@@ -0,0 +1,181 @@
+"""Opt-in profiling of the crawl hot path.
+
+``StageProfiler`` times named stages of a fetch and of the crawl loops, such
+as network, parsing, link extraction, de-duplication and frontier updates,
+and renders a breakdown of where the time went. Stage timings are recorded
+into a per-thread aggregated histogram, so profiling costs two clock reads
+per stage.
+
+``SamplingProfiler`` samples the stack of every thread at a fixed interval
+and writes one collapsed-stack file per thread, which flame graph tools such
+as ``flamegraph.pl`` or speedscope read directly. Unlike ``cProfile``, which
+is a single process-wide profiler on Python 3.12+, it separates the workers.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+from src.metrics import LATENCY_BUCKETS, MetricsRegistry
+
+if TYPE_CHECKING:
+    from types import FrameType, TracebackType
+
+    from rich.table import Table
+
+    from src.metrics import HistogramSample
+
+# Shared no-op context manager returned for stages when profiling is off
+NO_STAGE: AbstractContextManager[object] = nullcontext()
+
+# Most stages take microseconds, so the buckets start well below a millisecond
+STAGE_BUCKETS: tuple[float, ...] = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, *LATENCY_BUCKETS)
+
+
+class StageProfiler:
+    """Record the time spent in named stages of the crawl."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        """Initialize the profiler.
+
+        Args:
+            registry: Registry the ``pycrawler_stage_seconds`` histogram is
+                registered into, so stage timings are exported with the
+                crawl metrics. A private registry is used when omitted.
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.stages = self.registry.histogram(
+            "pycrawler_stage_seconds",
+            "Time spent per crawl stage",
+            ("stage",),
+            STAGE_BUCKETS,
+        )
+
+    def stage(self, name: str) -> AbstractContextManager[object]:
+        """Return a context manager timing a block as the named stage."""
+        return self.stages.time((name,))
+
+    def samples(self) -> dict[str, HistogramSample]:
+        """Return the recorded timings of every stage."""
+        return {labels[0]: sample for labels, sample in self.stages.samples().items()}
+
+    def report(self) -> Table:
+        """Render the stage breakdown, slowest stage first.
+
+        Stages nest (a fetch contains its parse), so shares are relative to
+        the slowest stage rather than adding up to 100%.
+        """
+        samples = sorted(self.samples().items(), key=lambda item: -item[1].sum)
+        top = samples[0][1].sum if samples else 0.0
+        from rich.table import Table
+
+        table = Table(title="Crawl stage profile")
+        for column in ("stage", "calls", "total s", "mean ms", "p99 ms", "share"):
+            table.add_column(column, justify="left" if column == "stage" else "right")
+        for name, sample in samples:
+            table.add_row(
+                name,
+                str(sample.count),
+                f"{sample.sum:.3f}",
+                f"{sample.sum / sample.count * 1000:.2f}" if sample.count else "-",
+                f"{sample.quantile(0.99) * 1000:.2f}",
+                f"{sample.sum / top:.0%}" if top else "-",
+            )
+        return table
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads from a background thread."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """Initialize the profiler without starting it.
+
+        Args:
+            interval: Seconds between samples.
+        """
+        self.interval = interval
+        # thread name -> collapsed stack -> number of samples
+        self.stacks: dict[str, Counter[str]] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        """Return a stack in collapsed form, outermost frame first."""
+        names: list[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_qualname} ({Path(code.co_filename).name})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def sample(self) -> None:
+        """Record the current stack of every other thread."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                name = names.get(ident, f"thread-{ident}")
+                self.stacks.setdefault(name, Counter())[self._collapse(frame)] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> Self:
+        """Start sampling in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write(self, directory: str | Path) -> list[Path]:
+        """Write one collapsed-stack file per thread.
+
+        Args:
+            directory: Directory to write ``<thread name>.folded`` files to.
+
+        Returns:
+            The paths written.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            stacks = {name: Counter(counts) for name, counts in self.stacks.items()}
+        paths: list[Path] = []
+        for name, counts in sorted(stacks.items()):
+            path = directory / f"{re.sub(r'[^\w.-]', '_', name)}.folded"
+            lines = (f"{stack} {count}\n" for stack, count in counts.most_common())
+            path.write_text("".join(lines), encoding="utf-8")
+            paths.append(path)
+        return paths
+
+    def __enter__(self) -> Self:
+        """Start sampling on entering the runtime context."""
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Stop sampling on exit."""
+        self.stop()
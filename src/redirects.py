@@ -0,0 +1,148 @@
+"""Redirect tracking.
+
+urllib follows redirects silently, so a page fetched through a redirect would
+be attributed to the URL it was requested as, and every URL redirecting to
+the same page would download it again. ``RedirectingHandler`` either follows
+redirects while recording the chain, or stops at the first one and reports
+its target, and ``RedirectMap`` remembers every redirect seen, so known
+redirecting URLs can be sent straight to their final URL::
+
+    redirects = RedirectMap()
+    Webcrawler(url, depth, redirects=redirects).crawl()
+    for redirect in redirects:
+        print(redirect.source, "->", redirect.target, redirect.hops)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import pairwise
+from typing import TYPE_CHECKING
+from urllib.request import HTTPRedirectHandler, Request
+
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from email.message import Message
+    from typing import IO
+
+
+@dataclass(frozen=True, slots=True)
+class Redirect:
+    """A URL that redirects to another one.
+
+    Attributes:
+        source: The redirecting URL.
+        target: The final URL of the redirect chain.
+        hops: Number of redirects from the source to the target.
+    """
+
+    source: str
+    target: str
+    hops: int
+
+
+class RedirectingHandler(HTTPRedirectHandler):
+    """A redirect handler recording the redirects of a fetch.
+
+    A handler instance is meant for a single fetch.
+    """
+
+    def __init__(
+        self,
+        max_redirects: int = HTTPRedirectHandler.max_redirections,
+        *,
+        follow: bool = True,
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            max_redirects: Maximum number of redirects followed. A longer
+                chain fails with the ``HTTPError`` of the last redirect.
+            follow: If False, the first redirect is not followed: the fetch
+                fails with its ``HTTPError`` and ``location`` is set.
+        """
+        self.max_redirections = max_redirects
+        self.follow = follow
+        # The requested URL and every URL it was redirected to, if any
+        self.chain: list[str] = []
+        self.location: str | None = None
+
+    def redirect_request(
+        self,
+        req: Request,
+        fp: IO[bytes],
+        code: int,
+        msg: str,
+        headers: Message,
+        newurl: str,
+    ) -> Request | None:
+        """Record the redirect, and follow it if enabled."""
+        request = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if request is None:
+            return None
+        if not self.chain:
+            self.chain.append(req.full_url)
+        self.chain.append(request.full_url)
+        if not self.follow:
+            self.location = request.full_url
+            return None
+        return request
+
+
+class RedirectMap:
+    """A thread-safe map of redirects observed between URLs."""
+
+    def __init__(self) -> None:
+        """Create an empty map."""
+        self._next: dict[str, str] = {}
+        self._lock = new_lock("RedirectMap")
+
+    def __len__(self) -> int:
+        """Return the number of redirecting URLs."""
+        with self._lock:
+            return len(self._next)
+
+    def __iter__(self) -> Iterator[Redirect]:
+        """Iterate over the redirects in the order they were recorded.
+
+        Redirect loops are left out.
+        """
+        with self._lock:
+            sources = list(self._next)
+        for source in sources:
+            redirect = self.get(source)
+            if redirect is not None:
+                yield redirect
+
+    def record(self, chain: list[str]) -> None:
+        """Record a redirect chain, from the requested URL to the final one."""
+        with self._lock:
+            for source, target in pairwise(chain):
+                if source != target:
+                    self._next[source] = target
+
+    def get(self, url: str) -> Redirect | None:
+        """Return where a URL finally redirects to.
+
+        Returns:
+            The redirect, or None if the URL is not known to redirect or its
+            redirects loop.
+        """
+        seen = {url}
+        target = url
+        with self._lock:
+            while (following := self._next.get(target)) is not None:
+                if following in seen:
+                    return None
+                seen.add(following)
+                target = following
+        if target == url:
+            return None
+        return Redirect(url, target, len(seen) - 1)
+
+    def resolve(self, url: str) -> str:
+        """Return the final URL a URL is known to redirect to, or the URL itself."""
+        redirect = self.get(url)
+        return url if redirect is None else redirect.target
@@ -0,0 +1,82 @@
+"""Non-HTML resource filtering.
+
+Links to images, documents, archives and media cannot contain links to
+follow, yet downloading them takes most of the bandwidth of a media-heavy
+site. ``ResourceFilter`` keeps them out of the crawl in two steps: URLs are
+rejected before they are enqueued by their extension, or by the MIME type
+guessed from it, and responses whose ``Content-Type`` is not HTML are closed
+as soon as their headers arrive, without reading the body.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import PurePosixPath
+from urllib.parse import urlsplit
+
+_IMAGES = (".bmp", ".gif", ".ico", ".jpeg", ".jpg", ".png", ".svg", ".tiff", ".webp")
+_AUDIO = (".flac", ".m4a", ".mp3", ".ogg", ".wav")
+_VIDEO = (".avi", ".m4v", ".mkv", ".mov", ".mp4", ".mpeg", ".webm", ".wmv")
+_DOCUMENTS = (".csv", ".doc", ".docx", ".pdf", ".ppt", ".pptx", ".xls", ".xlsx")
+_ARCHIVES = (".7z", ".bz2", ".gz", ".rar", ".tar", ".tgz", ".xz", ".zip")
+_BINARIES = (".apk", ".bin", ".dmg", ".exe", ".iso")
+_ASSETS = (".css", ".eot", ".js", ".json", ".otf", ".ttf", ".woff", ".woff2")
+
+SKIPPED_EXTENSIONS: frozenset[str] = frozenset(
+    (*_IMAGES, *_AUDIO, *_VIDEO, *_DOCUMENTS, *_ARCHIVES, *_BINARIES, *_ASSETS)
+)
+
+# MIME type patterns of URLs skipped by their guessed type
+SKIPPED_TYPES: tuple[str, ...] = (
+    "image/*",
+    "audio/*",
+    "video/*",
+    "font/*",
+    "application/octet-stream",
+    "application/pdf",
+    "application/zip",
+    "application/vnd.*",
+    "application/x-*",
+)
+
+# MIME type patterns of responses that are parsed for links
+HTML_TYPES: tuple[str, ...] = ("text/html", "application/xhtml+xml")
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceFilter:
+    """Decide which URLs and responses are worth downloading.
+
+    Attributes:
+        skip_extensions: Lower-case URL path extensions never fetched.
+        skip_types: Patterns of MIME types, as guessed from the URL
+            extension, never fetched.
+        html_types: Patterns of ``Content-Type`` media types whose body is
+            read and parsed. Responses without a ``Content-Type`` are read.
+    """
+
+    skip_extensions: frozenset[str] = SKIPPED_EXTENSIONS
+    skip_types: tuple[str, ...] = SKIPPED_TYPES
+    html_types: tuple[str, ...] = HTML_TYPES
+
+    def allow_url(self, url: str) -> bool:
+        """Return True if a URL may point to an HTML page."""
+        path = urlsplit(url).path
+        extension = PurePosixPath(path).suffix.lower()
+        if not extension:
+            return True
+        if extension in self.skip_extensions:
+            return False
+        guessed, _ = mimetypes.guess_type(path, strict=False)
+        return guessed is None or not any(
+            fnmatchcase(guessed, pattern) for pattern in self.skip_types
+        )
+
+    def allow_type(self, content_type: str | None) -> bool:
+        """Return True if a response with this ``Content-Type`` should be read."""
+        if not content_type:
+            return True
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        return any(fnmatchcase(media_type, pattern) for pattern in self.html_types)
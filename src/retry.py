@@ -0,0 +1,281 @@
+"""Retry scheduling and per-host circuit breaking.
+
+Failed fetches are retried with jittered exponential backoff. Retries wait
+in a ``RetryQueue`` that the crawl scheduler polls, so no worker thread is
+ever parked in ``sleep``. A ``CircuitBreaker`` stops dispatching to a host
+after a run of consecutive failures, parks the host's URLs and probes it
+again once a cooldown has elapsed.
+"""
+
+from __future__ import annotations
+
+import errno
+import heapq
+import itertools
+import random
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError, URLError
+
+from src import LOGGER
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# A scheduled fetch: (url_id, depth, attempt)
+type FetchItem = tuple[int, int, int]
+
+RETRYABLE_STATUSES: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Routing failures that are usually transient, besides connection errors
+RETRYABLE_ERRNOS: frozenset[int] = frozenset(
+    {errno.ENETDOWN, errno.ENETUNREACH, errno.EHOSTUNREACH}
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Configuration for retrying failed fetches.
+
+    Attributes:
+        max_retries: Maximum number of retries after the first attempt.
+        base_delay: Delay before the first retry, in seconds.
+        max_delay: Upper bound for any single delay, in seconds.
+        jitter: Fraction of the delay that is randomized, between 0 and 1.
+        retry_statuses: HTTP status codes that are considered transient.
+    """
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    jitter: float = 0.5
+    retry_statuses: frozenset[int] = RETRYABLE_STATUSES
+
+    def delay(self, attempt: int, rng: random.Random | None = None) -> float:
+        """Return the backoff delay before retry number ``attempt``.
+
+        Args:
+            attempt: The retry number, starting at 1.
+            rng: Random number generator used for jitter.
+
+        Returns:
+            The delay in seconds.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        spread = delay * self.jitter
+        return delay - spread + (rng or random).random() * spread
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Check whether a fetch error is transient and worth retrying.
+
+        Timeouts, connection failures, unreachable networks and temporary
+        name resolution failures are transient, as are the HTTP statuses of
+        ``retry_statuses``. Other ``URLError`` reasons, such as unknown URL
+        schemes, unknown hosts or TLS certificate errors, are not.
+        """
+        if isinstance(error, HTTPError):
+            return error.code in self.retry_statuses
+        if isinstance(error, URLError):
+            if not isinstance(error.reason, OSError):
+                return False
+            error = error.reason
+        if isinstance(error, socket.gaierror):
+            return error.errno == socket.EAI_AGAIN
+        if isinstance(error, TimeoutError | ConnectionError):
+            return True
+        return isinstance(error, OSError) and error.errno in RETRYABLE_ERRNOS
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Check whether the fetch that failed on ``attempt`` should be retried."""
+        return attempt < self.max_retries and self.is_retryable(error)
+
+
+class RetryQueue:
+    """A queue of fetches that become ready after a delay.
+
+    This class is thread-safe.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize an empty queue.
+
+        Args:
+            clock: Monotonic time source, replaceable for testing.
+        """
+        self._clock = clock
+        self._heap: list[tuple[float, int, FetchItem]] = []
+        self._counter = itertools.count()
+        self._lock = new_lock("RetryQueue")
+
+    def push(self, item: FetchItem, delay: float = 0.0) -> None:
+        """Schedule an item to become ready after ``delay`` seconds."""
+        with self._lock:
+            heapq.heappush(
+                self._heap, (self._clock() + delay, next(self._counter), item)
+            )
+
+    def pop_ready(self) -> FetchItem | None:
+        """Remove and return the earliest ready item, or None."""
+        with self._lock:
+            if self._heap and self._heap[0][0] <= self._clock():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def next_ready_in(self) -> float | None:
+        """Return seconds until the next item is ready, or None if empty."""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self._clock())
+
+    def __len__(self) -> int:
+        """Return the number of scheduled items."""
+        with self._lock:
+            return len(self._heap)
+
+    def __bool__(self) -> bool:
+        """Return True if any item is scheduled."""
+        return len(self) > 0
+
+
+@dataclass
+class _HostCircuit:
+    """Circuit state of a single host."""
+
+    failures: int = 0
+    opened_at: float | None = None
+    probing: bool = False
+    probes: int = 0
+    dead: bool = False
+    parked: deque[FetchItem] = field(default_factory=deque)
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After ``failure_threshold`` consecutive failures a host's circuit opens
+    and its URLs are parked instead of dispatched. Once ``reset_timeout``
+    has elapsed a single parked URL is released as a probe: success closes
+    the circuit and releases the rest, failure re-opens it. A host that
+    fails ``max_probes`` probes is given up on and its parked URLs dropped.
+
+    This class is thread-safe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_probes: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a host's circuit.
+            reset_timeout: Seconds to wait before probing an open host.
+            max_probes: Failed probes after which a host is given up on.
+            clock: Monotonic time source, replaceable for testing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_probes = max_probes
+        self._clock = clock
+        self._hosts: dict[str, _HostCircuit] = {}
+        self._lock = new_lock("CircuitBreaker")
+
+    def allow(self, host: str) -> bool:
+        """Check whether a fetch may be dispatched to a host."""
+        with self._lock:
+            circuit = self._hosts.get(host)
+            return circuit is None or circuit.opened_at is None
+
+    def is_open(self, host: str) -> bool:
+        """Check whether a host's circuit is open."""
+        return not self.allow(host)
+
+    def park(self, host: str, item: FetchItem) -> None:
+        """Park a fetch for a host whose circuit is open."""
+        with self._lock:
+            circuit = self._hosts.setdefault(host, _HostCircuit())
+            if not circuit.dead:
+                circuit.parked.append(item)
+
+    def due_probes(self) -> list[FetchItem]:
+        """Release one parked fetch per open host whose cooldown has elapsed."""
+        now = self._clock()
+        probes: list[FetchItem] = []
+        with self._lock:
+            for circuit in self._hosts.values():
+                if (
+                    circuit.opened_at is not None
+                    and not circuit.dead
+                    and not circuit.probing
+                    and circuit.parked
+                    and now - circuit.opened_at >= self.reset_timeout
+                ):
+                    circuit.probing = True
+                    probes.append(circuit.parked.popleft())
+        return probes
+
+    def record_success(self, host: str) -> list[FetchItem]:
+        """Record a successful fetch, closing the host's circuit.
+
+        Returns:
+            The fetches that were parked for the host and may be dispatched.
+        """
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is None:
+                return []
+            released = list(circuit.parked)
+            self._hosts[host] = _HostCircuit()
+            return released
+
+    def record_failure(self, host: str) -> None:
+        """Record a failed fetch, opening the host's circuit if needed."""
+        with self._lock:
+            circuit = self._hosts.setdefault(host, _HostCircuit())
+            circuit.failures += 1
+            if circuit.probing:
+                circuit.probing = False
+                circuit.probes += 1
+                circuit.opened_at = self._clock()
+                if circuit.probes >= self.max_probes:
+                    circuit.dead = True
+                    LOGGER.warning(
+                        "Giving up on %s, dropping %d parked URLs",
+                        host,
+                        len(circuit.parked),
+                    )
+                    circuit.parked.clear()
+            elif circuit.opened_at is None and circuit.failures >= self.failure_threshold:
+                circuit.opened_at = self._clock()
+                LOGGER.warning(
+                    "Circuit opened for %s after %d failures", host, circuit.failures
+                )
+
+    def waiting(self) -> bool:
+        """Return True if any live host still has parked fetches."""
+        with self._lock:
+            return any(
+                circuit.parked and not circuit.dead for circuit in self._hosts.values()
+            )
+
+    def next_probe_in(self) -> float | None:
+        """Return seconds until the next probe is due, or None if none is."""
+        now = self._clock()
+        with self._lock:
+            delays = [
+                max(0.0, circuit.opened_at + self.reset_timeout - now)
+                for circuit in self._hosts.values()
+                if circuit.opened_at is not None
+                and circuit.parked
+                and not circuit.dead
+                and not circuit.probing
+            ]
+        return min(delays, default=None)
@@ -0,0 +1,163 @@
+"""Streaming result sinks.
+
+A ``ResultSink`` receives every link as soon as the crawler discovers it,
+so results can be consumed while a long crawl is still running and output
+memory stays constant regardless of crawl size.
+"""
+
+from __future__ import annotations
+
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Literal, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+SinkFormat = Literal["lines", "jsonl", "csv"]
+
+# Compressed output is selected by the file extension
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlResult:
+    """A link discovered during a crawl.
+
+    Attributes:
+        url: The discovered URL.
+        source: The page the URL was found on.
+        depth: The crawl depth at which the URL was discovered.
+        status: HTTP status of the source page, if known.
+    """
+
+    url: str
+    source: str
+    depth: int
+    status: int | None
+
+
+class ResultSink(ABC):
+    """Base class for streaming result writers.
+
+    Sinks are written to from the crawl scheduling thread only and need no
+    locking of their own.
+    """
+
+    @abstractmethod
+    def write(self, result: CrawlResult) -> None:
+        """Write a single result."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and release any resources held by the sink."""
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the sink on exit."""
+        self.close()
+
+
+class StreamSink(ResultSink):
+    """Base class for sinks writing text to a stream."""
+
+    def __init__(self, stream: IO[str] | None = None, *, owned: bool = False) -> None:
+        """Initialize the sink.
+
+        Args:
+            stream: Text stream to write to. Defaults to standard output.
+            owned: If True, the stream is closed together with the sink.
+        """
+        self.stream: IO[str] = stream if stream is not None else sys.stdout
+        self._owned = owned
+
+    def close(self) -> None:
+        """Flush the stream, closing it if the sink owns it."""
+        if self._owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class LineSink(StreamSink):
+    """Write one discovered URL per line."""
+
+    def write(self, result: CrawlResult) -> None:
+        """Write the URL of a result."""
+        self.stream.write(result.url + "\n")
+
+
+class JSONLSink(StreamSink):
+    """Write one JSON object per line for each result."""
+
+    def write(self, result: CrawlResult) -> None:
+        """Write a result as a JSON line."""
+        self.stream.write(json.dumps(asdict(result)) + "\n")
+
+
+class CSVSink(StreamSink):
+    """Write results as CSV rows with a header line."""
+
+    FIELDS = ("url", "source", "depth", "status")
+
+    def __init__(self, stream: IO[str] | None = None, *, owned: bool = False) -> None:
+        """Initialize the sink and write the header row."""
+        super().__init__(stream, owned=owned)
+        self._writer = csv.writer(self.stream)
+        self._writer.writerow(self.FIELDS)
+
+    def write(self, result: CrawlResult) -> None:
+        """Write a result as a CSV row."""
+        status = "" if result.status is None else result.status
+        self._writer.writerow((result.url, result.source, result.depth, status))
+
+
+_SINKS: dict[SinkFormat, type[StreamSink]] = {
+    "lines": LineSink,
+    "jsonl": JSONLSink,
+    "csv": CSVSink,
+}
+
+
+def open_sink(path: str | None, fmt: SinkFormat = "lines") -> StreamSink:
+    """Open a result sink writing to a file or standard output.
+
+    Files ending in ``.gz``, ``.bz2`` or ``.xz`` are compressed accordingly.
+
+    Args:
+        path: Output file path, or None or ``-`` for standard output.
+        fmt: Output format (lines, jsonl, csv).
+
+    Returns:
+        The opened sink.
+    """
+    sink_class = _SINKS[fmt]
+    if path is None or path == "-":
+        return sink_class()
+    opener = _OPENERS.get(Path(path).suffix)
+    newline = "" if fmt == "csv" else None
+    stream: IO[str]
+    if opener is None:
+        stream = Path(path).open("w", encoding="utf-8", newline=newline)  # noqa: SIM115
+    else:
+        stream = opener(path, "wt", encoding="utf-8", newline=newline)  # type: ignore[operator]
+    return sink_class(stream, owned=True)
@@ -0,0 +1,212 @@
+"""Sitemap discovery and streaming ingestion.
+
+Sitemaps are discovered through the ``Sitemap:`` lines of ``robots.txt``,
+falling back to ``/sitemap.xml``. Documents are parsed incrementally with
+``xml.etree.ElementTree.iterparse`` and each parsed element is discarded
+immediately, so huge (and gzipped) sitemaps and sitemap indexes are read
+in constant memory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import urllib.parse
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING
+from urllib.error import URLError
+from urllib.request import OpenerDirector, Request, build_opener
+
+from src import LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Namespaces of the sitemap protocol, including the legacy Google one and
+# documents that declare none. Elements of extensions such as
+# ``<image:loc>`` or ``<video:loc>`` are in other namespaces.
+SITEMAP_NAMESPACES = frozenset(
+    {
+        "",
+        "http://www.sitemaps.org/schemas/sitemap/0.9",
+        "http://www.google.com/schemas/sitemap/0.84",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SitemapEntry:
+    """A page listed in a sitemap.
+
+    Attributes:
+        loc: The page URL.
+        lastmod: The ``<lastmod>`` value, if present.
+        priority: The ``<priority>`` value between 0.0 and 1.0, if present.
+        source: The sitemap the entry was read from.
+    """
+
+    loc: str
+    lastmod: str | None = None
+    priority: float | None = None
+    source: str = ""
+
+
+def _sitemap_name(tag: str) -> str | None:
+    """Return the local name of a sitemap protocol tag.
+
+    Returns:
+        The tag name without its namespace, or None for tags of other
+        namespaces.
+    """
+    namespace, _, name = tag[1:].rpartition("}") if tag[:1] == "{" else ("", "", tag)
+    return name if namespace in SITEMAP_NAMESPACES else None
+
+
+def _parse_priority(value: str | None) -> float | None:
+    """Parse a ``<priority>`` value, ignoring malformed ones."""
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        return None
+
+
+def parse_sitemap(stream: IO[bytes], source: str = "") -> Iterator[SitemapEntry | str]:
+    """Incrementally parse a sitemap or sitemap index document.
+
+    Gzip-compressed documents are detected by their magic bytes.
+
+    Args:
+        stream: Binary stream of the sitemap document.
+        source: URL of the sitemap, recorded on each entry.
+
+    Yields:
+        A ``SitemapEntry`` for each ``<url>`` element, and the location
+        string of each nested sitemap listed in a ``<sitemapindex>``.
+    """
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)  # type: ignore[arg-type]
+    if stream.peek(2)[:2] == GZIP_MAGIC:  # type: ignore[attr-defined]
+        stream = gzip.GzipFile(fileobj=stream)  # type: ignore[assignment]
+
+    root: ET.Element | None = None
+    fields: dict[str, str] = {}
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end":
+            continue
+        name = _sitemap_name(element.tag)
+        if name in ("loc", "lastmod", "priority"):
+            fields[name] = (element.text or "").strip()
+        elif name in ("url", "sitemap"):
+            loc = fields.get("loc")
+            if loc and name == "url":
+                yield SitemapEntry(
+                    loc,
+                    fields.get("lastmod") or None,
+                    _parse_priority(fields.get("priority")),
+                    source,
+                )
+            elif loc:
+                yield loc
+            fields = {}
+            # Drop parsed children so memory use stays constant
+            root.clear()
+
+
+class SitemapReader:
+    """Discover and read all sitemaps of a site.
+
+    Sitemap indexes are expanded breadth-first; every sitemap is fetched at
+    most once.
+    """
+
+    def __init__(
+        self,
+        agent: str,
+        *,
+        opener: OpenerDirector | None = None,
+        max_sitemaps: int = 1000,
+        max_urls: int | None = None,
+        timeout: float | None = 30.0,
+    ) -> None:
+        """Initialize the reader.
+
+        Args:
+            agent: User-Agent header sent with each request.
+            opener: urllib opener used for requests. Defaults to build_opener().
+            max_sitemaps: Maximum number of sitemap documents to fetch.
+            max_urls: Maximum number of entries to yield, unlimited if None.
+            timeout: Socket timeout of each request in seconds, None to block.
+        """
+        self.agent = agent
+        self.opener = opener if opener is not None else build_opener()
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.timeout = timeout
+
+    def _open(self, url: str) -> IO[bytes]:
+        """Open a URL with the configured User-Agent."""
+        request = Request(url)
+        request.add_header("User-Agent", self.agent)
+        return self.opener.open(request, timeout=self.timeout)
+
+    def discover(self, root: str) -> list[str]:
+        """Find the sitemaps of the site hosting ``root``.
+
+        Args:
+            root: Any URL on the site.
+
+        Returns:
+            Sitemap URLs listed in robots.txt, or ``/sitemap.xml`` if none are.
+        """
+        parts = urllib.parse.urlsplit(root)
+        base = f"{parts.scheme}://{parts.netloc}"
+        sitemaps: list[str] = []
+        try:
+            with self._open(f"{base}/robots.txt") as response:
+                for raw in response:
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    key, _, value = line.partition(":")
+                    if key.strip().lower() == "sitemap" and value.strip():
+                        sitemaps.append(urllib.parse.urljoin(base, value.strip()))
+        except (URLError, OSError) as error:
+            LOGGER.debug("No robots.txt for %s: %s", base, error)
+        return sitemaps or [f"{base}/sitemap.xml"]
+
+    def entries(self, root: str) -> Iterator[SitemapEntry]:
+        """Stream the entries of every sitemap of the site hosting ``root``.
+
+        Args:
+            root: Any URL on the site.
+
+        Yields:
+            Each page listed in the site's sitemaps.
+        """
+        pending = deque(self.discover(root))
+        seen: set[str] = set(pending)
+        fetched = 0
+        produced = 0
+        while pending and fetched < self.max_sitemaps:
+            sitemap = pending.popleft()
+            fetched += 1
+            try:
+                with self._open(sitemap) as response:
+                    for item in parse_sitemap(response, sitemap):
+                        if isinstance(item, str):
+                            if item not in seen:
+                                seen.add(item)
+                                pending.append(item)
+                            continue
+                        yield item
+                        produced += 1
+                        if self.max_urls is not None and produced >= self.max_urls:
+                            return
+            except (URLError, OSError, EOFError, ET.ParseError) as error:
+                LOGGER.warning("Could not read sitemap %s: %s", sitemap, error)
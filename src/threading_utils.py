@@ -7,15 +7,25 @@ primitives for concurrent operations.
 
 from __future__ import annotations
 
+import itertools
 import sys
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, TypeVar
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, Self, TypeVar, overload
+
+from src import LOGGER
+from src.locktrace import new_lock
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Iterator
     from concurrent.futures import Future
+    from types import TracebackType
+
+    from src.locktrace import Lock
 
 T = TypeVar("T")
 
@@ -51,7 +61,7 @@ class ThreadSafeCounter:
     """A thread-safe counter for tracking progress in concurrent operations."""
 
     _value: int = 0
-    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _lock: Lock = field(default_factory=partial(new_lock, "ThreadSafeCounter"))
 
     def increment(self, amount: int = 1) -> int:
         """Increment the counter and return the new value."""
@@ -77,7 +87,7 @@ class ThreadSafeSet[T]:
     """A thread-safe set implementation for tracking visited URLs."""
 
     _data: set[T] = field(default_factory=set)
-    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _lock: Lock = field(default_factory=partial(new_lock, "ThreadSafeSet"))
 
     def add(self, item: T) -> bool:
         """Add an item to the set.
@@ -116,7 +126,7 @@ class ThreadSafeList[T]:
     """A thread-safe list implementation for collecting results."""
 
     _data: list[T] = field(default_factory=list)
-    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _lock: Lock = field(default_factory=partial(new_lock, "ThreadSafeList"))
 
     def append(self, item: T) -> None:
         """Append an item to the list."""
@@ -144,55 +154,272 @@ class ThreadSafeList[T]:
             return list(self._data)
 
 
+class WorkerPool:
+    """A long-lived, reusable pool of worker threads.
+
+    Unlike a ``ThreadPoolExecutor`` built per call, the pool keeps its threads
+    between maps, so calling it in a loop does not pay thread start-up each
+    time. ``imap`` streams results while bounding the work in flight, so
+    large or unbounded inputs are never submitted all at once.
+    """
+
+    def __init__(
+        self, max_workers: int | None = None, *, thread_name_prefix: str = "pool"
+    ) -> None:
+        """Initialize the pool; threads are started on demand.
+
+        Args:
+            max_workers: Number of worker threads. Defaults to the optimal
+                count for I/O bound work on this interpreter.
+            thread_name_prefix: Prefix of the worker thread names.
+        """
+        self.max_workers = max_workers or get_optimal_worker_count(1024, io_bound=True)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=thread_name_prefix,
+            initializer=self._mark_worker,
+        )
+
+    def _mark_worker(self) -> None:
+        self._local.pool = self
+
+    def in_worker(self) -> bool:
+        """Return True if called from one of the pool's worker threads."""
+        return getattr(self._local, "pool", None) is self
+
+    def submit[**P, R](
+        self, func: Callable[P, R], /, *args: P.args, **kwargs: P.kwargs
+    ) -> Future[R]:
+        """Schedule a call on the pool."""
+        return self._executor.submit(func, *args, **kwargs)
+
+    @overload
+    def imap[T, R](
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        ordered: bool = ...,
+        chunksize: int = ...,
+        max_in_flight: int | None = ...,
+        timeout: float | None = ...,
+        return_exceptions: Literal[False] = ...,
+    ) -> Iterator[R]: ...
+
+    @overload
+    def imap[T, R](
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        ordered: bool = ...,
+        chunksize: int = ...,
+        max_in_flight: int | None = ...,
+        timeout: float | None = ...,
+        return_exceptions: bool,
+    ) -> Iterator[R | BaseException]: ...
+
+    def imap[T, R](
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        ordered: bool = True,
+        chunksize: int = 1,
+        max_in_flight: int | None = None,
+        timeout: float | None = None,
+        return_exceptions: bool = False,
+    ) -> Iterator[R | BaseException]:
+        """Apply a function to items in parallel, yielding results as they come.
+
+        Items are read lazily and submitted in chunks; at most
+        ``max_in_flight`` chunks are queued or running at any time. Closing
+        the iterator early cancels the chunks that have not started.
+
+        Args:
+            func: Function applied to each item.
+            items: Items to process; may be a lazy or unbounded iterable.
+            ordered: If True, yield results in input order; otherwise yield
+                them as soon as their chunk completes.
+            chunksize: Items per submitted task. Larger chunks amortize the
+                scheduling cost of cheap functions.
+            max_in_flight: Maximum number of chunks queued or running.
+                Defaults to twice the number of workers.
+            timeout: Optional time limit in seconds for the whole map.
+            return_exceptions: If True, yield the exception of a failed item
+                in place of its result instead of raising it.
+
+        Yields:
+            The result of each item (or its exception with
+            ``return_exceptions``).
+
+        Raises:
+            TimeoutError: If ``timeout`` expires before all results are in.
+            Exception: The first exception raised by ``func``, unless
+                ``return_exceptions`` is set.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        if self.in_worker():
+            # Waiting on the pool from its own worker could deadlock it
+            yield from _run_inline(func, items, return_exceptions)
+            return
+        limit = max_in_flight or self.max_workers * 2
+        deadline = None if timeout is None else time.monotonic() + timeout
+        chunks = _chunked(items, chunksize)
+        pending: deque[Future[list[R | BaseException]]] = deque()
+
+        def remaining() -> float | None:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+        def fill() -> None:
+            while len(pending) < limit and (chunk := next(chunks, None)) is not None:
+                pending.append(
+                    self._executor.submit(_run_chunk, func, chunk, return_exceptions)
+                )
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                    results = future.result(remaining())
+                else:
+                    done, _ = wait(pending, remaining(), FIRST_COMPLETED)
+                    if not done:
+                        raise TimeoutError("WorkerPool.imap timed out")
+                    future = next(f for f in pending if f in done)
+                    pending.remove(future)
+                    results = future.result()
+                fill()
+                yield from results
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def map[T, R](
+        self, func: Callable[[T], R], items: Iterable[T], **kwargs: Any
+    ) -> list[R | BaseException]:
+        """Apply a function to items in parallel and return the results in order.
+
+        Accepts the keyword arguments of ``imap`` except ``ordered``.
+        """
+        return list(self.imap(func, items, ordered=True, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads once queued work is done."""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Shut the pool down on exit."""
+        self.shutdown()
+
+
+def _chunked[T](items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split items into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _run_chunk[T, R](
+    func: Callable[[T], R], chunk: list[T], return_exceptions: bool
+) -> list[R | BaseException]:
+    """Apply a function to a chunk of items on a worker thread."""
+    if not return_exceptions:
+        return [func(item) for item in chunk]
+    return list(_run_inline(func, chunk, True))
+
+
+def _run_inline[T, R](
+    func: Callable[[T], R], items: Iterable[T], return_exceptions: bool
+) -> Iterator[R | BaseException]:
+    """Apply a function to items on the calling thread."""
+    for item in items:
+        try:
+            yield func(item)
+        except Exception as error:
+            if not return_exceptions:
+                raise
+            yield error
+
+
+_shared_pool: WorkerPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool() -> WorkerPool:
+    """Return the process-wide worker pool, creating it on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = WorkerPool(thread_name_prefix="shared-pool")
+        return _shared_pool
+
+
 def parallel_map[T, R](
     func: Callable[[T], R],
     items: list[T],
     max_workers: int | None = None,
     *,
     timeout: float | None = None,
-) -> list[R]:
+    pool: WorkerPool | None = None,
+    return_exceptions: bool = False,
+) -> list[R | None] | list[R | BaseException]:
     """Execute a function in parallel over a list of items.
 
     This function takes advantage of free-threaded Python for true parallelism
-    when available, while still working correctly with the GIL enabled.
+    when available, while still working correctly with the GIL enabled. Work
+    runs on a long-lived pool, the shared one by default, so repeated calls
+    do not start new threads.
+
+    Failed items are returned as None, and their errors logged, unless
+    ``return_exceptions`` is set. Use ``WorkerPool.imap`` or
+    ``WorkerPool.map`` to have the errors raised instead.
 
     Args:
         func: The function to execute for each item.
         items: List of items to process.
-        max_workers: Maximum number of worker threads. Defaults to min(32, len(items) + 4).
-        timeout: Optional timeout for each task.
+        max_workers: Maximum number of items processed at once. Defaults to
+            the size of the pool.
+        timeout: Optional time limit in seconds for the whole map.
+        pool: Pool to run on. Defaults to ``shared_pool()``.
+        return_exceptions: If True, return the exception of a failed item
+            in its place instead of None.
 
     Returns:
         List of results in the same order as the input items.
     """
     if not items:
         return []
-
-    # Use more workers when GIL is disabled for better parallelism
-    if max_workers is None:
-        if is_gil_disabled():
-            max_workers = min(64, len(items), (len(items) + 4))
+    pool = pool or shared_pool()
+    results = pool.imap(
+        func,
+        items,
+        max_in_flight=max_workers or pool.max_workers,
+        timeout=timeout,
+        return_exceptions=True,
+    )
+    if return_exceptions:
+        return list(results)
+    values: list[R | None] = []
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            LOGGER.warning("parallel_map item %d failed: %r", index, result)
+            values.append(None)
         else:
-            max_workers = min(32, len(items), (len(items) + 4))
-
-    results: list[R] = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures: dict[Future[R], int] = {
-            executor.submit(func, item): i for i, item in enumerate(items)
-        }
-
-        # Pre-allocate results list
-        results = [None] * len(items)  # type: ignore[list-item]
-
-        for future in as_completed(futures, timeout=timeout):
-            idx = futures[future]
-            try:
-                results[idx] = future.result()
-            except Exception:
-                # Store None for failed operations
-                results[idx] = None  # type: ignore[assignment]
-
-    return results
+            values.append(result)
+    return values
 
 
 def get_optimal_worker_count(task_count: int, io_bound: bool = True) -> int:
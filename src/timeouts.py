@@ -0,0 +1,217 @@
+"""Request timeouts and deadlines.
+
+Every fetch is bounded by a connect timeout, a per-read timeout and a
+total deadline, so a slow or hung server cannot hold a worker thread
+indefinitely. Timeouts can be configured per host, and a crawl-wide
+``Deadline`` caps the timeouts of each fetch by the time left in the crawl.
+"""
+
+from __future__ import annotations
+
+import functools
+import http.client
+import ssl
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import socket
+    from collections.abc import Callable, Mapping
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an operation runs past its deadline."""
+
+
+class Deadline:
+    """A point in time by which an operation must finish."""
+
+    def __init__(
+        self, seconds: float | None, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Start a deadline.
+
+        Args:
+            seconds: Time allowed from now, or None for no deadline.
+            clock: Monotonic time source, replaceable for testing.
+        """
+        self._clock = clock
+        self.expires_at: float | None = None if seconds is None else clock() + seconds
+
+    def remaining(self) -> float | None:
+        """Return the seconds left, or None if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        """Check whether the deadline has passed."""
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    def check(self, what: str = "operation") -> None:
+        """Raise if the deadline has passed.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed.
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"{what} exceeded its deadline")
+
+
+def _cap(value: float | None, limit: float | None) -> float | None:
+    """Return the smaller of two optional timeouts."""
+    if value is None:
+        return limit
+    if limit is None:
+        return value
+    return min(value, limit)
+
+
+@dataclass(frozen=True, slots=True)
+class Timeouts:
+    """Timeouts of a single fetch, in seconds. None disables a timeout.
+
+    Attributes:
+        connect: Time allowed to establish the connection and TLS handshake.
+        read: Time allowed for each socket read, including the response headers.
+        total: Time allowed for the whole fetch.
+    """
+
+    connect: float | None = 10.0
+    read: float | None = 30.0
+    total: float | None = 60.0
+
+    def bounded(self, remaining: float | None) -> Timeouts:
+        """Cap every timeout by the time remaining in an enclosing deadline."""
+        if remaining is None:
+            return self
+        # A zero socket timeout would make the socket non-blocking
+        remaining = max(remaining, 0.001)
+        return Timeouts(
+            _cap(self.connect, remaining),
+            _cap(self.read, remaining),
+            _cap(self.total, remaining),
+        )
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """Fetch timeouts of a crawl, with per-host overrides.
+
+    Attributes:
+        default: Timeouts of hosts without an override.
+        hosts: Timeouts by host name (``netloc``).
+    """
+
+    default: Timeouts = field(default_factory=Timeouts)
+    hosts: Mapping[str, Timeouts] = field(default_factory=dict)
+
+    def for_host(self, host: str) -> Timeouts:
+        """Return the timeouts of a host."""
+        return self.hosts.get(host, self.default)
+
+
+@functools.cache
+def default_https_context() -> ssl.SSLContext:
+    """Return the shared default HTTPS context.
+
+    Building a context loads the system CA certificates, which costs tens of
+    milliseconds of CPU, so one context is shared by all fetches.
+    """
+    context = ssl.create_default_context()
+    context.set_alpn_protocols(["http/1.1"])
+    return context
+
+
+class _ReadTimeoutMixin:
+    """Switch the socket to the read timeout once connected."""
+
+    sock: Any
+    _create_connection: Any
+
+    def __init__(
+        self,
+        *args: Any,
+        read_timeout: float | None = None,
+        create_connection: Callable[..., socket.socket] | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.read_timeout = read_timeout
+        if create_connection is not None:
+            self._create_connection = create_connection
+
+    def connect(self) -> None:
+        super().connect()  # type: ignore[misc]
+        self.sock.settimeout(self.read_timeout)
+
+
+class _HTTPConnection(_ReadTimeoutMixin, http.client.HTTPConnection):
+    """HTTP connection with separate connect and read timeouts."""
+
+
+class _HTTPSConnection(_ReadTimeoutMixin, http.client.HTTPSConnection):
+    """HTTPS connection with separate connect and read timeouts."""
+
+
+class TimeoutHTTPHandler(urllib.request.HTTPHandler):
+    """HTTP handler applying a read timeout once the connection is up.
+
+    The connect timeout is the ``timeout`` passed to ``OpenerDirector.open``.
+    """
+
+    def __init__(
+        self,
+        read_timeout: float | None,
+        create_connection: Callable[..., socket.socket] | None = None,
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            read_timeout: Timeout of each socket read in seconds.
+            create_connection: Replacement for ``socket.create_connection``,
+                such as ``DNSCache.create_connection``.
+        """
+        super().__init__()
+        self.read_timeout = read_timeout
+        self.create_connection = create_connection
+
+    def http_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        """Open an HTTP request."""
+        return self.do_open(
+            _HTTPConnection,  # type: ignore[arg-type]
+            req,
+            read_timeout=self.read_timeout,
+            create_connection=self.create_connection,
+        )
+
+
+class TimeoutHTTPSHandler(urllib.request.HTTPSHandler):
+    """HTTPS handler applying a read timeout once the connection is up."""
+
+    def __init__(
+        self,
+        read_timeout: float | None,
+        create_connection: Callable[..., socket.socket] | None = None,
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            read_timeout: Timeout of each socket read in seconds.
+            create_connection: Replacement for ``socket.create_connection``.
+        """
+        super().__init__(context=default_https_context())
+        self.read_timeout = read_timeout
+        self.create_connection = create_connection
+
+    def https_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        """Open an HTTPS request."""
+        return self.do_open(
+            _HTTPSConnection,  # type: ignore[arg-type]
+            req,
+            context=self._context,  # type: ignore[attr-defined]
+            read_timeout=self.read_timeout,
+            create_connection=self.create_connection,
+        )
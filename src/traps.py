@@ -0,0 +1,139 @@
+"""Crawler trap detection.
+
+This module guards the crawl frontier against URL spaces that generate an
+unbounded number of unique links, such as infinite calendars, repeating
+path segments and session identifiers embedded in query strings.
+"""
+
+from __future__ import annotations
+
+import threading
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Literal
+
+from src import LOGGER
+
+TrapReason = Literal[
+    "host_budget",
+    "path_depth",
+    "repeated_segment",
+    "query_params",
+    "query_explosion",
+]
+
+
+@dataclass(slots=True)
+class HostStats:
+    """Compact per-host statistics used for trap detection.
+
+    Query variants map each URL path to the hashes of the distinct query
+    strings admitted for it. A path stops growing at ``max_query_variants``
+    hashes and a host at ``max_urls_per_host`` paths, so memory stays bounded.
+    """
+
+    urls: int = 0
+    query_variants: dict[str, set[int]] = field(default_factory=dict)
+
+
+@dataclass
+class TrapDetector:
+    """Detect crawler traps on the enqueue path.
+
+    A URL is rejected when its host has exhausted the URL budget, its path
+    is too deep, a single path segment repeats too often, it carries too
+    many query parameters, or the same path has been seen with too many
+    distinct query strings.
+
+    This class is thread-safe and can be shared between crawl workers.
+    """
+
+    max_urls_per_host: int = 10_000
+    max_path_depth: int = 16
+    max_repeated_segments: int = 3
+    max_query_params: int = 12
+    max_query_variants: int = 100
+    _hosts: dict[str, HostStats] = field(
+        init=False, repr=False, compare=False, default_factory=dict
+    )
+    _rejected: Counter[str] = field(
+        init=False, repr=False, compare=False, default_factory=Counter
+    )
+    _lock: threading.Lock = field(
+        init=False, repr=False, compare=False, default_factory=threading.Lock
+    )
+
+    def check(self, url: str) -> TrapReason | None:
+        """Check a newly discovered URL and account for it if admitted.
+
+        Args:
+            url: The absolute URL about to be enqueued.
+
+        Returns:
+            None if the URL is admitted, otherwise the reason it was rejected.
+        """
+        parts = urllib.parse.urlsplit(url)
+        reason = self._check_shape(parts)
+        with self._lock:
+            stats = self._hosts.get(parts.netloc)
+            if stats is None:
+                stats = self._hosts[parts.netloc] = HostStats()
+            if reason is None:
+                reason = self._check_host(stats, parts)
+            if reason is not None:
+                self._rejected[reason] += 1
+                return reason
+            stats.urls += 1
+            if parts.query:
+                variants = stats.query_variants.setdefault(parts.path, set())
+                variants.add(hash(parts.query))
+        return None
+
+    def allow(self, url: str) -> bool:
+        """Return True if the URL may be enqueued."""
+        reason = self.check(url)
+        if reason is not None:
+            LOGGER.debug("Trap detected (%s): %s", reason, url)
+            return False
+        return True
+
+    def _check_shape(self, parts: urllib.parse.SplitResult) -> TrapReason | None:
+        """Check the URL structure independently of host statistics."""
+        segments = [segment for segment in parts.path.split("/") if segment]
+        if len(segments) > self.max_path_depth:
+            return "path_depth"
+        if segments:
+            _, repeats = Counter(segments).most_common(1)[0]
+            if repeats > self.max_repeated_segments:
+                return "repeated_segment"
+        if parts.query and parts.query.count("&") + 1 > self.max_query_params:
+            return "query_params"
+        return None
+
+    def _check_host(
+        self, stats: HostStats, parts: urllib.parse.SplitResult
+    ) -> TrapReason | None:
+        """Check the URL against the statistics of its host."""
+        if stats.urls >= self.max_urls_per_host:
+            return "host_budget"
+        if parts.query:
+            variants = stats.query_variants.get(parts.path, ())
+            if (
+                len(variants) >= self.max_query_variants
+                and hash(parts.query) not in variants
+            ):
+                return "query_explosion"
+        return None
+
+    def host_count(self, host: str) -> int:
+        """Return the number of URLs admitted for a host."""
+        with self._lock:
+            stats = self._hosts.get(host)
+            return stats.urls if stats else 0
+
+    @property
+    def rejected(self) -> dict[str, int]:
+        """Get the number of rejected URLs per trap reason."""
+        with self._lock:
+            return dict(self._rejected)
@@ -0,0 +1,183 @@
+"""Compact interned URL storage.
+
+Every URL discovered during a crawl is stored exactly once in a
+``URLTable`` and referred to everywhere else by its integer ID. The
+``scheme://host`` prefix of each URL is dictionary-compressed and the
+remainders are packed into a single ``bytearray``, so the per-URL cost is
+a few bytes of array bookkeeping plus the UTF-8 encoded path.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+from src.locktrace import new_lock
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+
+def _split_prefix(url: str) -> tuple[str, str]:
+    """Split a URL into its ``scheme://host`` prefix and the remainder."""
+    scheme_end = url.find("://")
+    if scheme_end == -1:
+        return "", url
+    path_start = url.find("/", scheme_end + 3)
+    if path_start == -1:
+        return url, ""
+    return url[:path_start], url[path_start:]
+
+
+class URLTable:
+    """Map each URL once to a dense integer ID.
+
+    IDs are assigned sequentially from zero. Lookups by URL go through a
+    hash index of plain integers, so no full ``str`` copy of a URL is kept
+    once it has been interned; strings are only materialized on access.
+
+    This class is thread-safe and can be shared between fetchers running on
+    different threads, including with free-threaded Python.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty URL table."""
+        self._prefixes: list[str] = []
+        self._prefix_ids: dict[str, int] = {}
+        self._entry_prefix: array[int] = array("I")
+        self._offsets: array[int] = array("Q", [0])
+        self._data = bytearray()
+        self._index: dict[int, int] = {}
+        # URLs whose hash collides with an earlier, different URL
+        self._overflow: dict[str, int] = {}
+        self._lock = new_lock("URLTable")
+
+    def _materialize(self, url_id: int) -> str:
+        """Rebuild the URL string for an ID. The caller must hold the lock."""
+        start, end = self._offsets[url_id], self._offsets[url_id + 1]
+        prefix = self._prefixes[self._entry_prefix[url_id]]
+        return prefix + self._data[start:end].decode("utf-8", "surrogatepass")
+
+    def _lookup(self, url: str, key: int) -> int | None:
+        """Find the ID of a URL. The caller must hold the lock."""
+        url_id = self._index.get(key)
+        if url_id is not None and self._materialize(url_id) == url:
+            return url_id
+        return self._overflow.get(url)
+
+    def intern(self, url: str) -> int:
+        """Return the ID of a URL, adding it to the table if needed.
+
+        Args:
+            url: The URL to intern.
+
+        Returns:
+            The integer ID of the URL.
+        """
+        return self.intern_new(url)[0]
+
+    def intern_new(self, url: str) -> tuple[int, bool]:
+        """Intern a URL and report whether it was newly added.
+
+        Args:
+            url: The URL to intern.
+
+        Returns:
+            A tuple of the URL ID and True if the URL was not seen before.
+        """
+        key = hash(url)
+        with self._lock:
+            url_id = self._lookup(url, key)
+            if url_id is not None:
+                return url_id, False
+
+            prefix, rest = _split_prefix(url)
+            prefix_id = self._prefix_ids.get(prefix)
+            if prefix_id is None:
+                prefix_id = len(self._prefixes)
+                self._prefixes.append(prefix)
+                self._prefix_ids[prefix] = prefix_id
+
+            url_id = len(self._entry_prefix)
+            self._entry_prefix.append(prefix_id)
+            self._data += rest.encode("utf-8", "surrogatepass")
+            self._offsets.append(len(self._data))
+            if key in self._index:
+                self._overflow[url] = url_id
+            else:
+                self._index[key] = url_id
+            return url_id, True
+
+    def get(self, url: str) -> int | None:
+        """Return the ID of a URL without interning it."""
+        key = hash(url)
+        with self._lock:
+            return self._lookup(url, key)
+
+    def __getitem__(self, url_id: int) -> str:
+        """Materialize the URL string for an ID."""
+        with self._lock:
+            if not 0 <= url_id < len(self._entry_prefix):
+                raise IndexError(f"URL ID {url_id} out of range")
+            return self._materialize(url_id)
+
+    def __contains__(self, url: object) -> bool:
+        """Support 'in' operator for URL strings."""
+        return isinstance(url, str) and self.get(url) is not None
+
+    def __len__(self) -> int:
+        """Return the number of interned URLs."""
+        with self._lock:
+            return len(self._entry_prefix)
+
+    def host_id(self, url_id: int) -> int:
+        """Return the ID of the ``scheme://host`` prefix of a URL."""
+        with self._lock:
+            return self._entry_prefix[url_id]
+
+    def materialize(self, url_ids: Iterable[int]) -> Iterator[str]:
+        """Yield the URL strings for a sequence of IDs."""
+        for url_id in url_ids:
+            yield self[url_id]
+
+
+class IDSet:
+    """A compact set of URL IDs backed by a bitmap.
+
+    This class is not thread-safe; callers sharing an instance between
+    threads must serialize access themselves.
+    """
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self) -> None:
+        """Initialize an empty ID set."""
+        self._bits = bytearray()
+        self._count = 0
+
+    def add(self, url_id: int) -> bool:
+        """Add an ID to the set.
+
+        Returns:
+            True if the ID was added (not already present), False otherwise.
+        """
+        byte, bit = divmod(url_id, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        mask = 1 << bit
+        if self._bits[byte] & mask:
+            return False
+        self._bits[byte] |= mask
+        self._count += 1
+        return True
+
+    def __contains__(self, url_id: object) -> bool:
+        """Support 'in' operator."""
+        if not isinstance(url_id, int) or url_id < 0:
+            return False
+        byte, bit = divmod(url_id, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+    def __len__(self) -> int:
+        """Return the number of IDs in the set."""
+        return self._count
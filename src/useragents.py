@@ -0,0 +1,37 @@
+"""Browser User-Agent strings.
+
+Kept apart from ``linkfetcher`` so the CLI can list the browsers without
+importing the HTTP and HTML parsing stack.
+"""
+
+from typing import Literal
+
+# Browser User-Agent strings (latest stable versions as of 2025)
+USER_AGENTS: dict[str, str] = {
+    "chromium": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "firefox": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:134.0) "
+        "Gecko/20100101 Firefox/134.0"
+    ),
+    "brave": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36 Brave/131"
+    ),
+    "safari": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) "
+        "Version/18.2 Safari/605.1.15"
+    ),
+    "edge": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0"
+    ),
+}
+
+BrowserType = Literal["chromium", "firefox", "brave", "safari", "edge"]
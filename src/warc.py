@@ -0,0 +1,248 @@
+"""WARC output of fetched responses.
+
+``WarcWriter`` archives the responses the crawler fetches as WARC/1.1
+``response`` records, so downstream pipelines get the page content without
+fetching every page a second time. Each record is compressed as its own
+gzip member, which keeps ``.warc.gz`` files randomly accessible by offset,
+and files are rotated once they reach a size limit.
+
+Serialization, compression and disk writes happen on a background thread.
+Fetchers only hand the response over to a bounded queue; when the disk falls
+behind, the queue fills up and fetches wait for it rather than buffering
+without limit::
+
+    with WarcWriter("archive/") as warc:
+        Webcrawler(url, depth, warc=warc).crawl()
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Self
+
+from src import LOGGER, __version__
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+# The body is stored decoded, so the transfer framing no longer applies
+_DROPPED_HEADERS = frozenset({"transfer-encoding"})
+
+
+@dataclass(frozen=True, slots=True)
+class _Response:
+    """A fetched response waiting to be archived."""
+
+    url: str
+    status: int
+    reason: str
+    headers: list[tuple[str, str]]
+    body: bytes
+    date: float
+
+
+def _digest(data: bytes) -> str:
+    """Return the WARC digest of a block or payload."""
+    return "sha1:" + base64.b32encode(hashlib.sha1(data).digest()).decode("ascii")
+
+
+def _warc_date(timestamp: float) -> str:
+    """Format a timestamp as a WARC date."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def warc_record(
+    warc_type: str,
+    content_type: str,
+    block: bytes,
+    date: float,
+    fields: Iterable[tuple[str, str]] = (),
+) -> bytes:
+    """Serialize a WARC/1.1 record.
+
+    Args:
+        warc_type: The record type, such as ``response`` or ``warcinfo``.
+        content_type: The media type of the record block.
+        block: The record block.
+        date: Capture time of the record.
+        fields: Additional WARC header fields.
+
+    Returns:
+        The uncompressed record.
+    """
+    header = [
+        "WARC/1.1",
+        f"WARC-Type: {warc_type}",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {_warc_date(date)}",
+        *(f"{name}: {value}" for name, value in fields),
+        f"Content-Type: {content_type}",
+        f"WARC-Block-Digest: {_digest(block)}",
+        f"Content-Length: {len(block)}",
+    ]
+    return "\r\n".join(header).encode("utf-8") + b"\r\n\r\n" + block + b"\r\n\r\n"
+
+
+class WarcWriter:
+    """Write fetched responses to rotating ``.warc.gz`` files on a background thread."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        prefix: str = "pycrawler",
+        max_file_size: int = 1 << 30,
+        queue_size: int = 256,
+        compresslevel: int = 6,
+    ) -> None:
+        """Start the writer thread.
+
+        Args:
+            directory: Directory the WARC files are written to. It is created
+                if missing.
+            prefix: File name prefix of the WARC files.
+            max_file_size: A new file is started once the current one
+                reaches this size in bytes.
+            queue_size: Maximum number of responses waiting to be written.
+                Fetches wait for room once it is reached.
+            compresslevel: Gzip compression level of the records, from 0 to 9.
+
+        Raises:
+            ValueError: If ``compresslevel`` is out of range.
+        """
+        if not 0 <= compresslevel <= 9:
+            raise ValueError(f"compresslevel must be between 0 and 9, not {compresslevel}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.compresslevel = compresslevel
+        self.files: list[Path] = []
+        self.records = 0
+        self.error: Exception | None = None
+        self._file: IO[bytes] | None = None
+        self._queue: queue.Queue[_Response | None] = queue.Queue(queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="warc-writer", daemon=True)
+        self._thread.start()
+
+    def write_response(
+        self,
+        url: str,
+        status: int,
+        reason: str,
+        headers: Iterable[tuple[str, str]],
+        body: bytes,
+    ) -> None:
+        """Queue a fetched response for archiving.
+
+        Blocks while the queue is full.
+
+        Args:
+            url: The requested URL.
+            status: HTTP status of the response.
+            reason: HTTP reason phrase of the response.
+            headers: The response headers, in order.
+            body: The response body.
+
+        Raises:
+            RuntimeError: If the writer is closed.
+        """
+        if self._closed:
+            raise RuntimeError("WarcWriter is closed")
+        self._queue.put(_Response(url, status, reason, list(headers), body, time.time()))
+
+    def _run(self) -> None:
+        """Write queued responses until the end-of-queue marker."""
+        while (response := self._queue.get()) is not None:
+            if self.error is not None:
+                continue  # Keep draining so that fetches never block
+            try:
+                self._write(self._response_record(response))
+            except Exception as error:
+                # The thread must keep draining, or fetches block on the queue
+                self.error = error
+                LOGGER.error("WARC output disabled: %s", error)
+
+    def _response_record(self, response: _Response) -> bytes:
+        """Serialize a response record."""
+        lines = [f"HTTP/1.1 {response.status} {response.reason}"]
+        lines += [
+            f"{name}: {value}"
+            for name, value in response.headers
+            if name.lower() not in _DROPPED_HEADERS
+        ]
+        http_header = ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1", "replace")
+        return warc_record(
+            "response",
+            "application/http;msgtype=response",
+            http_header + response.body,
+            response.date,
+            [
+                ("WARC-Target-URI", response.url),
+                ("WARC-Payload-Digest", _digest(response.body)),
+            ],
+        )
+
+    def _open(self) -> IO[bytes]:
+        """Start a new WARC file with its warcinfo record."""
+        stamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+        path = self.directory / f"{self.prefix}-{stamp}-{len(self.files):05d}.warc.gz"
+        self._file = path.open("wb")
+        self.files.append(path)
+        info = f"software: pycrawler/{__version__}\r\nformat: WARC File Format 1.1\r\n"
+        self._file.write(
+            gzip.compress(
+                warc_record(
+                    "warcinfo",
+                    "application/warc-fields",
+                    info.encode("utf-8"),
+                    time.time(),
+                    [("WARC-Filename", path.name)],
+                ),
+                self.compresslevel,
+            )
+        )
+        return self._file
+
+    def _write(self, record: bytes) -> None:
+        """Append a record as its own gzip member, rotating the file if full."""
+        file = self._file or self._open()
+        file.write(gzip.compress(record, self.compresslevel))
+        self.records += 1
+        if file.tell() >= self.max_file_size:
+            file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """Write the queued responses and close the current file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the writer on exit."""
+        self.close()
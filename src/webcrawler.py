@@ -1,27 +1,87 @@
 """Webcrawler module."""
 
 
-import queue
+import asyncio
 import re
 import threading
 import urllib.parse
+from array import array
 from collections import deque
+from collections.abc import AsyncIterator, Iterator
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
 from traceback import format_exc
-from typing import TYPE_CHECKING
-
+from typing import TYPE_CHECKING, Literal
+from urllib.error import HTTPError
+
+from src import LOGGER
+from src.cache import ResponseCache
+from src.dns import DNSCache
+from src.extract import ANCHORS, ExtractionSpec
+from src.frontier import PriorityFrontier, ScoreContext, Scorer, breadth_first
+from src.linkcheck import LinkChecker
 from src.linkfetcher import BrowserType, Linkfetcher
+from src.linkgraph import LinkGraphWriter
+from src.locktrace import new_lock
+from src.metrics import CrawlMetrics, FetchTimings
+from src.profiling import NO_STAGE, StageProfiler
+from src.recrawl import RevisitScheduler
+from src.redirects import RedirectingHandler, RedirectMap
+from src.resources import ResourceFilter
+from src.retry import CircuitBreaker, FetchItem, RetryPolicy, RetryQueue
+from src.sinks import CrawlResult, ResultSink
+from src.sitemap import SitemapReader
 from src.threading_utils import (
     ThreadSafeCounter,
-    ThreadSafeList,
-    ThreadSafeSet,
     get_optimal_worker_count,
     is_gil_disabled,
 )
+from src.timeouts import Deadline, TimeoutPolicy, Timeouts
+from src.traps import TrapDetector
+from src.urltable import IDSet, URLTable
+from src.warc import WarcWriter
 
 if TYPE_CHECKING:
     from concurrent.futures import Future
 
+# What the crawl loop does with a finished fetch
+type FetchOutcome = Literal["process", "retry", "failed"]
+
+
+@dataclass(frozen=True, slots=True)
+class PageResult:
+    """The outcome of fetching one page of a crawl.
+
+    Attributes:
+        url: The fetched URL.
+        depth: Number of links followed from the root to the page; the
+            root itself has depth 0.
+        status: HTTP status of the response, None if no response was
+            received.
+        error: The fetch error, if any. HTTP errors come with a status.
+        timings: Phase timings and size of the fetch.
+        ids: IDs of the outbound links in the crawler's URL table.
+    """
+
+    url: str
+    depth: int
+    status: int | None
+    error: Exception | None
+    timings: FetchTimings
+    ids: array[int]
+    url_table: URLTable = field(repr=False)
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the page was fetched without error."""
+        return self.error is None
+
+    @property
+    def links(self) -> list[str]:
+        """Get the outbound links of the page."""
+        return list(self.url_table.materialize(self.ids))
+
 
 class Webcrawler:
     """Webcrawler class that contains the crawling logic.
@@ -40,6 +100,27 @@ class Webcrawler:
         *,
         concurrent: bool = False,
         max_workers: int | None = None,
+        trap_detector: TrapDetector | None = None,
+        url_table: URLTable | None = None,
+        sink: ResultSink | None = None,
+        graph: LinkGraphWriter | None = None,
+        scorer: Scorer | None = None,
+        sitemaps: bool = False,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeouts: TimeoutPolicy | None = None,
+        budget: float | None = None,
+        dns_cache: DNSCache | None = None,
+        metrics: CrawlMetrics | None = None,
+        profiler: StageProfiler | None = None,
+        link_checker: LinkChecker | None = None,
+        resource_filter: ResourceFilter | None = None,
+        cache: ResponseCache | None = None,
+        warc: WarcWriter | None = None,
+        revisit: RevisitScheduler | None = None,
+        extraction: ExtractionSpec = ANCHORS,
+        redirects: RedirectMap | None = None,
+        max_redirects: int = RedirectingHandler.max_redirections,
     ) -> None:
         """Initialize the webcrawler.
 
@@ -51,6 +132,61 @@ class Webcrawler:
             concurrent: If True, use concurrent crawling with thread pool.
             max_workers: Maximum number of worker threads for concurrent mode.
                         Defaults to automatic based on GIL status and task count.
+            trap_detector: Optional crawler trap detector consulted before a
+                        newly discovered URL is enqueued.
+            url_table: Shared URL table to intern discovered URLs into. A
+                        private table is created when omitted.
+            sink: Optional result sink receiving each discovered link as soon
+                        as it is found.
+            graph: Optional link graph writer recording every source to
+                        target edge observed during the crawl.
+            scorer: Frontier scoring hook; URLs with higher scores are
+                        fetched first. Defaults to breadth-first order.
+            sitemaps: If True, also seed the frontier from the sitemaps listed
+                        in robots.txt or found at /sitemap.xml.
+            retry: Optional retry policy for transient fetch failures. Failed
+                        fetches are not retried when omitted.
+            circuit_breaker: Optional per-host circuit breaker parking the
+                        URLs of hosts that keep failing.
+            timeouts: Connect, read and total fetch timeouts, optionally per
+                        host. Defaults to ``TimeoutPolicy()``.
+            budget: Optional wall-clock budget of the crawl in seconds. Once
+                        spent no new fetches are scheduled and in-flight ones
+                        are drained; fetch timeouts never outlast the budget.
+            dns_cache: Optional shared DNS cache. In unlocked crawls, hosts are
+                        resolved in the background as soon as their URLs are
+                        discovered.
+            metrics: Optional crawl metrics recording fetch timings, status
+                        codes, frontier size, in-flight requests per host and
+                        worker utilization.
+            profiler: Optional profiler timing the stages of each fetch and
+                        of the crawl loop.
+            link_checker: Optional link checker every outbound link of a
+                        fetched page is reported to, with the page as its
+                        referrer. Links the crawl may fetch are recorded with
+                        the outcome of their fetch; the others, and those
+                        left unfetched when the crawl ends, are checked.
+            resource_filter: Optional filter keeping non-HTML resources out
+                        of the crawl. URLs it rejects by extension are not
+                        enqueued, and responses it rejects by Content-Type
+                        are closed before their body is read.
+            cache: Optional on-disk response cache pages are served from
+                        and stored into.
+            warc: Optional WARC writer the fetched responses are archived
+                        to on its background thread.
+            revisit: Optional re-crawl scheduler. Fetched pages are recorded
+                        into its history; known pages it considers due are
+                        seeded, and known pages it considers fresh are not
+                        fetched again. New pages are always fetched.
+            extraction: Which links to extract from each page, and which of
+                        them to follow. Defaults to anchors only.
+            redirects: Map of the redirects seen while crawling. Redirects
+                        are not followed by the fetch: the target is enqueued
+                        like a link at the depth of the redirecting page, and
+                        known redirecting URLs are enqueued as their final
+                        URL, so each page is fetched once however many URLs
+                        redirect to it. A private map is created when omitted.
+            max_redirects: Maximum length of a chain of redirects.
         """
         self.root: str = root
         self.depth: int = depth
@@ -59,18 +195,60 @@ class Webcrawler:
         self.concurrent: bool = concurrent
         self.max_workers: int | None = max_workers
         self.host: str = urllib.parse.urlparse(root)[1]
-
-        # Thread-safe counters and collections for concurrent mode
+        self.trap_detector: TrapDetector | None = trap_detector
+        self.sink: ResultSink | None = sink
+        self.graph: LinkGraphWriter | None = graph
+        self.scorer: Scorer = scorer or breadth_first
+        self.sitemaps: bool = sitemaps
+        self.retry: RetryPolicy | None = retry
+        self.circuit_breaker: CircuitBreaker | None = circuit_breaker
+        self._retry_queue = RetryQueue()
+        self._probes: deque[FetchItem] = deque()
+        self.timeouts: TimeoutPolicy = timeouts if timeouts is not None else TimeoutPolicy()
+        self.budget: float | None = budget
+        self._deadline = Deadline(None)
+        self.dns_cache: DNSCache | None = dns_cache
+        self.metrics: CrawlMetrics | None = metrics
+        self.profiler: StageProfiler | None = profiler
+        self.link_checker: LinkChecker | None = link_checker
+        self.resource_filter: ResourceFilter | None = resource_filter
+        self.cache: ResponseCache | None = cache
+        self.warc: WarcWriter | None = warc
+        self.revisit: RevisitScheduler | None = revisit
+        self._history = revisit.history if revisit is not None else None
+        self.extraction: ExtractionSpec = extraction
+        self.redirects: RedirectMap = redirects if redirects is not None else RedirectMap()
+        self.max_redirects: int = max_redirects
+        # Length of the redirect chain leading to each redirect target
+        self._redirect_hops: dict[int, int] = {}
+
+        self.url_table: URLTable = url_table if url_table is not None else URLTable()
+        if graph is not None:
+            graph.attach(self.url_table)
+
+        # Discovered URLs are stored once in the URL table and tracked by ID.
+        # In concurrent mode they are only mutated by the scheduling thread.
+        self._url_ids: array[int] = array("q")
+        self._discovered = IDSet()
+        self._visited = IDSet()
+        # URLs rejected by the resource filter
+        self._skipped = IDSet()
+        # URLs admitted by the trap detector, so each is counted once
+        self._admitted = IDSet()
+        # Known URLs the revisit scheduler does not fetch again yet
+        self._fresh = IDSet()
+        self._inlinks: array[int] = array("I")
+        # (priority, lastmod) hints for URLs seeded from sitemaps
+        self._hints: dict[int, tuple[float | None, str | None]] = {}
+        self._lock = new_lock("Webcrawler")
+
+        # Thread-safe counters for concurrent mode
         if concurrent:
             self._links_counter = ThreadSafeCounter()
             self._followed_counter = ThreadSafeCounter()
-            self._urls_safe = ThreadSafeList[str]()
-            self._visited = ThreadSafeSet[str]()
-            self._lock = threading.Lock()
         else:
             self._links: int = 0
             self._followed: int = 0
-            self._urls: list[str] = []
 
     @property
     def links(self) -> int:
@@ -104,164 +282,638 @@ class Webcrawler:
         else:
             self._followed = value
 
+    @property
+    def skipped(self) -> int:
+        """Get the number of resources skipped by the resource filter."""
+        return len(self._skipped)
+
+    @property
+    def fresh(self) -> int:
+        """Get the number of known pages not due for a revisit."""
+        return len(self._fresh)
+
+    @property
+    def url_ids(self) -> array[int]:
+        """Get the IDs of the discovered URLs in the URL table."""
+        with self._lock:
+            return array("q", self._url_ids)
+
     @property
     def urls(self) -> list[str]:
         """Get the list of discovered URLs."""
-        if self.concurrent:
-            return self._urls_safe.to_list()
-        return self._urls
+        return list(self.url_table.materialize(self.url_ids))
 
     @urls.setter
     def urls(self, value: list[str]) -> None:
         """Set the URLs list."""
+        ids = array("q", map(self.url_table.intern, value))
+        discovered = IDSet()
+        for url_id in ids:
+            discovered.add(url_id)
+        with self._lock:
+            self._url_ids = ids
+            self._discovered = discovered
+
+    def _record_link(self, page: Linkfetcher) -> None:
+        """Record the outcome of a fetch with the link checker, if any.
+
+        Redirects that were not followed are recorded by ``_follow_redirect``.
+        """
+        if self.link_checker is not None and page.redirect_to is None:
+            self.link_checker.record(page.url, page.status, page.error)
+
+    def _record_outlinks(self, page: Linkfetcher) -> None:
+        """Count the outbound links of a fetched page and record its edges."""
+        ids = page.ids
+        inlinks = self._inlinks
+        if ids:
+            missing = max(ids) + 1 - len(inlinks)
+            if missing > 0:
+                inlinks.frombytes(bytes(inlinks.itemsize * missing))
+        for url_id in ids:
+            inlinks[url_id] += 1
+        if self.graph is not None:
+            self.graph.add_edges(self.url_table.intern(page.url), ids)
+        if self.link_checker is not None:
+            # Links the crawl may fetch are checked by that fetch instead
+            for url in self.url_table.materialize(ids):
+                host = urllib.parse.urlparse(url)[1]
+                if not self.locked or re.match(f".*{self.host}", host):
+                    self.link_checker.defer(url, page.url)
+                else:
+                    self.link_checker.submit(url, page.url)
+
+    def _redirect_target(self, url_id: int) -> int:
+        """Return the ID of the final URL a URL is known to redirect to."""
+        redirect = self.redirects.get(self.url_table[url_id])
+        return url_id if redirect is None else self.url_table.intern(redirect.target)
+
+    def _follow_redirect(
+        self, page: Linkfetcher, target: str, frontier: PriorityFrontier, depth: int
+    ) -> None:
+        """Enqueue the target of a redirect, unless the chain is too long.
+
+        Args:
+            page: The redirecting page.
+            target: The URL the page redirects to.
+            frontier: The crawl frontier.
+            depth: The crawl depth of the page.
+        """
+        intern = self.url_table.intern
+        target_id = intern(target)
+        hops = self._redirect_hops.get(intern(page.url), 0) + 1
+        if hops > self.max_redirects:
+            LOGGER.warning("Not following %s -> %s: too many redirects", page.url, target)
+            if self.link_checker is not None:
+                # Checked once the crawl ends, following the whole chain
+                self.link_checker.defer(page.url)
+            return
+        if self.link_checker is not None:
+            self.link_checker.redirect(page.url, target)
+        self._redirect_hops.setdefault(target_id, hops)
+        if target_id in self._visited:
+            return
+        if self._discover(target_id, page.url, page.status, depth):
+            self._count_link()
+            self._enqueue(frontier, target_id, depth)
+
+    def _enqueue(self, frontier: PriorityFrontier, url_id: int, depth: int) -> None:
+        """Score a URL and push it onto the frontier, unless it is filtered out."""
+        target = self._redirect_target(url_id)
+        if target != url_id:
+            if target in self._visited:
+                return
+            url_id = target
+        if url_id in self._fresh:
+            return
+        resource_filter = self.resource_filter
+        if (
+            resource_filter is not None
+            and url_id not in frontier  # rescoring a queued URL
+            and not resource_filter.allow_url(self.url_table[url_id])
+        ):
+            self._skipped.add(url_id)
+            return
+        priority, lastmod = self._hints.get(url_id, (None, None))
+        context = ScoreContext(
+            self.url_table[url_id],
+            depth,
+            self._inlinks[url_id] if url_id < len(self._inlinks) else 0,
+            priority,
+            lastmod,
+        )
+        frontier.push(url_id, depth, self.scorer(context))
+
+    def _count_link(self) -> None:
+        """Increment the links counter."""
         if self.concurrent:
-            with self._lock:
-                self._urls_safe = ThreadSafeList[str]()
-                self._urls_safe.extend(value)
+            self._links_counter.increment()
         else:
-            self._urls = value
+            self._links += 1
+
+    def _seed(self, frontier: PriorityFrontier, page: Linkfetcher) -> None:
+        """Seed the frontier from the root page, revisits and sitemaps."""
+        if page.redirect_to is not None:
+            self._follow_redirect(page, page.redirect_to, frontier, 0)
+        if self.revisit is not None:
+            self._seed_revisits(frontier, self.revisit)
+        # Links of the root page are screened for traps, but only reported
+        # as discovered once found on another page
+        for url_id in page.ids:
+            if self._admit(url_id):
+                self._enqueue(frontier, url_id, 0)
+        if not self.sitemaps:
+            return
+        reader = SitemapReader(
+            page.agent, timeout=self._timeouts_for(self.root).read
+        )
+        for entry in reader.entries(self.root):
+            url_id = self.url_table.intern(entry.loc)
+            self._hints[url_id] = (entry.priority, entry.lastmod)
+            if url_id in self._visited:
+                continue
+            if url_id in frontier:
+                # Rescore links of the root page with the sitemap hints
+                self._enqueue(frontier, url_id, 0)
+            elif self._discover(url_id, entry.source, None, 0):
+                self._count_link()
+                self._enqueue(frontier, url_id, 0)
+
+    def _seed_revisits(
+        self, frontier: PriorityFrontier, revisit: RevisitScheduler
+    ) -> None:
+        """Seed the pages due for a revisit and hold back the fresh ones."""
+        plan = revisit.plan()
+        intern = self.url_table.intern
+        for url in plan.fresh:
+            url_id = intern(url)
+            if url_id not in self._visited:
+                self._fresh.add(url_id)
+        source = str(revisit.history.path)
+        for url in plan.due:
+            url_id = intern(url)
+            if url_id in self._visited:
+                continue
+            if self._discover(url_id, source, None, 0):
+                self._count_link()
+                self._enqueue(frontier, url_id, 0)
+
+    def _admit(self, url_id: int) -> bool:
+        """Check a URL with the trap detector, if any, unless already admitted."""
+        if self.trap_detector is None or url_id in self._admitted:
+            return True
+        if not self.trap_detector.allow(self.url_table[url_id]):
+            return False
+        self._admitted.add(url_id)
+        return True
+
+    def _discover(
+        self, url_id: int, source: str, status: int | None, depth: int
+    ) -> bool:
+        """Record a newly discovered URL if it may enter the frontier.
+
+        Accepted URLs are streamed to the result sink, if one is set.
+
+        Args:
+            url_id: ID of the discovered URL in the URL table.
+            source: The page or sitemap the URL was found on.
+            status: HTTP status of the source, if known.
+            depth: The crawl depth at which the URL was discovered.
+
+        Returns:
+            True if the URL was not discovered before and passed the trap
+            detector, False otherwise.
+        """
+        if url_id in self._discovered or not self._admit(url_id):
+            return False
+        self._discovered.add(url_id)
+        with self._lock:
+            self._url_ids.append(url_id)
+        # Locked crawls only fetch the root host, which is already resolved
+        if self.dns_cache is not None and not self.locked:
+            self.dns_cache.prefetch_url(self.url_table[url_id])
+        if self.sink is not None:
+            self.sink.write(CrawlResult(self.url_table[url_id], source, depth, status))
+        return True
 
     def crawl(self) -> None:
         """Crawl the web starting from root URL.
 
-        This method crawls URLs breadth-first up to the specified depth,
-        collecting all discovered links. Uses concurrent mode if enabled.
+        This method crawls URLs in frontier priority order (breadth-first by
+        default) up to the specified depth, collecting all discovered links.
+        Uses concurrent mode if enabled.
         """
-        if self.concurrent:
-            self._crawl_concurrent()
-        else:
-            self._crawl_sequential()
+        for _ in self.iter_crawl():
+            pass
 
-    def _crawl_sequential(self) -> None:
+    def iter_crawl(self) -> Iterator[PageResult]:
+        """Crawl the web starting from root URL, yielding pages as they complete.
+
+        The crawl advances only while the iterator is consumed: when the
+        consumer stops pulling, no new fetches are started (in concurrent
+        mode the fetches already in flight still complete). Closing the
+        iterator early stops the crawl. Fetches scheduled for a retry are
+        yielded once, with the outcome of their last attempt.
+
+        Yields:
+            The result of each fetched page, the root first.
+        """
+        self._deadline = Deadline(self.budget)
+        if self.metrics is not None:
+            self.metrics.start(workers=1)
+        try:
+            if self.concurrent:
+                yield from self._crawl_concurrent()
+            else:
+                yield from self._crawl_sequential()
+        finally:
+            if self.link_checker is not None:
+                # Links left unfetched by the depth, budget or filters
+                self.link_checker.check_deferred()
+        if self._deadline.expired():
+            LOGGER.warning("Crawl budget of %ss spent, crawl stopped early", self.budget)
+
+    async def __aiter__(self) -> AsyncIterator[PageResult]:
+        """Crawl asynchronously, yielding pages as they complete.
+
+        Each page is pulled from ``iter_crawl`` on a worker thread, so the
+        event loop is never blocked and the crawl pauses while the consumer
+        does not pull. Wrap the iteration in ``contextlib.aclosing`` to stop
+        the crawl promptly when breaking out early.
+        """
+        pages = self.iter_crawl()
+        try:
+            while (page := await asyncio.to_thread(next, pages, None)) is not None:
+                yield page
+        finally:
+            await asyncio.to_thread(pages.close)
+
+    def _timeouts_for(self, url: str) -> Timeouts:
+        """Return the fetch timeouts of a URL, capped by the crawl budget."""
+        host = urllib.parse.urlparse(url)[1]
+        return self.timeouts.for_host(host).bounded(self._deadline.remaining())
+
+    def _stage(self, name: str) -> AbstractContextManager[object]:
+        """Time a block as a profiler stage, if profiling is enabled."""
+        if self.profiler is None:
+            return NO_STAGE
+        return self.profiler.stage(name)
+
+    def _observe_fetch(self, page: Linkfetcher) -> None:
+        """Record the timings and outcome of a fetch in the crawl metrics."""
+        if self.metrics is not None:
+            self.metrics.observe_fetch(page.timings, page.status, page.error)
+
+    def _result(self, page: Linkfetcher, depth: int) -> PageResult:
+        """Build the result of a fetched page."""
+        return PageResult(
+            page.url, depth, page.status, page.error, page.timings, page.ids, self.url_table
+        )
+
+    def _observe_frontier(self, frontier: PriorityFrontier) -> None:
+        """Record the frontier size in the crawl metrics."""
+        if self.metrics is not None:
+            self.metrics.frontier_size.set(len(frontier))
+
+    def _process_page(
+        self, page: Linkfetcher, frontier: PriorityFrontier, depth: int
+    ) -> None:
+        """Discover and enqueue the links of a successfully fetched page.
+
+        Args:
+            page: The fetched page.
+            frontier: The crawl frontier.
+            depth: The crawl depth of the page.
+        """
+        if page.skipped:
+            self._skipped.add(self.url_table.intern(page.url))
+            return
+        if page.redirect_to is not None:
+            self._follow_redirect(page, page.redirect_to, frontier, depth)
+            return
+        self._record_outlinks(page)
+        for link_id in page.ids:
+            if self.concurrent and link_id in self._visited:
+                continue
+            if self._discover(link_id, page.url, page.status, depth + 1):
+                self._count_link()
+                self._enqueue(frontier, link_id, depth + 1)
+            elif link_id in frontier:
+                # Rescore as the in-link count has grown
+                self._enqueue(frontier, link_id, depth + 1)
+
+    def _next_scheduled(self) -> tuple[FetchItem, bool] | None:
+        """Return the next due circuit probe or ready retry, if any.
+
+        Returns:
+            A tuple of the fetch item and whether it is a circuit probe.
+        """
+        if self.circuit_breaker is not None:
+            self._probes.extend(self.circuit_breaker.due_probes())
+        if self._probes:
+            return self._probes.popleft(), True
+        item = self._retry_queue.pop_ready()
+        return None if item is None else (item, False)
+
+    def _waiting(self) -> bool:
+        """Return True if fetches wait on a retry delay or an open circuit."""
+        return (
+            bool(self._probes)
+            or bool(self._retry_queue)
+            or (self.circuit_breaker is not None and self.circuit_breaker.waiting())
+        )
+
+    def _wait_for_scheduled(self) -> None:
+        """Block until the next retry or circuit probe is due."""
+        delays = [self._retry_queue.next_ready_in()]
+        if self.circuit_breaker is not None:
+            delays.append(self.circuit_breaker.next_probe_in())
+        delay = min((d for d in delays if d is not None), default=0.01)
+        threading.Event().wait(max(delay, 0.001))
+
+    def _dispatchable(self, item: FetchItem, probe: bool) -> bool:
+        """Check the host circuit of a fetch, parking it if the circuit is open."""
+        if probe or self.circuit_breaker is None:
+            return True
+        host = urllib.parse.urlparse(self.url_table[item[0]])[1]
+        if self.circuit_breaker.allow(host):
+            return True
+        self.circuit_breaker.park(host, item)
+        return False
+
+    def _after_fetch(self, page: Linkfetcher, item: FetchItem) -> FetchOutcome:
+        """Update circuit state and schedule a retry if the fetch failed.
+
+        Args:
+            page: The fetched page, with ``error`` set if the fetch failed.
+            item: The (url_id, depth, attempt) of the fetch.
+
+        Returns:
+            "process" if the page should be processed, "retry" if it was
+            scheduled for a retry and "failed" if it failed for good.
+        """
+        error = page.error
+        host = urllib.parse.urlparse(page.url)[1]
+        policy = self.retry or RetryPolicy()
+        if error is not None and policy.is_retryable(error):
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_failure(host)
+            url_id, depth, attempt = item
+            if self.retry is not None and self.retry.should_retry(error, attempt):
+                delay = self.retry.delay(attempt + 1)
+                LOGGER.warning(
+                    "Retrying %s in %.2fs (retry %d): %s",
+                    page.url,
+                    delay,
+                    attempt + 1,
+                    error,
+                )
+                self._retry_queue.push((url_id, depth, attempt + 1), delay)
+                return "retry"
+        elif self.circuit_breaker is not None:
+            for released in self.circuit_breaker.record_success(host):
+                self._retry_queue.push(released)
+        self._record_link(page)
+        if error is not None and not isinstance(error, HTTPError):
+            print(f"ERROR: The URL {page.url} can't be crawled {error}")
+            return "failed"
+        return "process"
+
+    def _crawl_sequential(self) -> Iterator[PageResult]:
         """Sequential crawling implementation (original behavior)."""
-        page = Linkfetcher(self.root, browser=self.browser)
+        page = Linkfetcher(
+            self.root,
+            browser=self.browser,
+            url_table=self.url_table,
+            timeouts=self._timeouts_for(self.root),
+            dns_cache=self.dns_cache,
+            profiler=self.profiler,
+            resource_filter=self.resource_filter,
+            cache=self.cache,
+            warc=self.warc,
+            history=self._history,
+            extraction=self.extraction,
+            redirects=self.redirects,
+            follow_redirects=False,
+        )
         page.linkfetch()
-        url_queue: deque[str] = deque()
-        for url in page.urls:
-            url_queue.append(url)
-        followed: list[str] = [self.root]
+        self._observe_fetch(page)
+        self._record_link(page)
+        self._record_outlinks(page)
+        frontier = PriorityFrontier()
+        self._visited.add(self.url_table.intern(self.root))
+        with self._stage("seed"):
+            self._seed(frontier, page)
+        self._observe_frontier(frontier)
+        yield self._result(page, 0)
         n = 0
 
-        while True:
-            try:
-                url = url_queue.pop()
+        while not self._deadline.expired():
+            self._observe_frontier(frontier)
+            scheduled = self._next_scheduled()
+            if scheduled is not None:
+                item, probe = scheduled
+            elif frontier:
+                with self._stage("frontier"):
+                    url_id, depth = frontier.pop()
+                    url_id = self._redirect_target(url_id)
                 n += 1
-                if url not in followed:
-                    try:
-                        host = urllib.parse.urlparse(url)[1]
-                        if self.locked and re.match(f".*{self.host}", host):
-                            followed.append(url)
-                            self._followed += 1
-                            page = Linkfetcher(url, browser=self.browser)
-                            page.linkfetch()
-                            for link in page:
-                                if link not in self._urls:
-                                    self._links += 1
-                                    url_queue.append(link)
-                                    self._urls.append(link)
-                            if n > self.depth > 0:
-                                break
-                    except Exception as e:
-                        print("Exception")
-                        print(f"ERROR: The URL {url} can't be crawled {e}")
-                        print(format_exc())
-            except IndexError:
+                if url_id in self._visited:
+                    continue
+                host = urllib.parse.urlparse(self.url_table[url_id])[1]
+                if not (self.locked and re.match(f".*{self.host}", host)):
+                    continue
+                self._visited.add(url_id)
+                self._followed += 1
+                item, probe = (url_id, depth, 0), False
+            elif self._waiting():
+                with self._stage("wait"):
+                    self._wait_for_scheduled()
+                continue
+            else:
                 break
 
-    def _fetch_url(self, url: str) -> list[str]:
-        """Fetch links from a single URL (used in concurrent mode).
+            if not self._dispatchable(item, probe):
+                continue
+            url = self.url_table[item[0]]
+            try:
+                page = self._fetch_url(url, thread_safe=False)
+                with self._stage("process"):
+                    outcome = self._after_fetch(page, item)
+                    if outcome == "process":
+                        self._process_page(page, frontier, item[1])
+            except Exception as e:
+                print("Exception")
+                print(f"ERROR: The URL {url} can't be crawled {e}")
+                print(format_exc())
+            else:
+                if outcome != "retry":
+                    yield self._result(page, item[1] + 1)
+            if n > self.depth > 0:
+                break
+        self._observe_frontier(frontier)
+
+    def _fetch_url(self, url: str, *, thread_safe: bool = True) -> Linkfetcher:
+        """Fetch links from a single URL.
+
+        Fetch errors are recorded in the ``error`` attribute of the returned
+        page rather than raised.
 
         Args:
             url: The URL to fetch links from.
+            thread_safe: Whether the page is fetched on a worker thread.
 
         Returns:
-            List of discovered URLs.
+            The fetched page.
         """
+        page = Linkfetcher(
+            url,
+            browser=self.browser,
+            thread_safe=thread_safe,
+            url_table=self.url_table,
+            timeouts=self._timeouts_for(url),
+            dns_cache=self.dns_cache,
+            profiler=self.profiler,
+            resource_filter=self.resource_filter,
+            cache=self.cache,
+            warc=self.warc,
+            history=self._history,
+            extraction=self.extraction,
+            redirects=self.redirects,
+            follow_redirects=False,
+        )
+        metrics = self.metrics
+        host = (urllib.parse.urlparse(url)[1],)
+        if metrics is not None:
+            metrics.in_flight.inc(labels=host)
         try:
-            page = Linkfetcher(url, browser=self.browser, thread_safe=True)
-            page.linkfetch()
-            return page.urls
+            with self._stage("fetch"):
+                page.linkfetch()
         except Exception as e:
-            print(f"ERROR: The URL {url} can't be crawled {e}")
-            return []
-
-    def _crawl_concurrent(self) -> None:
+            page.error = e
+        finally:
+            if metrics is not None:
+                metrics.in_flight.dec(labels=host)
+        self._observe_fetch(page)
+        return page
+
+    def _crawl_concurrent(self) -> Iterator[PageResult]:
         """Concurrent crawling implementation using thread pool.
 
         This method takes advantage of free-threaded Python for true
-        parallelism when the GIL is disabled.
+        parallelism when the GIL is disabled. Retries and circuit probes are
+        scheduled by this loop; worker threads never sleep on a backoff. New
+        fetches are only submitted while the caller consumes the results.
         """
         # Initialize with root URL
-        page = Linkfetcher(self.root, browser=self.browser, thread_safe=True)
+        page = Linkfetcher(
+            self.root,
+            browser=self.browser,
+            thread_safe=True,
+            url_table=self.url_table,
+            timeouts=self._timeouts_for(self.root),
+            dns_cache=self.dns_cache,
+            profiler=self.profiler,
+            resource_filter=self.resource_filter,
+            cache=self.cache,
+            warc=self.warc,
+            history=self._history,
+            extraction=self.extraction,
+            redirects=self.redirects,
+            follow_redirects=False,
+        )
         page.linkfetch()
-
-        # Use thread-safe queue for URL frontier
-        url_queue: queue.Queue[tuple[str, int]] = queue.Queue()
-        for url in page.urls:
-            url_queue.put((url, 0))  # (url, depth_level)
+        self._observe_fetch(page)
+        self._record_link(page)
+        self._record_outlinks(page)
 
         # Mark root as visited
-        self._visited.add(self.root)
+        self._visited.add(self.url_table.intern(self.root))
+
+        # Priority frontier of (url_id, depth_level)
+        frontier = PriorityFrontier()
+        with self._stage("seed"):
+            self._seed(frontier, page)
+        yield self._result(page, 0)
 
         # Calculate optimal worker count
-        initial_count = url_queue.qsize()
+        initial_count = len(frontier)
         workers = self.max_workers or get_optimal_worker_count(
             max(initial_count, 10), io_bound=True
         )
+        if self.metrics is not None:
+            self.metrics.workers.set(workers)
 
         with ThreadPoolExecutor(max_workers=workers) as executor:
-            pending_futures: dict[Future[list[str]], str] = {}
-            current_depth = 0
-
-            while not url_queue.empty() or pending_futures:
-                # Submit new tasks from queue
-                while not url_queue.empty() and len(pending_futures) < workers * 2:
-                    try:
-                        url, depth = url_queue.get_nowait()
-                    except queue.Empty:
-                        break
-
-                    # Check depth limit
-                    if self.depth > 0 and depth > self.depth:
-                        continue
-
-                    # Skip if already visited
-                    if not self._visited.add(url):
-                        continue
-
-                    # Check host lock
-                    host = urllib.parse.urlparse(url)[1]
-                    if self.locked and not re.match(f".*{self.host}", host):
-                        continue
-
-                    # Submit fetch task
-                    future = executor.submit(self._fetch_url, url)
-                    pending_futures[future] = url
-                    self._followed_counter.increment()
-                    current_depth = depth
-
-                # Process completed futures
-                if pending_futures:
-                    done_futures = []
-                    for future in list(pending_futures.keys()):
-                        if future.done():
-                            done_futures.append(future)
+            pending_futures: dict[Future[Linkfetcher], FetchItem] = {}
 
+            try:
+                # Once the budget is spent, only in-flight fetches are drained
+                while pending_futures or (
+                    not self._deadline.expired() and (frontier or self._waiting())
+                ):
+                    # Submit new tasks from retries, probes and the frontier
+                    while (
+                        not self._deadline.expired() and len(pending_futures) < workers * 2
+                    ):
+                        scheduled = self._next_scheduled()
+                        if scheduled is not None:
+                            item, probe = scheduled
+                        elif frontier:
+                            with self._stage("frontier"):
+                                url_id, depth = frontier.pop()
+                                url_id = self._redirect_target(url_id)
+
+                            # Check depth limit
+                            if self.depth > 0 and depth > self.depth:
+                                continue
+
+                            # Skip if already visited
+                            if not self._visited.add(url_id):
+                                continue
+
+                            # Check host lock
+                            host = urllib.parse.urlparse(self.url_table[url_id])[1]
+                            if self.locked and not re.match(f".*{self.host}", host):
+                                continue
+
+                            self._followed_counter.increment()
+                            item, probe = (url_id, depth, 0), False
+                        else:
+                            break
+
+                        # Submit fetch task
+                        if self._dispatchable(item, probe):
+                            future = executor.submit(
+                                self._fetch_url, self.url_table[item[0]]
+                            )
+                            pending_futures[future] = item
+
+                    # Process completed futures
+                    done_futures = [future for future in pending_futures if future.done()]
                     for future in done_futures:
-                        source_url = pending_futures.pop(future)
+                        item = pending_futures.pop(future)
                         try:
-                            discovered_urls = future.result()
-                            for link in discovered_urls:
-                                if link not in self._visited:
-                                    self._links_counter.increment()
-                                    self._urls_safe.append(link)
-                                    url_queue.put((link, current_depth + 1))
+                            page = future.result()
+                            with self._stage("process"):
+                                outcome = self._after_fetch(page, item)
+                                if outcome == "process":
+                                    self._process_page(page, frontier, item[1])
                         except Exception as e:
-                            print(f"ERROR processing {source_url}: {e}")
+                            print(f"ERROR processing {self.url_table[item[0]]}: {e}")
+                        else:
+                            if outcome != "retry":
+                                yield self._result(page, item[1] + 1)
+                    self._observe_frontier(frontier)
 
                     # Brief pause to prevent busy-waiting
                     if not done_futures:
-                        threading.Event().wait(0.01)
+                        with self._stage("wait"):
+                            threading.Event().wait(0.01)
+            finally:
+                # Stop fetching if the consumer closed the iterator early
+                for future in pending_futures:
+                    future.cancel()
 
     @staticmethod
     def is_free_threaded() -> bool:
@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
+Page = str | tuple[int, str] | tuple[int, str, str]
+SitePages = Mapping[str, Page] | Callable[[str], Page | None]
+
 # Test URLs for real HTTP tests
 TEST_URL = "https://example.com"
 TEST_URL_WITH_LINKS = "https://httpbin.org/links/5/0"
@@ -19,3 +26,71 @@ def test_url() -> str:
 def test_url_with_links() -> str:
     """Provide a URL that has multiple links."""
     return TEST_URL_WITH_LINKS
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Serve pages from the ``pages`` mapping of the owning server."""
+
+    def _page(self) -> tuple[int, bytes, str]:
+        """Look up the status, body and content type of the requested page."""
+        pages = self.server.pages  # type: ignore[attr-defined]
+        if callable(pages):
+            page = pages(self.path)
+        else:
+            page = pages.get(f"{self.command} {self.path}", pages.get(self.path))
+        if page is None:
+            page = (404, "not found")
+        if isinstance(page, str):
+            page = (200, page)
+        status, body, content_type = (*page, "text/html; charset=utf-8")[:3]
+        return status, body.encode("utf-8"), content_type
+
+    def _send_headers(self, status: int, payload: bytes, content_type: str) -> None:
+        """Send the response status and headers."""
+        self.send_response(status)
+        if 300 <= status < 400:
+            self.send_header("Location", payload.decode("utf-8"))
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        """Serve a page, or 404 if the path is unknown."""
+        status, payload, content_type = self._page()
+        self._send_headers(status, payload, content_type)
+        self.wfile.write(payload)
+
+    def do_HEAD(self) -> None:
+        """Serve the headers of a page."""
+        status, payload, content_type = self._page()
+        self._send_headers(status, payload, content_type)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence request logging."""
+
+
+@pytest.fixture
+def local_site() -> Iterator[Callable[[SitePages], str]]:
+    """Serve a synthetic website on localhost.
+
+    The fixture returns a factory taking either a mapping of path to page
+    body (or ``(status, body)`` or ``(status, body, content_type)`` tuple)
+    or a callable resolving a path to the same, and returns the base URL of
+    the running server. Mapping keys may be prefixed by a method, as in
+    ``"HEAD /a"``, to answer it differently. The body of a redirect is its
+    ``Location``.
+    """
+    servers: list[ThreadingHTTPServer] = []
+
+    def start(pages: SitePages) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+        server.pages = pages  # type: ignore[attr-defined]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
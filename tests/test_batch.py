@@ -0,0 +1,104 @@
+"""Unit tests for batch link fetching."""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import TYPE_CHECKING
+
+from main import batchlinks
+from src.batch import BatchFetcher, BatchResult, BatchStats, read_urls
+from src.threading_utils import WorkerPool
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+SITE = {
+    "/a": '<a href="/x">x</a><a href="/y">y</a>',
+    "/b": '<a href="/x">x</a>',
+    "/c": (500, "broken"),
+}
+
+
+class TestReadUrls:
+    """Tests for read_urls."""
+
+    def test_skips_blank_lines_and_comments(self) -> None:
+        """Test that blank lines and comments are skipped and URLs stripped."""
+        lines = ["# links to check\n", "http://a/\n", "\n", "  http://b/  \n"]
+        assert list(read_urls(lines)) == ["http://a/", "http://b/"]
+
+
+class TestBatchStats:
+    """Tests for BatchStats."""
+
+    def test_throughput(self) -> None:
+        """Test that results are aggregated into throughput figures."""
+        stats = BatchStats()
+        stats.add(BatchResult("http://a/", 200, ["http://x/"], None, 0.1, 100))
+        stats.add(BatchResult("http://b/", None, [], "timed out", 0.1, 0))
+        stats.elapsed = 0.5
+        assert (stats.urls, stats.failed, stats.links, stats.bytes) == (2, 1, 1, 100)
+        assert stats.urls_per_second == 4.0
+        assert stats.bytes_per_second == 200.0
+
+
+class TestBatchFetcher:
+    """Tests for BatchFetcher."""
+
+    def test_fetches_every_url(self, local_site: Callable[..., str]) -> None:
+        """Test that each URL yields its status, links and errors."""
+        base = local_site(SITE)
+        fetcher = BatchFetcher()
+        results = {r.url: r for r in fetcher.fetch(base + p for p in SITE)}
+        assert set(results) == {base + p for p in SITE}
+        assert results[base + "/a"].links == [base + "/x", base + "/y"]
+        assert results[base + "/a"].status == 200
+        assert results[base + "/a"].bytes > 0
+        assert results[base + "/c"].status == 500
+        assert not results[base + "/c"].ok
+        assert fetcher.stats.urls == 3
+        assert fetcher.stats.failed == 1
+        assert fetcher.stats.links == 3
+        assert fetcher.stats.elapsed > 0
+
+    def test_bounded_concurrency(self, local_site: Callable[..., str]) -> None:
+        """Test that no more than max_workers URLs are fetched at once."""
+        active = peak = 0
+        lock = threading.Lock()
+
+        def page(path: str) -> str:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            threading.Event().wait(0.02)
+            with lock:
+                active -= 1
+            return "leaf"
+
+        base = local_site(page)
+        with WorkerPool(8) as pool:
+            fetcher = BatchFetcher(max_workers=2, pool=pool)
+            results = list(fetcher.fetch(f"{base}/{i}" for i in range(10)))
+        assert len(results) == 10
+        assert peak <= 2
+
+
+class TestBatchlinks:
+    """Tests for the batch CLI entry point."""
+
+    def test_streams_json_lines(self, local_site: Callable[..., str], tmp_path: Path) -> None:
+        """Test that a URL file is fetched into a JSON lines file."""
+        base = local_site(SITE)
+        source = tmp_path / "urls.txt"
+        source.write_text("".join(f"{base}{p}\n" for p in SITE), encoding="utf-8")
+        output = tmp_path / "links.jsonl"
+        stats = batchlinks(str(source), str(output))
+        lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        assert stats.urls == len(lines) == 3
+        by_url = {line["url"]: line for line in lines}
+        assert by_url[base + "/b"]["links"] == [base + "/x"]
+        assert by_url[base + "/c"]["status"] == 500
+        assert by_url[base + "/c"]["error"]
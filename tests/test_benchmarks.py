@@ -0,0 +1,109 @@
+"""Unit tests for the benchmark harness."""
+
+from __future__ import annotations
+
+import json
+import urllib.request
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError
+
+import pytest
+
+from benchmarks.crawl import percentile, run_engine
+from benchmarks.primitives import WORKLOADS, load, main
+from benchmarks.site import SiteSpec, SyntheticSite
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class TestSiteSpec:
+    """Tests for SiteSpec."""
+
+    def test_links_are_deterministic(self) -> None:
+        """Test that the link structure only depends on the seed."""
+        spec = SiteSpec(pages=50, fanout=4, seed=3)
+        assert spec.links(7) == SiteSpec(pages=50, fanout=4, seed=3).links(7)
+        assert spec.links(7) != SiteSpec(pages=50, fanout=4, seed=4).links(7)
+        assert spec.links(7)[0] == 8
+        assert spec.links(49)[0] == 0
+        assert len(spec.links(7)) == 4
+
+    def test_page_size(self) -> None:
+        """Test that pages are padded to the requested size."""
+        spec = SiteSpec(pages=10, fanout=3, page_size=2048)
+        assert len(spec.render(1)) == 2048
+
+    @pytest.mark.parametrize("rate", [0.0, 0.3, 1.0])
+    def test_error_rate(self, rate: float) -> None:
+        """Test that roughly error_rate of the pages fail."""
+        spec = SiteSpec(pages=1000, error_rate=rate)
+        failures = sum(spec.fails(page) for page in range(spec.pages))
+        assert abs(failures / spec.pages - rate) < 0.05
+
+
+class TestSyntheticSite:
+    """Tests for SyntheticSite."""
+
+    def test_serves_pages_and_errors(self) -> None:
+        """Test that pages, errors and unknown paths are served."""
+        spec = SiteSpec(pages=20, fanout=2, latency=0, error_rate=0.5, seed=1)
+        failing = next(page for page in range(spec.pages) if spec.fails(page))
+        working = next(page for page in range(spec.pages) if not spec.fails(page))
+        with SyntheticSite(spec) as site:
+            with urllib.request.urlopen(f"{site.url}p/{working}") as response:
+                assert response.read() == spec.render(working)
+            for path, status in [(f"p/{failing}", 500), ("p/99", 404), ("x", 404)]:
+                with pytest.raises(HTTPError) as error:
+                    urllib.request.urlopen(site.url + path)
+                assert error.value.code == status
+            assert site.requests == 4
+
+
+class TestCrawlBenchmark:
+    """Tests for the crawl benchmark runner."""
+
+    def test_percentile(self) -> None:
+        """Test nearest-rank percentiles."""
+        values = [float(n) for n in range(1, 101)]
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0
+
+    @pytest.mark.parametrize("engine", ["sequential", "concurrent"])
+    def test_run_engine(self, engine: str) -> None:
+        """Test that a run crawls the whole synthetic site."""
+        spec = SiteSpec(pages=30, fanout=3, page_size=512, latency=0)
+        with SyntheticSite(spec) as site:
+            result = run_engine(engine, site.url, workers=4)
+        assert result.engine == engine
+        # Every page but the root is fetched through the timed path
+        assert result.pages == spec.pages - 1
+        assert result.pages_per_second > 0
+        assert result.p99_ms >= result.p50_ms > 0
+
+
+class TestPrimitivesBenchmark:
+    """Tests for the threading primitives benchmark."""
+
+    def test_results_cover_every_workload(self, tmp_path: Path) -> None:
+        """Test that every workload is measured and written as JSON."""
+        output = tmp_path / "primitives.json"
+        results = main(["--threads", "1", "3", "--ops", "200", "--repeat", "1",
+                        "--json", str(output)])
+        assert {(r.benchmark, r.threads) for r in results} == {
+            (name, threads) for name in WORKLOADS for threads in (1, 3)
+        }
+        assert all(r.ops == r.threads * 200 and r.ops_per_second > 0 for r in results)
+        payload = json.loads(output.read_text(encoding="utf-8"))
+        assert "gil_disabled" in payload["environment"]
+        assert load(output) == results
+
+    def test_compare_with_baseline(self, tmp_path: Path) -> None:
+        """Test that a previous run can be compared against."""
+        baseline = tmp_path / "baseline.json"
+        main(["--benchmarks", "list.append", "--threads", "2", "--ops", "100",
+              "--json", str(baseline)])
+        results = main(["--benchmarks", "list.append", "--threads", "2", "--ops",
+                        "100", "--compare", str(baseline)])
+        assert len(results) == 1
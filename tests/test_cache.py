@@ -0,0 +1,214 @@
+"""Unit tests for the on-disk response cache."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError
+
+import pytest
+
+from src.cache import CacheMissError, ResponseCache
+from src.linkfetcher import Linkfetcher
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at an arbitrary time."""
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Provide a fake wall clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: FakeClock) -> Iterator[ResponseCache]:
+    """Provide an empty response cache."""
+    with ResponseCache(tmp_path / "cache.sqlite3", ttl=60, clock=clock) as cache:
+        yield cache
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_round_trip(self, cache: ResponseCache) -> None:
+        """Test that stored responses are returned and counted."""
+        assert cache.get("http://a/") is None
+        cache.put("http://a/", 200, "text/html", b"<html>")
+        cached = cache.get("http://a/")
+        assert cached is not None
+        assert (cached.status, cached.content_type, cached.body) == (200, "text/html", b"<html>")
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 1
+
+    def test_ttl(self, cache: ResponseCache, clock: FakeClock) -> None:
+        """Test that responses older than the TTL are not served."""
+        cache.put("http://a/", 200, "text/html", b"old")
+        clock.now += 61
+        assert cache.get("http://a/") is None
+        cache.replay = True
+        assert cache.get("http://a/") is not None
+
+    def test_content_addressed(self, cache: ResponseCache) -> None:
+        """Test that identical bodies are stored once."""
+        cache.put("http://a/", 200, "text/html", b"x" * 100)
+        cache.put("http://b/", 200, "text/html", b"x" * 100)
+        assert cache.size == 100
+        assert len(cache) == 2
+
+    def test_lru_eviction(self, tmp_path: Path, clock: FakeClock) -> None:
+        """Test that the least recently used responses are evicted first."""
+        cache = ResponseCache(tmp_path / "lru.sqlite3", max_bytes=250, clock=clock)
+        for name in "abc":
+            clock.now += 1
+            cache.put(f"http://{name}/", 200, "text/html", name.encode() * 100)
+            if name == "b":
+                clock.now += 1
+                cache.get("http://a/")
+        assert cache.size <= 250
+        assert cache.get("http://a/") is not None
+        assert cache.get("http://b/") is None
+        assert cache.get("http://c/") is not None
+        cache.close()
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        """Test that responses survive reopening the database."""
+        path = tmp_path / "cache.sqlite3"
+        with ResponseCache(path) as cache:
+            cache.put("http://a/", 404, None)
+        with ResponseCache(path) as cache:
+            cached = cache.get("http://a/")
+            assert cached is not None and cached.status == 404
+            assert cache.size == 0
+
+    def test_legacy_schema(self, tmp_path: Path) -> None:
+        """Test that databases without the location column are upgraded."""
+        path = tmp_path / "cache.sqlite3"
+        with sqlite3.connect(path) as db:
+            db.executescript(
+                "CREATE TABLE responses (url TEXT PRIMARY KEY, status INTEGER NOT NULL, "
+                "content_type TEXT, digest BLOB NOT NULL, fetched_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+        db.close()
+        with ResponseCache(path) as cache:
+            cache.put("http://a/", 302, None, location="http://b/")
+            cached = cache.get("http://a/")
+            assert cached is not None and cached.location == "http://b/"
+
+
+class TestFetchCache:
+    """Tests for serving fetches from the cache."""
+
+    @staticmethod
+    def counting_site(
+        local_site: Callable[..., str], pages: dict[str, str | tuple[int, str]]
+    ) -> tuple[str, Counter[str]]:
+        """Serve pages, counting the requests of each path."""
+        hits: Counter[str] = Counter()
+        lock = threading.Lock()
+
+        def page(path: str) -> str | tuple[int, str] | None:
+            with lock:
+                hits[path] += 1
+            return pages.get(path)
+
+        return local_site(page), hits
+
+    def test_served_from_cache(
+        self, local_site: Callable[..., str], cache: ResponseCache
+    ) -> None:
+        """Test that a cached page is not fetched again."""
+        base, hits = self.counting_site(local_site, {"/": '<a href="/a">a</a>'})
+        for _ in range(2):
+            page = Linkfetcher(base + "/", cache=cache)
+            page.linkfetch()
+            assert page.urls == [base + "/a"]
+            assert page.status == 200
+        assert hits["/"] == 1
+        assert cache.hits == 1
+
+    def test_error_responses_are_replayed(
+        self, local_site: Callable[..., str], cache: ResponseCache
+    ) -> None:
+        """Test that cached client errors are raised like fetched ones."""
+        base, hits = self.counting_site(local_site, {})
+        for _ in range(2):
+            page = Linkfetcher(base + "/missing", cache=cache)
+            page.linkfetch()
+            assert page.status == 404
+            assert isinstance(page.error, HTTPError)
+            assert page.broken_urls == [base + "/missing"]
+        assert hits["/missing"] == 1
+
+    def test_replay_miss(self, cache: ResponseCache) -> None:
+        """Test that replay mode never reaches the network."""
+        cache.replay = True
+        page = Linkfetcher("http://127.0.0.1:9/", cache=cache)
+        with pytest.raises(CacheMissError):
+            page.linkfetch()
+        assert isinstance(page.error, CacheMissError)
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_replayed_crawl(
+        self, local_site: Callable[..., str], cache: ResponseCache, concurrent: bool
+    ) -> None:
+        """Test that a crawl can be replayed entirely from the cache."""
+        base, hits = self.counting_site(
+            local_site,
+            {"/": '<a href="/a">a</a>', "/a": '<a href="/b">b</a>', "/b": "leaf"},
+        )
+        first = Webcrawler(base + "/", 0, concurrent=concurrent, cache=cache)
+        first.crawl()
+        fetched = sum(hits.values())
+        cache.replay = True
+        replayed = Webcrawler(base + "/", 0, concurrent=concurrent, cache=cache)
+        replayed.crawl()
+        assert sum(hits.values()) == fetched
+        assert replayed.urls == first.urls
+        assert replayed.followed == first.followed
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_replayed_redirects(
+        self, local_site: Callable[..., str], cache: ResponseCache, concurrent: bool
+    ) -> None:
+        """Test that redirects are cached and followed again when replayed."""
+        base, hits = self.counting_site(
+            local_site,
+            {
+                "/": '<a href="/docs">docs</a>',
+                "/docs": (301, "/docs/"),
+                "/docs/": '<a href="/leaf">leaf</a>',
+                "/leaf": "leaf",
+            },
+        )
+        first = Webcrawler(base + "/", 0, concurrent=concurrent, cache=cache)
+        first.crawl()
+        cached = cache.get(base + "/docs")
+        assert cached is not None
+        assert (cached.status, cached.location) == (301, base + "/docs/")
+        fetched = sum(hits.values())
+        cache.replay = True
+        replayed = Webcrawler(base + "/", 0, concurrent=concurrent, cache=cache)
+        replayed.crawl()
+        assert sum(hits.values()) == fetched
+        assert replayed.urls == first.urls
+        assert base + "/leaf" in replayed.urls
+        assert replayed.followed == first.followed
+        assert replayed.redirects.resolve(base + "/docs") == base + "/docs/"
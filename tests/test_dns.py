@@ -0,0 +1,186 @@
+"""Unit tests for the DNS resolution cache."""
+
+from __future__ import annotations
+
+import socket
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.dns import AddrInfo, DNSCache, socket_address
+from src.linkfetcher import Linkfetcher
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubResolver:
+    """Resolve every host to localhost, failing for ``.invalid`` hosts."""
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+
+    def __call__(self, host: str, port: int) -> list[AddrInfo]:
+        self.calls[host] += 1
+        if host.endswith(".invalid"):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+
+class TestDNSCache:
+    """Tests for DNSCache."""
+
+    def test_caches_until_ttl(self) -> None:
+        """Test that resolutions are reused until their TTL expires."""
+        clock = FakeClock()
+        resolver = StubResolver()
+        cache = DNSCache(resolver, ttl=10, clock=clock)
+        first = cache.resolve("example.com", 80)
+        assert cache.resolve("example.com", 80) == first
+        assert resolver.calls["example.com"] == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+        clock.now = 10
+        cache.resolve("example.com", 80)
+        assert resolver.calls["example.com"] == 2
+
+    def test_negative_caching(self) -> None:
+        """Test that failures are cached for the negative TTL."""
+        clock = FakeClock()
+        resolver = StubResolver()
+        cache = DNSCache(resolver, negative_ttl=5, clock=clock)
+        for _ in range(3):
+            with pytest.raises(socket.gaierror):
+                cache.resolve("nowhere.invalid", 80)
+        assert resolver.calls["nowhere.invalid"] == 1
+        clock.now = 5
+        with pytest.raises(socket.gaierror):
+            cache.resolve("nowhere.invalid", 80)
+        assert resolver.calls["nowhere.invalid"] == 2
+
+    def test_lru_eviction(self) -> None:
+        """Test that the least recently used host is evicted first."""
+        resolver = StubResolver()
+        cache = DNSCache(resolver, max_entries=2)
+        cache.resolve("a", 80)
+        cache.resolve("b", 80)
+        cache.resolve("a", 80)
+        cache.resolve("c", 80)
+        assert len(cache) == 2
+        cache.resolve("a", 80)
+        cache.resolve("b", 80)
+        assert resolver.calls == Counter({"a": 1, "b": 2, "c": 1})
+
+    def test_concurrent_lookups_share_resolution(self) -> None:
+        """Test that simultaneous lookups of a host resolve it once."""
+        release = threading.Event()
+        calls: list[str] = []
+
+        def slow_resolver(host: str, port: int) -> list[AddrInfo]:
+            calls.append(host)
+            release.wait(5)
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+        cache = DNSCache(slow_resolver)
+        cache.prefetch("example.com", 80)
+        results: list[list[AddrInfo]] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.resolve("example.com", 80)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        cache.close()
+        assert calls == ["example.com"]
+        assert len(results) == 4
+
+    def test_prefetch_populates_cache(self) -> None:
+        """Test that a prefetched host is served from the cache."""
+        resolver = StubResolver()
+        cache = DNSCache(resolver)
+        cache.prefetch_url("https://example.com/page")
+        cache.resolve("example.com", 443)
+        cache.close()
+        assert resolver.calls["example.com"] == 1
+
+    def test_create_connection_uses_cache(self) -> None:
+        """Test that connections are made to the cached address."""
+        listener = socket.create_server(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+        cache = DNSCache(StubResolver())
+        with listener, cache.create_connection(("stub.test", port), timeout=1) as sock:
+            assert sock.getpeername() == ("127.0.0.1", port)
+
+
+class TestSocketAddress:
+    """Tests for socket_address."""
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("http://example.com/a", ("example.com", 80)),
+            ("https://example.com/a", ("example.com", 443)),
+            ("http://example.com:8080", ("example.com", 8080)),
+            ("mailto:someone@example.com", None),
+        ],
+    )
+    def test_socket_address(self, url: str, expected: tuple[str, int] | None) -> None:
+        """Test the host and port derived from URLs."""
+        assert socket_address(url) == expected
+
+
+class TestCrawlWithDNSCache:
+    """Tests for fetching through the DNS cache."""
+
+    def test_linkfetcher_resolves_through_cache(
+        self, local_site: Callable[..., str]
+    ) -> None:
+        """Test that fetches resolve hosts through the stub resolver."""
+        root = local_site({"/": '<a href="/a">a</a>'})
+        port = root.rsplit(":", 1)[1]
+        resolver = StubResolver()
+        fetcher = Linkfetcher(f"http://stub.test:{port}/", dns_cache=DNSCache(resolver))
+        fetcher.linkfetch()
+        assert fetcher.urls == [f"http://stub.test:{port}/a"]
+        assert resolver.calls["stub.test"] == 1
+
+    def test_unlocked_crawl_prefetches_hosts(
+        self, local_site: Callable[..., str]
+    ) -> None:
+        """Test that discovered hosts are resolved once for the whole crawl."""
+        ports: dict[str, str] = {}
+        site = local_site(
+            lambda path: "".join(
+                f'<a href="http://h{i}.test:{ports["site"]}/">h</a>' for i in range(3)
+            )
+        )
+        port = ports["site"] = site.rsplit(":", 1)[1]
+        resolver = StubResolver()
+        cache = DNSCache(resolver)
+        crawler = Webcrawler(
+            f"http://root.test:{port}/",
+            depth=0,
+            locked=False,
+            concurrent=True,
+            max_workers=2,
+            dns_cache=cache,
+        )
+        crawler.crawl()
+        cache.close()
+        assert crawler.followed == 3
+        assert all(resolver.calls[f"h{i}.test"] == 1 for i in range(3))
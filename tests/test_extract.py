@@ -0,0 +1,143 @@
+"""Unit tests for typed link extraction."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.extract import (
+    ALL_LINKS,
+    ANCHORS,
+    ExtractionSpec,
+    Link,
+    refresh_url,
+    srcset_urls,
+)
+from src.linkfetcher import Linkfetcher
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+PAGE = """
+<html><head>
+<link rel="canonical" href="/page">
+<link rel="next" href="?p=2">
+<link rel="stylesheet" href="site.css">
+<meta http-equiv="Refresh" content="30; URL='/moved'">
+</head><body>
+<a href="a">a</a>
+<map><area href="/area"></map>
+<iframe src="frame.html"></iframe>
+<img src="logo.png" srcset="logo-2x.png 2x, logo-3x.png 3x">
+<a name="anchor-without-href">x</a>
+</body></html>
+"""
+
+
+def extract(html: str, url: str, spec: ExtractionSpec = ALL_LINKS) -> list[Link]:
+    """Extract the links of a page."""
+    base, tags = spec.parse(html, url)
+    return list(spec.links(tags, base))
+
+
+class TestHelpers:
+    """Tests for the attribute parsers."""
+
+    @pytest.mark.parametrize(
+        ("content", "expected"),
+        [
+            ("0; url=/next", "/next"),
+            ("5;URL='/quoted'", "/quoted"),
+            ("3, http://a/b", "http://a/b"),
+            ("10", None),
+            ("", None),
+        ],
+    )
+    def test_refresh_url(self, content: str, expected: str | None) -> None:
+        """Test parsing the target of a meta refresh."""
+        assert refresh_url(content) == expected
+
+    def test_srcset_urls(self) -> None:
+        """Test that srcset descriptors are dropped."""
+        assert srcset_urls("a.png 1x, b.png 2x,c.png") == ["a.png", "b.png", "c.png"]
+
+
+class TestExtractionSpec:
+    """Tests for ExtractionSpec."""
+
+    def test_anchors(self) -> None:
+        """Test that the default spec only extracts anchors."""
+        assert extract(PAGE, "http://h/dir/", ANCHORS) == [
+            Link("http://h/dir/a", "navigation", "a")
+        ]
+
+    def test_all_links(self) -> None:
+        """Test that every kind of link is extracted in document order."""
+        assert [(link.kind, link.tag, link.url) for link in extract(PAGE, "http://h/dir/")] == [
+            ("canonical", "link", "http://h/page"),
+            ("navigation", "link", "http://h/dir/?p=2"),
+            ("resource", "link", "http://h/dir/site.css"),
+            ("redirect", "meta", "http://h/moved"),
+            ("navigation", "a", "http://h/dir/a"),
+            ("navigation", "area", "http://h/area"),
+            ("navigation", "iframe", "http://h/dir/frame.html"),
+            ("resource", "img", "http://h/dir/logo.png"),
+            ("resource", "img", "http://h/dir/logo-2x.png"),
+            ("resource", "img", "http://h/dir/logo-3x.png"),
+        ]
+
+    def test_base_href(self) -> None:
+        """Test that links resolve against the first <base href>."""
+        html = (
+            '<a href="before"></a><base href="http://cdn/root/">'
+            '<base href="http://ignored/"><a href="after"></a>'
+        )
+        assert [link.url for link in extract(html, "http://h/")] == [
+            "http://cdn/root/before",
+            "http://cdn/root/after",
+        ]
+
+    def test_relative_base_href(self) -> None:
+        """Test that a relative <base href> resolves against the page URL."""
+        html = '<base href="/docs/"><a href="x"></a>'
+        assert [link.url for link in extract(html, "http://h/a/b")] == ["http://h/docs/x"]
+
+    def test_custom_spec(self) -> None:
+        """Test extracting custom attributes."""
+        spec = ExtractionSpec(attributes=(("div", "data-href", "navigation"),))
+        html = '<div data-href="/lazy"></div><a href="/a"></a>'
+        assert [link.url for link in extract(html, "http://h/", spec)] == ["http://h/lazy"]
+
+
+class TestLinkfetcherExtraction:
+    """Tests for extracting typed links while fetching."""
+
+    def test_followed_kinds(self, local_site: Callable[..., str]) -> None:
+        """Test that only followed kinds become the URLs of the page."""
+        base = local_site({"/dir/": PAGE})
+        page = Linkfetcher(base + "/dir/", extraction=ALL_LINKS)
+        page.linkfetch()
+        assert len(page.links) == 10
+        assert page.urls == [
+            base + "/page",
+            base + "/dir/?p=2",
+            base + "/moved",
+            base + "/dir/a",
+            base + "/area",
+            base + "/dir/frame.html",
+        ]
+
+    def test_crawl_follows_meta_refresh(self, local_site: Callable[..., str]) -> None:
+        """Test that a crawl follows links beyond anchors."""
+        base = local_site(
+            {
+                "/": '<meta http-equiv="refresh" content="0; url=/next">',
+                "/next": '<link rel="next" href="/last">',
+                "/last": "end",
+            }
+        )
+        crawler = Webcrawler(base + "/", 0, extraction=ALL_LINKS)
+        fetched = [result.url for result in crawler.iter_crawl()]
+        assert fetched == [base + "/", base + "/next", base + "/last"]
@@ -0,0 +1,136 @@
+"""Unit tests for the priority frontier and URL scorers."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.frontier import (
+    PriorityFrontier,
+    ScoreContext,
+    breadth_first,
+    by_inlinks,
+    by_pattern,
+    by_priority,
+    weighted,
+)
+from src.sinks import CrawlResult, ResultSink
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestPriorityFrontier:
+    """Tests for PriorityFrontier."""
+
+    def test_pops_highest_score_first(self) -> None:
+        """Test that URLs come out in descending score order."""
+        frontier = PriorityFrontier()
+        frontier.push(1, 0, score=1.0)
+        frontier.push(2, 0, score=3.0)
+        frontier.push(3, 0, score=2.0)
+        assert [frontier.pop()[0] for _ in range(3)] == [2, 3, 1]
+
+    def test_ties_are_fifo(self) -> None:
+        """Test that equal scores are served in insertion order."""
+        frontier = PriorityFrontier()
+        for url_id in range(5):
+            frontier.push(url_id, 0)
+        assert [frontier.pop()[0] for _ in range(5)] == [0, 1, 2, 3, 4]
+
+    def test_reprioritize(self) -> None:
+        """Test that a higher score moves a queued URL forward once."""
+        frontier = PriorityFrontier()
+        frontier.push(1, 2, score=1.0)
+        frontier.push(2, 0, score=2.0)
+        assert frontier.push(1, 5, score=3.0)
+        assert not frontier.push(1, 0, score=0.5)
+        assert len(frontier) == 2
+        assert frontier.pop() == (1, 2)
+        assert frontier.pop() == (2, 0)
+        assert not frontier
+
+    def test_pop_empty_raises(self) -> None:
+        """Test that popping an empty frontier raises IndexError."""
+        with pytest.raises(IndexError):
+            PriorityFrontier().pop()
+
+    def test_contains(self) -> None:
+        """Test membership of queued URL IDs."""
+        frontier = PriorityFrontier()
+        frontier.push(7, 0)
+        assert 7 in frontier
+        frontier.pop()
+        assert 7 not in frontier
+
+
+class TestScorers:
+    """Tests for the built-in scorers."""
+
+    def test_breadth_first(self) -> None:
+        """Test that shallower URLs score higher."""
+        shallow = ScoreContext("https://example.com/a", 1, 0)
+        deep = ScoreContext("https://example.com/b", 3, 0)
+        assert breadth_first(shallow) > breadth_first(deep)
+
+    def test_by_inlinks_and_priority(self) -> None:
+        """Test in-link and priority hint scorers."""
+        context = ScoreContext("https://example.com", 0, 4, priority=0.8)
+        assert by_inlinks(context) == 4.0
+        assert by_priority(context) == 0.8
+        assert by_priority(ScoreContext("https://example.com", 0, 0)) == 0.5
+
+    def test_by_pattern(self) -> None:
+        """Test that the first matching pattern wins."""
+        scorer = by_pattern({r"/products/": 2.0, r"\.html$": 1.0}, default=-1.0)
+        assert scorer(ScoreContext("https://example.com/products/a.html", 0, 0)) == 2.0
+        assert scorer(ScoreContext("https://example.com/a.html", 0, 0)) == 1.0
+        assert scorer(ScoreContext("https://example.com/tag/a", 0, 0)) == -1.0
+
+    def test_weighted(self) -> None:
+        """Test combining scorers with weights."""
+        scorer = weighted((by_inlinks, 2.0), (breadth_first, 1.0))
+        assert scorer(ScoreContext("https://example.com", 3, 5)) == 7.0
+
+
+class OrderSink(ResultSink):
+    """Sink recording the order in which source pages were fetched."""
+
+    def __init__(self) -> None:
+        self.sources: list[str] = []
+
+    def write(self, result: CrawlResult) -> None:
+        if result.source not in self.sources:
+            self.sources.append(result.source)
+
+    def close(self) -> None:
+        pass
+
+
+class TestWebcrawlerScoring:
+    """Tests for scoring hooks on the crawler."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_scorer_controls_fetch_order(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that a limited crawl fetches the best scored page first."""
+        root = local_site(
+            {
+                "/": "".join(f'<a href="/page{i}">{i}</a>' for i in range(5)),
+                **{f"/page{i}": f'<a href="/found{i}">f</a>' for i in range(5)},
+            }
+        )
+        sink = OrderSink()
+        crawler = Webcrawler(
+            root,
+            depth=1 if not concurrent else 0,
+            concurrent=concurrent,
+            max_workers=1,
+            sink=sink,
+            scorer=by_pattern({r"/page3$": 10.0}),
+        )
+        crawler.crawl()
+        assert sink.sources[0] == f"{root}/page3"
@@ -0,0 +1,180 @@
+"""Unit tests for the broken link checker."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from main import crawl
+from src.linkcheck import LinkChecker, link_key
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestLinkKey:
+    """Tests for link_key."""
+
+    def test_strips_fragment(self) -> None:
+        """Test that links differing only by fragment share a key."""
+        assert link_key("http://a/page#top") == link_key("http://a/page") == "http://a/page"
+
+    def test_skips_other_schemes(self) -> None:
+        """Test that non-HTTP links are not checked."""
+        assert link_key("mailto:someone@example.com") is None
+        assert link_key("javascript:void(0)") is None
+
+
+class TestLinkChecker:
+    """Tests for LinkChecker."""
+
+    def test_head_statuses(self, local_site: Callable[..., str]) -> None:
+        """Test that live and broken links are told apart with HEAD."""
+        base = local_site({"/ok": "fine", "/gone": (410, "gone")})
+        checker = LinkChecker()
+        ok = checker.check(base + "/ok")
+        assert ok is not None and ok.ok and ok.method == "HEAD"
+        gone = checker.check(base + "/gone")
+        assert gone is not None and not gone.ok and gone.status == 410
+        assert checker.check("mailto:someone@example.com") is None
+
+    def test_falls_back_to_get(self, local_site: Callable[..., str]) -> None:
+        """Test that servers refusing HEAD are checked with a ranged GET."""
+        base = local_site({"HEAD /doc.pdf": (405, ""), "/doc.pdf": "%PDF"})
+        result = LinkChecker().check(base + "/doc.pdf")
+        assert result is not None and result.ok
+        assert result.method == "GET"
+
+    def test_connection_error(self) -> None:
+        """Test that unreachable links are reported with their error."""
+        result = LinkChecker().check("http://127.0.0.1:9/")
+        assert result is not None and not result.ok
+        assert result.status is None and result.error
+
+    def test_submissions_are_deduplicated(self, local_site: Callable[..., str]) -> None:
+        """Test that each link is requested once and referrers are kept."""
+        hits: Counter[str] = Counter()
+        lock = threading.Lock()
+
+        def page(path: str) -> tuple[int, str]:
+            with lock:
+                hits[path] += 1
+            return (404, "missing") if path == "/missing" else (200, "ok")
+
+        base = local_site(page)
+        checker = LinkChecker()
+        for referrer in ("http://p/1", "http://p/2"):
+            checker.submit(base + "/missing", referrer)
+            checker.submit(base + "/ok#section", referrer)
+        checker.wait(timeout=10)
+        assert hits == {"/missing": 1, "/ok": 1}
+        assert len(checker) == 2
+        assert checker.requests == 2
+        [broken] = checker.broken()
+        assert broken.url == base + "/missing"
+        assert broken.status == 404
+        assert broken.referrers == ("http://p/1", "http://p/2")
+
+
+class TestCrawlLinkCheck:
+    """Tests for link checking during a crawl."""
+
+    def test_reports_broken_outlinks(self, local_site: Callable[..., str]) -> None:
+        """Test that broken links of crawled pages are reported with referrers."""
+        base = local_site(
+            {
+                "/": '<a href="/a">a</a><a href="/dead">dead</a>',
+                "/a": '<a href="/dead">dead</a><a href="/img.png">img</a>',
+                "/img.png": "png",
+            }
+        )
+        checker = LinkChecker()
+        Webcrawler(base + "/", 0, concurrent=True, link_checker=checker).crawl()
+        checker.wait(timeout=10)
+        [broken] = checker.broken()
+        assert broken.url == base + "/dead"
+        assert broken.status == 404
+        assert set(broken.referrers) == {base + "/", base + "/a"}
+        assert checker.check(base + "/img.png").ok  # type: ignore[union-attr]
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_crawled_links_are_not_checked(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that pages the crawler fetches are not requested again."""
+        requests: Counter[str] = Counter()
+        lock = threading.Lock()
+        pages = {
+            "/": '<a href="/a">a</a><a href="/dead">dead</a><a href="/deep">deep</a>',
+            "/a": '<a href="/">home</a><a href="/dead">dead</a>',
+            "/deep": '<a href="/deeper">deeper</a>',
+            "/deeper": "leaf",
+        }
+
+        def page(path: str) -> str | None:
+            with lock:
+                requests[path] += 1
+            return pages.get(path)
+
+        base = local_site(page)
+        checker = LinkChecker()
+        Webcrawler(base + "/", 0, concurrent=concurrent, link_checker=checker).crawl()
+        checker.wait(timeout=10)
+        assert requests == Counter({"/": 1, "/a": 1, "/dead": 1, "/deep": 1, "/deeper": 1})
+        assert checker.requests == 0
+        [broken] = checker.broken()
+        assert (broken.url, broken.status) == (base + "/dead", 404)
+        assert set(broken.referrers) == {base + "/", base + "/a"}
+
+    def test_unfetched_links_are_checked(self, local_site: Callable[..., str]) -> None:
+        """Test that deferred links the crawl does not reach are checked."""
+        base = local_site({"/": '<a href="/a">a</a><a href="/b">b</a>', "/a": "a"})
+        checker = LinkChecker()
+        pages = Webcrawler(base + "/", 0, link_checker=checker).iter_crawl()
+        next(pages)
+        pages.close()
+        checker.wait(timeout=10)
+        assert checker.requests == 2
+        assert [link.url for link in checker.broken()] == [base + "/b"]
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_redirect_to_broken_link(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that a crawled link redirecting to a missing page is reported."""
+        base = local_site(
+            {
+                "/": '<a href="/old">old</a><a href="/moved">moved</a>',
+                "/old": (301, "/gone"),
+                "/moved": (302, "/new"),
+                "/new": "new",
+            }
+        )
+        checker = LinkChecker()
+        crawl(base + "/", 0, concurrent=concurrent, link_checker=checker)
+        checker.wait(timeout=10)
+        broken = {link.url: link for link in checker.broken()}
+        assert broken[base + "/old"].status == 404
+        assert broken[base + "/old"].referrers == (base + "/",)
+        assert base + "/moved" not in broken
+        assert checker.requests == 0
+
+    def test_redirect_outcome(self) -> None:
+        """Test that a redirecting link takes the outcome of its target."""
+        checker = LinkChecker()
+        checker.defer("http://a/old", "http://a/")
+        checker.redirect("http://a/old", "http://a/new")
+        checker.redirect("http://a/older", "http://a/old")
+        assert checker.broken() == []
+        checker.record("http://a/new", 410, None)
+        assert [(link.url, link.status) for link in checker.broken()] == [
+            ("http://a/new", 410),
+            ("http://a/old", 410),
+            ("http://a/older", 410),
+        ]
+        checker.redirect("http://a/again", "http://a/new")
+        assert len(checker.broken()) == 4
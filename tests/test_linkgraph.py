@@ -0,0 +1,128 @@
+"""Unit tests for link graph export and analysis."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.linkgraph import LinkGraph, LinkGraphWriter
+from src.urltable import URLTable
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+def write_graph(path: Path, edges: dict[str, list[str]]) -> URLTable:
+    """Write a small graph given as an adjacency mapping of URLs."""
+    table = URLTable()
+    with LinkGraphWriter(path, buffer_size=2) as writer:
+        writer.attach(table)
+        for source, targets in edges.items():
+            writer.add_edges(table.intern(source), map(table.intern, targets))
+    return table
+
+
+class TestLinkGraphRoundTrip:
+    """Tests for writing and loading link graphs."""
+
+    def test_edges_round_trip(self, tmp_path: Path) -> None:
+        """Test that edges and node URLs survive a round trip."""
+        path = tmp_path / "graph"
+        write_graph(path, {"a": ["b", "c"], "b": ["c"]})
+        with LinkGraph(path) as graph:
+            assert graph.node_count == 3
+            assert graph.edge_count == 3
+            assert list(graph.edges()) == [(0, 1), (0, 2), (1, 2)]
+            assert [graph.url(n) for n in range(3)] == ["a", "b", "c"]
+
+    def test_line_separators_in_urls(self, tmp_path: Path) -> None:
+        """Test that URLs containing line separators keep their node IDs."""
+        path = tmp_path / "graph"
+        urls = [
+            "http://a.com/x\nfoo\\nbar()",
+            "http://a.com/\r\u2028\x85\x0c",
+            "http://a.com/b",
+        ]
+        write_graph(path, {urls[0]: [urls[1]], urls[1]: [urls[2]]})
+        with LinkGraph(path) as graph:
+            assert graph.node_count == 3
+            assert [graph.url(n) for n in range(3)] == urls
+
+    def test_rejects_foreign_file(self, tmp_path: Path) -> None:
+        """Test that a file without the graph header is rejected."""
+        (tmp_path / "bad.edges").write_bytes(b"not a graph")
+        with pytest.raises(ValueError, match="not a link graph"):
+            LinkGraph(tmp_path / "bad")
+
+    def test_empty_graph(self, tmp_path: Path) -> None:
+        """Test loading a graph without edges."""
+        path = tmp_path / "graph"
+        LinkGraphWriter(path).close()
+        with LinkGraph(path) as graph:
+            assert graph.edge_count == 0
+            assert len(graph.pagerank()) == 0
+
+
+class TestLinkGraphAnalysis:
+    """Tests for graph analysis helpers."""
+
+    def test_degrees_and_orphans(self, tmp_path: Path) -> None:
+        """Test in/out degree and orphan detection."""
+        path = tmp_path / "graph"
+        write_graph(path, {"root": ["a", "b"], "a": ["b"], "island": ["a"]})
+        with LinkGraph(path) as graph:
+            assert list(graph.in_degree()) == [0, 2, 2, 0]
+            assert list(graph.out_degree()) == [2, 1, 0, 1]
+            assert [graph.url(n) for n in graph.orphans()] == ["root", "island"]
+
+    def test_csr(self, tmp_path: Path) -> None:
+        """Test the compressed sparse row adjacency."""
+        path = tmp_path / "graph"
+        write_graph(path, {"a": ["b", "c"], "c": ["a"]})
+        with LinkGraph(path) as graph:
+            offsets, targets = graph.csr()
+            assert list(offsets) == [0, 2, 2, 3]
+            assert list(targets) == [1, 2, 0]
+
+    def test_pagerank_favours_linked_pages(self, tmp_path: Path) -> None:
+        """Test that PageRank sums to one and ranks the hub highest."""
+        path = tmp_path / "graph"
+        write_graph(path, {"a": ["hub"], "b": ["hub"], "c": ["hub"], "hub": ["a"]})
+        with LinkGraph(path) as graph:
+            ranks = graph.pagerank()
+            assert sum(ranks) == pytest.approx(1.0)
+            hub = max(range(graph.node_count), key=ranks.__getitem__)
+            assert graph.url(hub) == "hub"
+
+
+class TestWebcrawlerGraph:
+    """Tests for recording the link graph during a crawl."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_crawl_records_edges(
+        self, local_site: Callable[..., str], tmp_path: Path, concurrent: bool
+    ) -> None:
+        """Test that every fetched page contributes its outbound edges."""
+        root = local_site(
+            {
+                "/": '<a href="/a">a</a><a href="/b">b</a>',
+                "/a": '<a href="/b">b</a>',
+                "/b": "no links",
+            }
+        )
+        path = tmp_path / "graph"
+        with LinkGraphWriter(path) as writer:
+            crawler = Webcrawler(
+                root, depth=0, concurrent=concurrent, max_workers=2, graph=writer
+            )
+            crawler.crawl()
+        with LinkGraph(path) as graph:
+            edges = {(graph.url(s), graph.url(t)) for s, t in graph.edges()}
+        assert edges == {
+            (root, f"{root}/a"),
+            (root, f"{root}/b"),
+            (f"{root}/a", f"{root}/b"),
+        }
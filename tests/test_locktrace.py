@@ -0,0 +1,87 @@
+"""Unit tests for lock contention tracing."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+
+from src.locktrace import LockTracer, TracedLock, new_lock
+from src.threading_utils import ThreadSafeSet
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestNewLock:
+    """Tests for new_lock."""
+
+    def test_plain_lock_without_tracer(self) -> None:
+        """Test that locks are not traced unless a tracer is active."""
+        assert not isinstance(new_lock("x"), TracedLock)
+
+    def test_traced_lock_within_tracer(self) -> None:
+        """Test that locks created while tracing are traced, and only those."""
+        with LockTracer():
+            assert isinstance(new_lock("x"), TracedLock)
+            assert isinstance(ThreadSafeSet()._lock, TracedLock)
+        assert not isinstance(new_lock("x"), TracedLock)
+
+
+class TestTracedLock:
+    """Tests for TracedLock."""
+
+    def test_records_acquisitions_and_hold_time(self) -> None:
+        """Test that uncontended acquisitions and hold times are recorded."""
+        with LockTracer() as tracer:
+            lock = new_lock("table")
+        for _ in range(3):
+            with lock:
+                threading.Event().wait(0.001)
+        wait, hold, contended = tracer.samples()["table"]
+        assert wait.count == hold.count == 3
+        assert hold.sum >= 0.003
+        assert contended == 0
+
+    def test_records_contention(self) -> None:
+        """Test that waiting for a held lock is counted and timed."""
+        with LockTracer() as tracer:
+            lock = new_lock("shared")
+        lock.acquire()
+        waiter = threading.Thread(target=lambda: (lock.acquire(), lock.release()))
+        waiter.start()
+        threading.Event().wait(0.02)
+        lock.release()
+        waiter.join()
+        wait, _, contended = tracer.samples()["shared"]
+        assert contended == 1
+        assert wait.sum >= 0.01
+
+    def test_non_blocking_acquire(self) -> None:
+        """Test that a failed non-blocking acquire records nothing."""
+        with LockTracer() as tracer:
+            lock = new_lock("x")
+        assert lock.acquire()
+        assert not lock.acquire(blocking=False)
+        assert lock.locked()
+        lock.release()
+        assert tracer.samples()["x"][0].count == 1
+
+
+class TestLockTracer:
+    """Tests for LockTracer reports."""
+
+    def test_crawl_report(self, local_site: Callable[..., str]) -> None:
+        """Test that a traced crawl reports the locks of its structures."""
+        base = local_site({"/": '<a href="/a">a</a>', "/a": '<a href="/">home</a>'})
+        with LockTracer() as tracer:
+            Webcrawler(base + "/", 0, concurrent=True).crawl()
+        names = set(tracer.samples())
+        assert {"URLTable", "PriorityFrontier", "ThreadSafeCounter"} <= names
+        console = Console(width=200, record=True)
+        console.print(tracer.report())
+        assert "URLTable" in console.export_text()
+        text = tracer.registry.to_prometheus()
+        assert 'pycrawler_lock_wait_seconds_count{lock="URLTable"}' in text
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import subprocess
 import sys
 import time
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -41,6 +43,18 @@ class TestParseArgs:
             args = parse_args()
             assert args.links is True
 
+    def test_parse_args_batch_without_url(self) -> None:
+        """Test that --batch does not require a URL."""
+        with patch.object(sys, "argv", ["main.py", "--batch", "urls.txt"]):
+            args = parse_args()
+            assert args.batch == "urls.txt"
+            assert args.url is None
+
+    def test_parse_args_requires_url_or_batch(self) -> None:
+        """Test that a URL is required unless --batch is given."""
+        with patch.object(sys, "argv", ["main.py"]), pytest.raises(SystemExit):
+            parse_args()
+
     def test_parse_args_with_links_long_form(self) -> None:
         """Test parsing with --links flag."""
         with patch.object(sys, "argv", ["main.py", "--links", "https://example.com"]):
@@ -86,6 +100,22 @@ class TestParseArgs:
             assert args.links is True
             assert args.url == "https://example.com"
 
+    def test_parse_args_output_defaults(self) -> None:
+        """Test that results stream to stdout as lines by default."""
+        with patch.object(sys, "argv", ["main.py", "https://example.com"]):
+            args = parse_args()
+            assert args.output is None
+            assert args.format == "lines"
+
+    def test_parse_args_output_and_format(self) -> None:
+        """Test parsing with output file and format options."""
+        with patch.object(
+            sys, "argv", ["main.py", "-o", "out.csv", "-f", "csv", "https://example.com"]
+        ):
+            args = parse_args()
+            assert args.output == "out.csv"
+            assert args.format == "csv"
+
 
 class TestTimethisDecorator:
     """Tests for timethis decorator."""
@@ -124,6 +154,44 @@ class TestTimethisDecorator:
             assert result == "done"
 
 
+class TestImportTime:
+    """Tests that the CLI starts without importing the crawler stack."""
+
+    # Modules of the crawler stack, which dominate the import time
+    HEAVY = ("bs4", "rich", "urllib.request", "ssl", "src.linkfetcher", "src.webcrawler")
+
+    @staticmethod
+    def importtime(*args: str) -> dict[str, int]:
+        """Run Python with -X importtime and return cumulative times by module."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            capture_output=True,
+            text=True,
+            check=False,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        times: dict[str, int] = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative)
+        return times
+
+    def test_version_skips_heavy_imports(self) -> None:
+        """Test that --version does not import the crawler stack."""
+        times = self.importtime("main.py", "--version")
+        assert "src" in times
+        assert not [name for name in self.HEAVY if name in times]
+
+    @pytest.mark.parametrize("module", ["main", "src"])
+    def test_import_skips_heavy_imports(self, module: str) -> None:
+        """Test that importing the CLI or the package defers the crawler stack."""
+        times = self.importtime("-c", f"import {module}")
+        assert module in times
+        assert not [name for name in self.HEAVY if name in times]
+
+
 class TestGetlinksReal:
     """Integration tests for getlinks with real HTTP requests."""
 
@@ -0,0 +1,147 @@
+"""Unit tests for the crawl metrics registry and exporters."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.metrics import CrawlMetrics, Histogram, MetricsRegistry, SnapshotWriter
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestMetrics:
+    """Tests for counters, gauges and histograms."""
+
+    def test_counter_sums_thread_shards(self) -> None:
+        """Test that increments from many threads are all counted."""
+        counter = MetricsRegistry().counter("hits_total", "Hits", ("kind",))
+
+        def work() -> None:
+            for _ in range(1000):
+                counter.inc(labels=("a",))
+            counter.inc(5, ("b",))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.samples() == {("a",): 8000, ("b",): 40}
+
+    def test_gauge_inc_dec_and_set(self) -> None:
+        """Test gauge updates and computed gauges."""
+        registry = MetricsRegistry()
+        gauge = registry.gauge("in_flight", "In flight", ("host",))
+        gauge.inc(labels=("a",))
+        gauge.inc(labels=("a",))
+        gauge.dec(labels=("a",))
+        gauge.set(7, ("b",))
+        assert gauge.samples() == {("a",): 1, ("b",): 7}
+        computed = registry.gauge("ratio", "Ratio")
+        computed.set_function(lambda: 0.25)
+        assert computed.value() == 0.25
+
+    def test_histogram_buckets_and_quantiles(self) -> None:
+        """Test bucketing, sum, count and quantile estimates."""
+        histogram = Histogram("latency", "Latency", buckets=(1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3, 10):
+            histogram.observe(value)
+        sample = histogram.sample()
+        assert sample.counts == (1, 2, 1, 1)
+        assert sample.count == 5
+        assert sample.sum == pytest.approx(16.5)
+        assert sample.quantile(0.5) == pytest.approx(1.75)
+        assert sample.quantile(1.0) == 4
+
+    def test_registry_reuses_and_checks_types(self) -> None:
+        """Test that metrics are shared by name and types cannot clash."""
+        registry = MetricsRegistry()
+        assert registry.counter("x", "X") is registry.counter("x", "X")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("x", "X")
+
+
+class TestExporters:
+    """Tests for the Prometheus and JSON exporters."""
+
+    def test_prometheus_text(self) -> None:
+        """Test the text exposition format."""
+        registry = MetricsRegistry()
+        registry.counter("responses_total", "Responses", ("status",)).inc(3, ("200",))
+        histogram = registry.histogram("fetch_seconds", "Fetch time", buckets=(0.1, 1))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        text = registry.to_prometheus()
+        assert "# TYPE responses_total counter" in text
+        assert 'responses_total{status="200"} 3' in text
+        assert 'fetch_seconds_bucket{le="0.1"} 1' in text
+        assert 'fetch_seconds_bucket{le="1"} 2' in text
+        assert 'fetch_seconds_bucket{le="+Inf"} 2' in text
+        assert "fetch_seconds_count 2" in text
+
+    def test_label_values_are_escaped(self) -> None:
+        """Test that quotes and backslashes in label values are escaped."""
+        registry = MetricsRegistry()
+        registry.counter("c", "C", ("host",)).inc(labels=('a"b\\',))
+        assert 'c{host="a\\"b\\\\"} 1' in registry.to_prometheus()
+
+    def test_snapshot_writer(self) -> None:
+        """Test that snapshots are written periodically and on close."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c", "C")
+        stream = io.StringIO()
+        with SnapshotWriter(registry, stream, interval=0.01):
+            counter.inc()
+            threading.Event().wait(0.05)
+        lines = stream.getvalue().splitlines()
+        assert len(lines) >= 2
+        final = json.loads(lines[-1])
+        assert final["metrics"]["c"]["values"] == [{"labels": {}, "value": 1.0}]
+
+
+class TestCrawlMetrics:
+    """Tests for the metrics recorded by fetches and crawls."""
+
+    def test_fetch_timings(self, local_site: Callable[..., str]) -> None:
+        """Test that a fetch records DNS, connect, TTFB, total and parse times."""
+        body = '<a href="/a">a</a>'
+        base = local_site({"/": body})
+        page = Linkfetcher(base + "/")
+        page.linkfetch()
+        timings = page.timings
+        assert timings.dns is not None and timings.connect is not None
+        assert timings.ttfb is not None and timings.total is not None
+        assert timings.total >= timings.ttfb >= timings.connect
+        assert timings.parse is not None
+        assert timings.bytes == len(body)
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_crawl_records_metrics(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that a crawl records status codes, bytes and utilization."""
+        base = local_site(
+            {
+                "/": '<a href="/a">a</a><a href="/missing">m</a>',
+                "/a": '<a href="/">home</a>',
+            }
+        )
+        metrics = CrawlMetrics()
+        Webcrawler(
+            base + "/", 0, concurrent=concurrent, max_workers=2, metrics=metrics
+        ).crawl()
+        assert metrics.responses.samples() == {("200",): 2, ("404",): 1}
+        assert metrics.fetch_seconds.sample().count == 3
+        assert metrics.response_bytes.value() > 0
+        assert metrics.in_flight.samples() == {("127.0.0.1:" + base.rsplit(":", 1)[1],): 0}
+        assert metrics.frontier_size.value() == 0
+        assert 0 < metrics.utilization.value() <= 1
+        assert "pycrawler_ttfb_seconds_count 3" in metrics.registry.to_prometheus()
@@ -0,0 +1,88 @@
+"""Unit tests for the stage and sampling profilers."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+
+from src.metrics import MetricsRegistry
+from src.profiling import SamplingProfiler, StageProfiler
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+class TestStageProfiler:
+    """Tests for StageProfiler."""
+
+    def test_stages_are_timed(self) -> None:
+        """Test that stage blocks are counted and timed."""
+        profiler = StageProfiler()
+        for _ in range(3):
+            with profiler.stage("parse"):
+                threading.Event().wait(0.001)
+        with profiler.stage("dedup"):
+            pass
+        samples = profiler.samples()
+        assert samples["parse"].count == 3
+        assert samples["parse"].sum >= 0.003
+        assert samples["dedup"].count == 1
+
+    def test_report(self) -> None:
+        """Test that the report lists the slowest stage first."""
+        profiler = StageProfiler()
+        with profiler.stage("fast"):
+            pass
+        with profiler.stage("slow"):
+            threading.Event().wait(0.002)
+        console = Console(width=120, record=True)
+        console.print(profiler.report())
+        text = console.export_text()
+        assert text.index("slow") < text.index("fast")
+        assert "100%" in text
+
+    def test_shares_registry(self) -> None:
+        """Test that stage timings are exported with the other metrics."""
+        registry = MetricsRegistry()
+        with StageProfiler(registry).stage("fetch"):
+            pass
+        assert 'pycrawler_stage_seconds_count{stage="fetch"} 1' in registry.to_prometheus()
+
+    def test_crawl_stages(self, local_site: Callable[..., str]) -> None:
+        """Test that a crawl records its fetch, parse and loop stages."""
+        base = local_site({"/": '<a href="/a">a</a>', "/a": '<a href="/">home</a>'})
+        profiler = StageProfiler()
+        Webcrawler(base + "/", 0, concurrent=True, profiler=profiler).crawl()
+        stages = profiler.samples()
+        for name in ("open", "request", "read", "parse", "extract", "dedup"):
+            assert stages[name].count == 2
+        assert stages["fetch"].count == 1
+        assert stages["process"].count == 1
+
+
+class TestSamplingProfiler:
+    """Tests for SamplingProfiler."""
+
+    def test_samples_each_thread(self, tmp_path: Path) -> None:
+        """Test that stacks are recorded per thread and written as folded files."""
+        stop = threading.Event()
+
+        def busy_worker() -> None:
+            stop.wait(5)
+
+        worker = threading.Thread(target=busy_worker, name="worker-1")
+        worker.start()
+        with SamplingProfiler(interval=0.001) as sampler:
+            threading.Event().wait(0.05)
+        stop.set()
+        worker.join()
+        assert any("busy_worker" in stack for stack in sampler.stacks["worker-1"])
+        paths = sampler.write(tmp_path)
+        assert tmp_path / "worker-1.folded" in paths
+        line = (tmp_path / "worker-1.folded").read_text(encoding="utf-8").splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert "busy_worker" in stack and int(count) > 0
@@ -0,0 +1,162 @@
+"""Unit tests for incremental re-crawl scheduling."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.recrawl import CrawlHistory, PageHistory, RevisitScheduler
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+DAY = 86400.0
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at an arbitrary time."""
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Provide a fake wall clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def history(tmp_path: Path, clock: FakeClock) -> Iterator[CrawlHistory]:
+    """Provide an empty crawl history."""
+    with CrawlHistory(tmp_path / "history.sqlite3", clock=clock) as history:
+        yield history
+
+
+class TestPageHistory:
+    """Tests for the change rate estimates of PageHistory."""
+
+    def test_prior(self) -> None:
+        """Test that a page fetched once is assumed to change at the prior rate."""
+        entry = PageHistory("http://a/", b"", 0.0, 0.0, 0.0, 1, 0)
+        assert entry.change_rate(1 / DAY) == 1 / DAY
+        assert entry.change_probability(DAY, 1 / DAY) == pytest.approx(1 - math.exp(-1))
+
+    def test_estimates(self) -> None:
+        """Test that pages changing more often get higher rates."""
+        static = PageHistory("http://a/", b"", 0.0, 10 * DAY, 0.0, 11, 0)
+        daily = PageHistory("http://b/", b"", 0.0, 10 * DAY, 10 * DAY, 11, 10)
+        weekly = PageHistory("http://c/", b"", 0.0, 10 * DAY, 7 * DAY, 11, 1)
+        rates = [entry.change_rate(1.0) for entry in (static, weekly, daily)]
+        assert rates[0] == pytest.approx(-math.log(10.5 / 10.5))
+        assert rates == sorted(rates)
+        # Changing at every visit stays finite
+        assert math.isfinite(rates[2])
+        assert daily.change_probability(11 * DAY, 1.0) > 0.9
+
+
+class TestCrawlHistory:
+    """Tests for CrawlHistory."""
+
+    def test_observe(self, history: CrawlHistory, clock: FakeClock) -> None:
+        """Test that fetches and content changes are counted."""
+        assert history.observe("http://a/", b"one")
+        clock.now += 10
+        assert not history.observe("http://a/", b"one")
+        clock.now += 10
+        assert history.observe("http://a/", b"two")
+        entry = history.get("http://a/")
+        assert entry is not None
+        assert (entry.fetches, entry.changes) == (3, 1)
+        assert entry.last_fetched == entry.last_changed == clock.now
+        assert entry.first_fetched == clock.now - 20
+        assert history.get("http://b/") is None
+        assert len(history) == 1
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        """Test that the history survives reopening the database."""
+        with CrawlHistory(tmp_path / "history.sqlite3") as history:
+            history.observe("http://a/", b"body")
+        with CrawlHistory(tmp_path / "history.sqlite3") as history:
+            assert [entry.url for entry in history.entries()] == ["http://a/"]
+
+
+class TestRevisitScheduler:
+    """Tests for RevisitScheduler."""
+
+    def test_plan(self, history: CrawlHistory, clock: FakeClock) -> None:
+        """Test that pages are due once they have probably changed."""
+        for day in range(5):
+            history.observe("http://static/", b"same")
+            history.observe("http://news/", str(day).encode())
+            clock.now += DAY
+        scheduler = RevisitScheduler(history, clock=clock)
+        plan = scheduler.plan()
+        assert plan.due == ["http://news/"]
+        assert plan.fresh == ["http://static/"]
+
+    def test_budget(self, history: CrawlHistory, clock: FakeClock) -> None:
+        """Test that the budget keeps the pages most likely to have changed."""
+        history.observe("http://old/", b"")
+        clock.now += DAY
+        history.observe("http://new/", b"")
+        clock.now += 2 * DAY
+        plan = RevisitScheduler(history, budget=1, clock=clock).plan()
+        assert plan.due == ["http://old/"]
+        assert plan.fresh == ["http://new/"]
+
+
+class TestIncrementalCrawl:
+    """Tests for crawls planned by a RevisitScheduler."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_recrawl(
+        self,
+        local_site: Callable[..., str],
+        history: CrawlHistory,
+        clock: FakeClock,
+        concurrent: bool,
+    ) -> None:
+        """Test that only new and probably changed pages are fetched again."""
+        pages = {"/": '<a href="/a">a</a>', "/a": '<a href="/b">b</a>', "/b": "leaf"}
+        hits: Counter[str] = Counter()
+        lock = threading.Lock()
+
+        def page(path: str) -> str | None:
+            with lock:
+                hits[path] += 1
+            return pages.get(path)
+
+        base = local_site(page)
+        scheduler = RevisitScheduler(history, clock=clock)
+        Webcrawler(base + "/", 0, concurrent=concurrent, revisit=scheduler).crawl()
+        assert hits == Counter({"/": 1, "/a": 1, "/b": 1})
+        assert len(history) == 3
+
+        # Within the hour nothing has probably changed, but /c is new
+        clock.now += 60
+        pages["/"] += '<a href="/c">c</a>'
+        pages["/c"] = "new"
+        crawler = Webcrawler(base + "/", 0, concurrent=concurrent, revisit=scheduler)
+        crawler.crawl()
+        assert hits == Counter({"/": 2, "/a": 1, "/b": 1, "/c": 1})
+        assert crawler.fresh == 2
+
+        # After a few days every page is due, even if no page links to it
+        clock.now += 5 * DAY
+        pages["/"] = "empty"
+        crawler = Webcrawler(base + "/", 0, concurrent=concurrent, revisit=scheduler)
+        crawler.crawl()
+        assert hits == Counter({"/": 3, "/a": 2, "/b": 2, "/c": 2})
+        assert crawler.fresh == 0
@@ -0,0 +1,166 @@
+"""Unit tests for redirect tracking."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.redirects import Redirect, RedirectMap
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from tests.conftest import Page
+
+
+class TestRedirectMap:
+    """Tests for RedirectMap."""
+
+    def test_record(self) -> None:
+        """Test that every URL of a chain maps to the final URL."""
+        redirects = RedirectMap()
+        redirects.record(["http://a/", "https://a/", "https://a/home"])
+        assert list(redirects) == [
+            Redirect("http://a/", "https://a/home", 2),
+            Redirect("https://a/", "https://a/home", 1),
+        ]
+        assert redirects.resolve("http://a/") == "https://a/home"
+        assert redirects.resolve("http://b/") == "http://b/"
+        assert redirects.get("https://a/home") is None
+
+    def test_chained_records(self) -> None:
+        """Test that redirects recorded one at a time are chained."""
+        redirects = RedirectMap()
+        redirects.record(["http://a/", "https://a/"])
+        redirects.record(["https://a/", "https://a/home"])
+        assert redirects.get("http://a/") == Redirect("http://a/", "https://a/home", 2)
+
+    def test_loop(self) -> None:
+        """Test that looping redirects resolve to no target."""
+        redirects = RedirectMap()
+        redirects.record(["http://a/", "http://a/?set-cookie", "http://a/"])
+        assert len(redirects) == 2
+        assert redirects.get("http://a/") is None
+        assert redirects.resolve("http://a/") == "http://a/"
+        assert list(redirects) == []
+
+
+class TestLinkfetcherRedirects:
+    """Tests for following redirects while fetching."""
+
+    def test_final_url(self, local_site: Callable[..., str]) -> None:
+        """Test that links resolve against the page that served them."""
+        base = local_site({"/old": (301, "/new/"), "/new/": '<a href="child">c</a>'})
+        redirects = RedirectMap()
+        page = Linkfetcher(base + "/old", redirects=redirects)
+        page.linkfetch()
+        assert page.final_url == base + "/new/"
+        assert page.hops == 1
+        assert page.urls == [base + "/new/child"]
+        assert redirects.resolve(base + "/old") == base + "/new/"
+
+    def test_max_redirects(self, local_site: Callable[..., str]) -> None:
+        """Test that chains longer than the limit fail."""
+        base = local_site({"/1": (302, "/2"), "/2": (302, "/3"), "/3": "end"})
+        redirects = RedirectMap()
+        page = Linkfetcher(base + "/1", redirects=redirects, max_redirects=1)
+        page.linkfetch()
+        assert isinstance(page.error, HTTPError)
+        assert page.status == 302
+        assert len(redirects) == 0
+
+    def test_not_followed(self, local_site: Callable[..., str]) -> None:
+        """Test that a redirect that is not followed reports its target."""
+        base = local_site({"/old": (301, "/new"), "/new": '<a href="/x">x</a>'})
+        redirects = RedirectMap()
+        page = Linkfetcher(base + "/old", redirects=redirects, follow_redirects=False)
+        page.linkfetch()
+        assert page.error is None
+        assert page.status == 301
+        assert page.redirect_to == base + "/new"
+        assert page.urls == []
+        assert redirects.resolve(base + "/old") == base + "/new"
+
+    def test_redirect_to_error(self, local_site: Callable[..., str]) -> None:
+        """Test that a chain ending in an error is recorded."""
+        base = local_site({"/old": (301, "/gone")})
+        redirects = RedirectMap()
+        page = Linkfetcher(base + "/old", redirects=redirects)
+        page.linkfetch()
+        assert page.status == 404
+        assert page.broken_urls == [base + "/gone"]
+        assert redirects.resolve(base + "/old") == base + "/gone"
+
+
+class TestCrawlRedirects:
+    """Tests for redirect-aware crawling."""
+
+    @staticmethod
+    def counting_site(
+        local_site: Callable[..., str], pages: dict[str, Page]
+    ) -> tuple[str, Counter[str]]:
+        """Serve pages, counting the requests of each path."""
+        hits: Counter[str] = Counter()
+        lock = threading.Lock()
+
+        def page(path: str) -> Page | None:
+            with lock:
+                hits[path] += 1
+            return pages.get(path)
+
+        return local_site(page), hits
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_targets_fetched_once(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that each page is fetched once however many URLs redirect to it."""
+        base, hits = self.counting_site(
+            local_site,
+            {
+                "/": '<a href="/a">a</a><a href="/b">b</a><a href="/a/">a/</a>',
+                "/a": (301, "/a/"),
+                "/a/": '<a href="/b">b</a><a href="/a">a</a><a href="/c">c</a>',
+                "/b": (302, "/a/"),
+                "/c": "leaf",
+            },
+        )
+        redirects = RedirectMap()
+        crawler = Webcrawler(base + "/", 0, concurrent=concurrent, redirects=redirects)
+        crawler.crawl()
+        assert hits == Counter({"/": 1, "/a": 1, "/b": 1, "/a/": 1, "/c": 1})
+        assert redirects.resolve(base + "/a") == base + "/a/"
+        assert redirects.resolve(base + "/b") == base + "/a/"
+
+        # Known redirects are not requested again
+        hits.clear()
+        Webcrawler(base + "/", 0, concurrent=concurrent, redirects=redirects).crawl()
+        assert hits == Counter({"/": 1, "/a/": 1, "/c": 1})
+
+    def test_redirected_root(self, local_site: Callable[..., str]) -> None:
+        """Test that the page the root redirects to is crawled once."""
+        base, hits = self.counting_site(
+            local_site, {"/": (301, "/home"), "/home": '<a href="/home">self</a>'}
+        )
+        crawler = Webcrawler(base + "/", 0)
+        results = list(crawler.iter_crawl())
+        assert [(result.url, result.status) for result in results] == [
+            (base + "/", 301),
+            (base + "/home", 200),
+        ]
+        assert hits["/home"] == 1
+
+    def test_max_redirects(self, local_site: Callable[..., str]) -> None:
+        """Test that redirect chains longer than the limit are cut."""
+        base, hits = self.counting_site(
+            local_site,
+            {"/": '<a href="/1">1</a>', "/1": (302, "/2"), "/2": (302, "/3"), "/3": "end"},
+        )
+        Webcrawler(base + "/", 0, max_redirects=1).crawl()
+        assert hits == Counter({"/": 1, "/1": 1, "/2": 1})
@@ -0,0 +1,111 @@
+"""Unit tests for non-HTML resource filtering."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.resources import ResourceFilter
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestResourceFilter:
+    """Tests for ResourceFilter."""
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "http://a/photo.PNG",
+            "http://a/report.pdf?download=1",
+            "http://a/archive.tar.gz",
+            "http://a/scan.tif",  # by guessed type
+            "http://a/movie.mp4#t=10",
+        ],
+    )
+    def test_rejects_binary_urls(self, url: str) -> None:
+        """Test that URLs of binary resources are rejected."""
+        assert not ResourceFilter().allow_url(url)
+
+    @pytest.mark.parametrize(
+        "url",
+        ["http://a/", "http://a/page", "http://a/page.html", "http://a/index.php", "http://a/v1.2/"],
+    )
+    def test_allows_page_urls(self, url: str) -> None:
+        """Test that URLs that may be HTML pages are allowed."""
+        assert ResourceFilter().allow_url(url)
+
+    def test_custom_extensions(self) -> None:
+        """Test that the skipped extensions are configurable."""
+        only_pdf = ResourceFilter(skip_extensions=frozenset({".pdf"}), skip_types=())
+        assert only_pdf.allow_url("http://a/photo.png")
+        assert not only_pdf.allow_url("http://a/doc.pdf")
+
+    def test_allow_type(self) -> None:
+        """Test Content-Type matching against the HTML patterns."""
+        resource_filter = ResourceFilter()
+        assert resource_filter.allow_type("text/html; charset=utf-8")
+        assert resource_filter.allow_type("Application/XHTML+XML")
+        assert resource_filter.allow_type(None)
+        assert not resource_filter.allow_type("image/png")
+        assert not resource_filter.allow_type("application/pdf")
+
+
+class TestContentTypeAbort:
+    """Tests for skipping responses by Content-Type."""
+
+    def test_body_is_not_read(self, local_site: Callable[..., str]) -> None:
+        """Test that a non-HTML response is closed without reading its body."""
+        base = local_site({"/file": (200, "x" * 1_000_000, "application/pdf")})
+        page = Linkfetcher(base + "/file", resource_filter=ResourceFilter())
+        page.linkfetch()
+        assert page.skipped
+        assert page.status == 200
+        assert page.content_type == "application/pdf"
+        assert page.timings.bytes == 0
+        assert page.error is None
+
+    def test_html_is_read(self, local_site: Callable[..., str]) -> None:
+        """Test that HTML responses are parsed as usual."""
+        base = local_site({"/": '<a href="/a">a</a>'})
+        page = Linkfetcher(base + "/", resource_filter=ResourceFilter())
+        page.linkfetch()
+        assert not page.skipped
+        assert page.urls == [base + "/a"]
+
+
+class TestCrawlFilter:
+    """Tests for resource filtering during a crawl."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_skips_resources(self, local_site: Callable[..., str], concurrent: bool) -> None:
+        """Test that binaries are not fetched, or not downloaded, in both engines."""
+        hits: Counter[str] = Counter()
+        lock = threading.Lock()
+        site = {
+            "/": '<a href="/a">a</a><a href="/photo.png">p</a><a href="/file">f</a>',
+            "/a": '<a href="/photo.png">p</a>',
+            "/photo.png": (200, "png", "image/png"),
+            "/file": (200, "pdf", "application/pdf"),
+        }
+
+        def page(path: str) -> tuple[int, str, str] | str:
+            with lock:
+                hits[path] += 1
+            return site[path]
+
+        base = local_site(page)
+        crawler = Webcrawler(
+            base + "/", 0, concurrent=concurrent, resource_filter=ResourceFilter()
+        )
+        crawler.crawl()
+        assert hits["/photo.png"] == 0
+        assert hits["/file"] == 1
+        assert crawler.skipped == 2
+        assert crawler.followed == 2
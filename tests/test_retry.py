@@ -0,0 +1,215 @@
+"""Unit tests for retry scheduling and circuit breaking."""
+
+from __future__ import annotations
+
+import errno
+import random
+import socket
+import ssl
+from collections import Counter
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError, URLError
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.retry import CircuitBreaker, RetryPolicy, RetryQueue
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def http_error(code: int) -> HTTPError:
+    """Build an HTTPError with the given status code."""
+    return HTTPError("http://example.com", code, "error", {}, None)  # type: ignore[arg-type]
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy."""
+
+    @pytest.mark.parametrize("attempt", [1, 2, 3, 10])
+    def test_delay_within_jitter_bounds(self, attempt: int) -> None:
+        """Test that delays grow exponentially within the jitter window."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=8.0, jitter=0.5)
+        rng = random.Random(0)
+        expected = min(8.0, 2.0 ** (attempt - 1))
+        for _ in range(100):
+            assert expected * 0.5 <= policy.delay(attempt, rng) <= expected
+
+    def test_delay_without_jitter(self) -> None:
+        """Test that a zero jitter gives exact exponential delays."""
+        policy = RetryPolicy(base_delay=0.5, jitter=0.0)
+        assert [policy.delay(n) for n in (1, 2, 3)] == [0.5, 1.0, 2.0]
+
+    def test_retryable_errors(self) -> None:
+        """Test which errors are considered transient."""
+        policy = RetryPolicy()
+        assert policy.is_retryable(http_error(503))
+        assert policy.is_retryable(http_error(429))
+        assert policy.is_retryable(URLError(ConnectionRefusedError("refused")))
+        assert policy.is_retryable(URLError(TimeoutError()))
+        assert policy.is_retryable(URLError(OSError(errno.EHOSTUNREACH, "no route")))
+        assert policy.is_retryable(URLError(socket.gaierror(socket.EAI_AGAIN, "again")))
+        assert policy.is_retryable(TimeoutError())
+        assert policy.is_retryable(ConnectionResetError())
+        assert not policy.is_retryable(http_error(404))
+        assert not policy.is_retryable(ValueError("bad"))
+
+    def test_permanent_url_errors(self) -> None:
+        """Test that URL errors that would fail again are not retried."""
+        policy = RetryPolicy()
+        assert not policy.is_retryable(URLError("unknown url type: ftp"))
+        assert not policy.is_retryable(URLError(socket.gaierror(socket.EAI_NONAME, "nx")))
+        assert not policy.is_retryable(
+            URLError(ssl.SSLCertVerificationError(1, "certificate verify failed"))
+        )
+        assert not policy.is_retryable(URLError(OSError(errno.EACCES, "denied")))
+
+    def test_should_retry_respects_max_retries(self) -> None:
+        """Test that retries stop after max_retries."""
+        policy = RetryPolicy(max_retries=2)
+        error = http_error(503)
+        assert policy.should_retry(error, 0)
+        assert policy.should_retry(error, 1)
+        assert not policy.should_retry(error, 2)
+
+
+class TestRetryQueue:
+    """Tests for RetryQueue."""
+
+    def test_items_become_ready_after_delay(self) -> None:
+        """Test that items are held back until their delay has elapsed."""
+        clock = FakeClock()
+        queue = RetryQueue(clock)
+        queue.push((1, 0, 1), 2.0)
+        queue.push((2, 0, 1), 1.0)
+        assert queue.pop_ready() is None
+        assert queue.next_ready_in() == 1.0
+        clock.now = 1.5
+        assert queue.pop_ready() == (2, 0, 1)
+        assert queue.pop_ready() is None
+        clock.now = 2.0
+        assert queue.pop_ready() == (1, 0, 1)
+        assert not queue
+        assert queue.next_ready_in() is None
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold(self) -> None:
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3)
+        for _ in range(2):
+            breaker.record_failure("a")
+        assert breaker.allow("a")
+        breaker.record_failure("a")
+        assert breaker.is_open("a")
+        assert breaker.allow("b")
+
+    def test_success_resets_failures(self) -> None:
+        """Test that a success resets the consecutive failure count."""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("a")
+        breaker.record_success("a")
+        breaker.record_failure("a")
+        assert breaker.allow("a")
+
+    def test_probe_success_releases_parked(self) -> None:
+        """Test that a successful probe closes the circuit."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure("a")
+        breaker.park("a", (1, 0, 0))
+        breaker.park("a", (2, 0, 0))
+        assert breaker.waiting()
+        assert breaker.due_probes() == []
+        assert breaker.next_probe_in() == 10
+        clock.now = 10
+        assert breaker.due_probes() == [(1, 0, 0)]
+        assert breaker.due_probes() == []
+        assert breaker.record_success("a") == [(2, 0, 0)]
+        assert breaker.allow("a")
+        assert not breaker.waiting()
+
+    def test_failed_probes_give_up_on_host(self) -> None:
+        """Test that a host is dropped after max_probes failed probes."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=1, max_probes=2, clock=clock
+        )
+        breaker.record_failure("a")
+        for item in [(1, 0, 0), (2, 0, 0), (3, 0, 0)]:
+            breaker.park("a", item)
+        for probe in [(1, 0, 0), (2, 0, 0)]:
+            clock.now += 1
+            assert breaker.due_probes() == [probe]
+            breaker.record_failure("a")
+        assert breaker.is_open("a")
+        assert not breaker.waiting()
+        breaker.park("a", (4, 0, 0))
+        assert not breaker.waiting()
+
+
+class TestWebcrawlerRetry:
+    """Tests for retrying fetches during a crawl."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_transient_failure_is_retried(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that a page failing once with 503 is crawled on retry."""
+        hits: Counter[str] = Counter()
+
+        def pages(path: str) -> tuple[int, str] | str | None:
+            hits[path] += 1
+            if path == "/":
+                return '<a href="/flaky">flaky</a>'
+            if path == "/flaky":
+                return (503, "busy") if hits[path] == 1 else '<a href="/ok">ok</a>'
+            return "ok" if path == "/ok" else None
+
+        root = local_site(pages)
+        crawler = Webcrawler(
+            root,
+            depth=0,
+            concurrent=concurrent,
+            max_workers=2,
+            retry=RetryPolicy(base_delay=0.01, jitter=0.0),
+            circuit_breaker=CircuitBreaker(),
+        )
+        crawler.crawl()
+        assert hits["/flaky"] == 2
+        assert f"{root}/ok" in crawler.urls
+
+    def test_no_retry_by_default(self, local_site: Callable[..., str]) -> None:
+        """Test that failed fetches are not retried without a policy."""
+        hits: Counter[str] = Counter()
+
+        def pages(path: str) -> tuple[int, str] | str:
+            hits[path] += 1
+            return '<a href="/down">down</a>' if path == "/" else (503, "busy")
+
+        root = local_site(pages)
+        Webcrawler(root, depth=0).crawl()
+        assert hits["/down"] == 1
+
+    def test_fetch_error_keeps_reason(self) -> None:
+        """Test that a failed fetch raises the original URLError."""
+        page = Linkfetcher("http://127.0.0.1:9/")
+        with pytest.raises(URLError) as raised:
+            page.linkfetch()
+        assert raised.value is page.error
+        assert isinstance(raised.value.reason, ConnectionRefusedError)
+        assert RetryPolicy().is_retryable(raised.value)
@@ -0,0 +1,126 @@
+"""Unit tests for the streaming result sinks."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.sinks import CrawlResult, CSVSink, JSONLSink, LineSink, ResultSink, open_sink
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+RESULT = CrawlResult("https://example.com/a", "https://example.com", 1, 200)
+
+
+class RecordingSink(ResultSink):
+    """Sink collecting results in memory."""
+
+    def __init__(self) -> None:
+        self.results: list[CrawlResult] = []
+        self.closed = False
+
+    def write(self, result: CrawlResult) -> None:
+        self.results.append(result)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestStreamSinks:
+    """Tests for the text stream sinks."""
+
+    def test_line_sink(self) -> None:
+        """Test that LineSink writes one URL per line."""
+        stream = io.StringIO()
+        LineSink(stream).write(RESULT)
+        assert stream.getvalue() == "https://example.com/a\n"
+
+    def test_jsonl_sink(self) -> None:
+        """Test that JSONLSink writes all result fields."""
+        stream = io.StringIO()
+        JSONLSink(stream).write(RESULT)
+        assert json.loads(stream.getvalue()) == {
+            "url": "https://example.com/a",
+            "source": "https://example.com",
+            "depth": 1,
+            "status": 200,
+        }
+
+    def test_csv_sink(self) -> None:
+        """Test that CSVSink writes a header and one row per result."""
+        stream = io.StringIO()
+        sink = CSVSink(stream)
+        sink.write(RESULT)
+        sink.write(CrawlResult("https://example.com/b", "https://example.com", 2, None))
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+        assert rows[0] == ["url", "source", "depth", "status"]
+        assert rows[1] == ["https://example.com/a", "https://example.com", "1", "200"]
+        assert rows[2][3] == ""
+
+    def test_context_manager_closes_owned_stream(self) -> None:
+        """Test that an owned stream is closed on exit."""
+        stream = io.StringIO()
+        with LineSink(stream, owned=True):
+            pass
+        assert stream.closed
+
+
+class TestOpenSink:
+    """Tests for open_sink."""
+
+    def test_stdout_by_default(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that no path streams to stdout."""
+        with open_sink(None) as sink:
+            sink.write(RESULT)
+        assert capsys.readouterr().out == "https://example.com/a\n"
+
+    def test_plain_file(self, tmp_path: Path) -> None:
+        """Test writing to an uncompressed file."""
+        path = tmp_path / "out.jsonl"
+        with open_sink(str(path), "jsonl") as sink:
+            sink.write(RESULT)
+        assert json.loads(path.read_text())["depth"] == 1
+
+    def test_gzip_file(self, tmp_path: Path) -> None:
+        """Test that a .gz extension produces gzip output."""
+        path = tmp_path / "out.txt.gz"
+        with open_sink(str(path)) as sink:
+            sink.write(RESULT)
+        with gzip.open(path, "rt") as handle:
+            assert handle.read() == "https://example.com/a\n"
+
+
+class TestWebcrawlerSink:
+    """Tests for streaming results from the crawler."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_sink_receives_every_url(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that each discovered URL is streamed with its source and depth."""
+        root = local_site(
+            {
+                "/": '<a href="/a">a</a>',
+                "/a": '<a href="/b">b</a>',
+                "/b": '<a href="/c">c</a>',
+            }
+        )
+        sink = RecordingSink()
+        crawler = Webcrawler(
+            root, depth=0, concurrent=concurrent, max_workers=2, sink=sink
+        )
+        crawler.crawl()
+        assert [result.url for result in sink.results] == crawler.urls
+        by_url = {result.url: result for result in sink.results}
+        assert by_url[f"{root}/b"].source == f"{root}/a"
+        assert by_url[f"{root}/b"].depth == 1
+        assert by_url[f"{root}/c"].depth == 2
+        assert by_url[f"{root}/c"].status == 200
@@ -0,0 +1,198 @@
+"""Unit tests for sitemap discovery and parsing."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import threading
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.frontier import by_priority
+from src.linkfetcher import USER_AGENTS
+from src.sitemap import SitemapEntry, SitemapReader, parse_sitemap
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+URLSET = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://example.com/a</loc><lastmod>2025-01-02</lastmod>
+    <priority>0.9</priority></url>
+  <url><loc> https://example.com/b </loc><priority>bogus</priority></url>
+  <url><lastmod>2025-01-02</lastmod></url>
+</urlset>
+"""
+
+
+def sitemap_index(*locs: str) -> str:
+    """Build a sitemap index document."""
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<sitemapindex {NS}>{entries}</sitemapindex>'
+
+
+def urlset(*locs: str) -> str:
+    """Build a urlset document."""
+    entries = "".join(f"<url><loc>{loc}</loc></url>" for loc in locs)
+    return f"<urlset {NS}>{entries}</urlset>"
+
+
+class TestParseSitemap:
+    """Tests for parse_sitemap."""
+
+    def test_parses_urlset(self) -> None:
+        """Test that url entries are parsed with their hints."""
+        entries = list(parse_sitemap(io.BytesIO(URLSET.encode()), "sm.xml"))
+        assert entries == [
+            SitemapEntry("https://example.com/a", "2025-01-02", 0.9, "sm.xml"),
+            SitemapEntry("https://example.com/b", None, None, "sm.xml"),
+        ]
+
+    def test_parses_index(self) -> None:
+        """Test that a sitemap index yields nested sitemap locations."""
+        document = sitemap_index("https://example.com/s1.xml", "https://example.com/s2.xml")
+        assert list(parse_sitemap(io.BytesIO(document.encode()))) == [
+            "https://example.com/s1.xml",
+            "https://example.com/s2.xml",
+        ]
+
+    def test_ignores_extension_locs(self) -> None:
+        """Test that image and video locations do not replace the page location."""
+        document = f"""<urlset {NS}
+            xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"
+            xmlns:video="http://www.google.com/schemas/sitemap-video/1.1">
+          <url><loc>https://ex.com/page</loc>
+            <image:image><image:loc>https://ex.com/pic.jpg</image:loc></image:image>
+            <video:video><video:content_loc>https://ex.com/v.mp4</video:content_loc>
+              <video:player_loc>https://ex.com/player</video:player_loc>
+              <video:loc>https://ex.com/v</video:loc></video:video>
+          </url>
+        </urlset>"""
+        entries = list(parse_sitemap(io.BytesIO(document.encode())))
+        assert entries == [SitemapEntry("https://ex.com/page")]
+
+    def test_no_namespace(self) -> None:
+        """Test that documents without a namespace are parsed."""
+        document = b"<urlset><url><loc>https://ex.com/a</loc></url></urlset>"
+        assert list(parse_sitemap(io.BytesIO(document))) == [SitemapEntry("https://ex.com/a")]
+
+    def test_parses_gzip(self) -> None:
+        """Test that gzipped documents are detected and decompressed."""
+        stream = io.BytesIO(gzip.compress(URLSET.encode()))
+        assert len(list(parse_sitemap(stream))) == 2
+
+    def test_streams_large_sitemap(self) -> None:
+        """Test that parsed elements are released as parsing proceeds."""
+        document = urlset(*(f"https://example.com/{i}" for i in range(5000)))
+        parser = parse_sitemap(io.BytesIO(document.encode()))
+        first = next(parser)
+        assert first.loc == "https://example.com/0"  # type: ignore[union-attr]
+        assert sum(1 for _ in parser) == 4999
+
+    def test_malformed_raises(self) -> None:
+        """Test that malformed XML raises a parse error."""
+        with pytest.raises(ET.ParseError):
+            list(parse_sitemap(io.BytesIO(b"<urlset><url>")))
+
+
+class TestSitemapReader:
+    """Tests for sitemap discovery and index expansion."""
+
+    def test_discovers_from_robots(self, local_site: Callable[..., str]) -> None:
+        """Test that robots.txt Sitemap lines are honoured."""
+        root = local_site(
+            {"/robots.txt": "User-agent: *\nSitemap: /maps/index.xml\nsitemap: /other.xml\n"}
+        )
+        reader = SitemapReader(USER_AGENTS["chromium"])
+        assert reader.discover(root) == [f"{root}/maps/index.xml", f"{root}/other.xml"]
+
+    def test_falls_back_to_sitemap_xml(self, local_site: Callable[..., str]) -> None:
+        """Test the /sitemap.xml fallback when robots.txt lists none."""
+        root = local_site({})
+        reader = SitemapReader(USER_AGENTS["chromium"])
+        assert reader.discover(root) == [f"{root}/sitemap.xml"]
+
+    def test_expands_index_once(self, local_site: Callable[..., str]) -> None:
+        """Test that indexes are expanded and each sitemap is read once."""
+        pages: dict[str, str] = {}
+        root = local_site(pages)
+        pages["/sitemap.xml"] = sitemap_index(f"{root}/s1.xml", f"{root}/s2.xml")
+        pages["/s1.xml"] = urlset(f"{root}/a", f"{root}/b")
+        pages["/s2.xml"] = sitemap_index(f"{root}/sitemap.xml", f"{root}/s3.xml")
+        pages["/s3.xml"] = urlset(f"{root}/c")
+        reader = SitemapReader(USER_AGENTS["chromium"])
+        locs = [entry.loc for entry in reader.entries(root)]
+        assert locs == [f"{root}/a", f"{root}/b", f"{root}/c"]
+
+    def test_max_urls(self, local_site: Callable[..., str]) -> None:
+        """Test that reading stops after max_urls entries."""
+        pages: dict[str, str] = {}
+        root = local_site(pages)
+        pages["/sitemap.xml"] = urlset(*(f"{root}/{i}" for i in range(10)))
+        reader = SitemapReader(USER_AGENTS["chromium"], max_urls=3)
+        assert len(list(reader.entries(root))) == 3
+
+
+class TestWebcrawlerSitemaps:
+    """Tests for seeding the crawl from sitemaps."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_sitemap_seeds_deep_pages(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that pages only listed in the sitemap are crawled."""
+        pages: dict[str, str] = {"/": "no links", "/deep": '<a href="/deeper">x</a>'}
+        root = local_site(pages)
+        pages["/sitemap.xml"] = urlset(f"{root}/deep")
+        crawler = Webcrawler(
+            root,
+            depth=0,
+            concurrent=concurrent,
+            max_workers=2,
+            sitemaps=True,
+            scorer=by_priority,
+        )
+        crawler.crawl()
+        assert f"{root}/deep" in crawler.urls
+        assert f"{root}/deeper" in crawler.urls
+        assert crawler.followed >= 1
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_sitemap_hints_rescore_root_links(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that sitemap hints apply to links already found on the root page."""
+        fetched: list[str] = []
+        lock = threading.Lock()
+        pages: dict[str, str] = {
+            "/": '<a href="/a">a</a><a href="/b">b</a><a href="/c">c</a>',
+            "/a": "a",
+            "/b": "b",
+            "/c": "c",
+        }
+
+        def page(path: str) -> str | None:
+            with lock:
+                fetched.append(path)
+            return pages.get(path)
+
+        root = local_site(page)
+        pages["/sitemap.xml"] = (
+            f'<urlset {NS}><url><loc>{root}/c</loc><priority>1.0</priority></url>'
+            "</urlset>"
+        )
+        crawler = Webcrawler(
+            root,
+            depth=0,
+            concurrent=concurrent,
+            max_workers=1,
+            sitemaps=True,
+            scorer=by_priority,
+        )
+        crawler.crawl()
+        assert next(path for path in fetched if path in ("/a", "/b", "/c")) == "/c"
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import itertools
 import threading
 import time
+from typing import TYPE_CHECKING
 
 import pytest
 
@@ -11,12 +13,17 @@ from src.threading_utils import (
     ThreadSafeCounter,
     ThreadSafeList,
     ThreadSafeSet,
+    WorkerPool,
     get_optimal_worker_count,
     get_python_build_info,
     is_gil_disabled,
     parallel_map,
+    shared_pool,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 
 class TestIsGilDisabled:
     """Tests for is_gil_disabled function."""
@@ -285,6 +292,121 @@ class TestParallelMap:
         assert result[0] == 0
         assert result[9] == 18
 
+    def test_logs_swallowed_exceptions(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that failures turned into None are logged."""
+        def fail(x: int) -> int:
+            raise ValueError(f"bad {x}")
+
+        assert parallel_map(fail, [7]) == [None]
+        assert "ValueError('bad 7')" in caplog.text
+
+    def test_return_exceptions(self) -> None:
+        """Test that failed items can be returned as their exceptions."""
+        def maybe_fail(x: int) -> int:
+            if x == 1:
+                raise ValueError("Test error")
+            return x
+
+        result = parallel_map(maybe_fail, [0, 1, 2], return_exceptions=True)
+        assert result[0] == 0
+        assert isinstance(result[1], ValueError)
+        assert result[2] == 2
+
+    def test_reuses_shared_pool(self) -> None:
+        """Test that repeated calls do not start new threads."""
+        parallel_map(lambda x: x, list(range(50)), max_workers=8)
+        before = threading.active_count()
+        for _ in range(20):
+            parallel_map(lambda x: x, list(range(50)), max_workers=8)
+        assert threading.active_count() == before
+
+    def test_max_workers_bounds_concurrency(self) -> None:
+        """Test that at most max_workers items run at once."""
+        running = ThreadSafeCounter()
+        peak = ThreadSafeList[int]()
+
+        def track(x: int) -> int:
+            peak.append(running.increment())
+            time.sleep(0.005)
+            running.decrement()
+            return x
+
+        parallel_map(track, list(range(30)), max_workers=3)
+        assert max(peak.to_list()) <= 3
+
+
+class TestWorkerPool:
+    """Tests for WorkerPool."""
+
+    def test_imap_ordered(self) -> None:
+        """Test that ordered results follow the input order."""
+        with WorkerPool(4) as pool:
+            def slow_for_small(x: int) -> int:
+                time.sleep(0.001 * (10 - x))
+                return x * 2
+
+            assert list(pool.imap(slow_for_small, range(10))) == [x * 2 for x in range(10)]
+
+    def test_imap_unordered(self) -> None:
+        """Test that unordered results arrive as they complete."""
+        with WorkerPool(4) as pool:
+            def slow_first(x: int) -> int:
+                time.sleep(0.05 if x == 0 else 0)
+                return x
+
+            results = list(pool.imap(slow_first, range(8), ordered=False))
+        assert sorted(results) == list(range(8))
+        assert results[-1] == 0
+
+    def test_chunking(self) -> None:
+        """Test that chunked maps return every result in order."""
+        with WorkerPool(2) as pool:
+            assert pool.map(abs, range(-50, 0), chunksize=7) == list(range(50, 0, -1))
+
+    def test_bounded_in_flight_with_lazy_input(self) -> None:
+        """Test that input is consumed only as results are taken."""
+        consumed = itertools.count()
+
+        def items() -> Iterator[int]:
+            for item in range(1000):
+                next(consumed)
+                yield item
+
+        with WorkerPool(2) as pool:
+            results = pool.imap(lambda x: x, items(), max_in_flight=4)
+            assert next(results) == 0
+            assert next(consumed) <= 6
+            results.close()
+
+    def test_errors_propagate(self) -> None:
+        """Test that the first failure is raised by default."""
+        def fail_on_three(x: int) -> int:
+            if x == 3:
+                raise ValueError("three")
+            return x
+
+        with WorkerPool(2) as pool:
+            with pytest.raises(ValueError, match="three"):
+                pool.map(fail_on_three, range(10))
+            results = pool.map(fail_on_three, range(5), return_exceptions=True)
+        assert results[:3] == [0, 1, 2]
+        assert isinstance(results[3], ValueError)
+
+    def test_timeout(self) -> None:
+        """Test that the whole map is bounded by the timeout."""
+        with WorkerPool(2) as pool, pytest.raises(TimeoutError):
+            pool.map(time.sleep, [0.5, 0.5], timeout=0.05)
+
+    def test_nested_map_runs_inline(self) -> None:
+        """Test that mapping from a worker does not deadlock the pool."""
+        with WorkerPool(1) as pool:
+            nested = pool.submit(pool.map, abs, [-1, -2])
+            assert nested.result(timeout=5) == [1, 2]
+
+    def test_shared_pool_is_reused(self) -> None:
+        """Test that the shared pool is a singleton."""
+        assert shared_pool() is shared_pool()
+
 
 class TestGetOptimalWorkerCount:
     """Tests for get_optimal_worker_count function."""
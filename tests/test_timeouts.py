@@ -0,0 +1,150 @@
+"""Unit tests for fetch timeouts and deadlines."""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.timeouts import Deadline, DeadlineExceeded, TimeoutPolicy, Timeouts
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+HEADERS = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 1000\r\n\r\n"
+)
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def slow_server() -> Iterator[Callable[[float], str]]:
+    """Serve responses that trickle out one body byte per ``interval``."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    stop = threading.Event()
+
+    def serve(interval: float) -> None:
+        while not stop.is_set():
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            with conn:
+                conn.recv(65536)
+                try:
+                    conn.sendall(HEADERS)
+                    while not stop.wait(interval):
+                        conn.sendall(b" ")
+                except OSError:
+                    continue
+
+    def start(interval: float) -> str:
+        threading.Thread(target=serve, args=(interval,), daemon=True).start()
+        return f"http://127.0.0.1:{listener.getsockname()[1]}/"
+
+    yield start
+
+    stop.set()
+    listener.close()
+
+
+class TestDeadline:
+    """Tests for Deadline."""
+
+    def test_remaining_and_expiry(self) -> None:
+        """Test that a deadline expires after its time has passed."""
+        clock = FakeClock()
+        deadline = Deadline(5, clock)
+        assert deadline.remaining() == 5
+        assert not deadline.expired()
+        clock.now = 5
+        assert deadline.remaining() == 0
+        assert deadline.expired()
+        with pytest.raises(DeadlineExceeded):
+            deadline.check()
+
+    def test_no_deadline(self) -> None:
+        """Test that a None deadline never expires."""
+        deadline = Deadline(None)
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        deadline.check()
+
+
+class TestTimeouts:
+    """Tests for Timeouts and TimeoutPolicy."""
+
+    def test_bounded_caps_every_timeout(self) -> None:
+        """Test that timeouts are capped by the remaining time."""
+        timeouts = Timeouts(connect=10, read=None, total=60)
+        assert timeouts.bounded(None) is timeouts
+        assert timeouts.bounded(20) == Timeouts(10, 20, 20)
+        assert timeouts.bounded(0).total == 0.001
+
+    def test_policy_per_host(self) -> None:
+        """Test that host overrides take precedence over the default."""
+        slow = Timeouts(total=300)
+        policy = TimeoutPolicy(hosts={"slow.example.com": slow})
+        assert policy.for_host("slow.example.com") is slow
+        assert policy.for_host("example.com") == Timeouts()
+
+
+class TestLinkfetcherTimeouts:
+    """Tests for timeouts of a single fetch."""
+
+    def test_read_timeout(self, slow_server: Callable[[float], str]) -> None:
+        """Test that a stalled response body trips the read timeout."""
+        url = slow_server(10.0)
+        fetcher = Linkfetcher(url, timeouts=Timeouts(connect=1, read=0.2, total=None))
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            fetcher.linkfetch()
+        assert time.monotonic() - start < 2
+        assert isinstance(fetcher.error, TimeoutError)
+
+    def test_total_deadline(self, slow_server: Callable[[float], str]) -> None:
+        """Test that a trickling response trips the total deadline."""
+        url = slow_server(0.05)
+        fetcher = Linkfetcher(url, timeouts=Timeouts(connect=1, read=1, total=0.3))
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            fetcher.linkfetch()
+        assert time.monotonic() - start < 2
+
+
+class TestWebcrawlerBudget:
+    """Tests for the crawl wall-clock budget."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_budget_stops_crawl(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that a crawl stops scheduling once its budget is spent."""
+
+        def pages(path: str) -> str:
+            time.sleep(0.05)
+            n = int(path.strip("/") or 0)
+            return f'<a href="/{n + 1}">next</a><a href="/{n + 2}">skip</a>'
+
+        root = local_site(pages)
+        crawler = Webcrawler(
+            root, depth=0, concurrent=concurrent, max_workers=2, budget=0.5
+        )
+        start = time.monotonic()
+        crawler.crawl()
+        assert time.monotonic() - start < 3
+        assert crawler.followed > 0
@@ -0,0 +1,166 @@
+"""Unit tests for the crawler trap detector."""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.traps import TrapDetector
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestTrapDetectorShape:
+    """Tests for URL structure checks."""
+
+    def test_admits_normal_url(self) -> None:
+        """Test that an ordinary URL is admitted."""
+        detector = TrapDetector()
+        assert detector.check("https://example.com/blog/post?page=2") is None
+
+    def test_rejects_deep_path(self) -> None:
+        """Test that paths deeper than the limit are rejected."""
+        detector = TrapDetector(max_path_depth=3)
+        assert detector.check("https://example.com/a/b/c") is None
+        assert detector.check("https://example.com/a/b/c/d") == "path_depth"
+
+    def test_rejects_repeated_segments(self) -> None:
+        """Test that a looping path segment is rejected."""
+        detector = TrapDetector(max_repeated_segments=2)
+        assert detector.check("https://example.com/a/b/a/b") is None
+        assert detector.check("https://example.com/a/b/a/b/a") == "repeated_segment"
+
+    def test_rejects_too_many_query_params(self) -> None:
+        """Test that URLs with too many query parameters are rejected."""
+        detector = TrapDetector(max_query_params=2)
+        assert detector.check("https://example.com/?a=1&b=2") is None
+        assert detector.check("https://example.com/?a=1&b=2&c=3") == "query_params"
+
+
+class TestTrapDetectorHostStats:
+    """Tests for per-host budgets."""
+
+    def test_host_budget(self) -> None:
+        """Test that a host stops admitting URLs once its budget is spent."""
+        detector = TrapDetector(max_urls_per_host=2)
+        assert detector.allow("https://example.com/1")
+        assert detector.allow("https://example.com/2")
+        assert not detector.allow("https://example.com/3")
+        assert detector.allow("https://other.com/1")
+        assert detector.host_count("example.com") == 2
+
+    def test_query_explosion(self) -> None:
+        """Test that one path with many query variants is rejected."""
+        detector = TrapDetector(max_query_variants=3)
+        for session in range(3):
+            assert detector.allow(f"https://example.com/page?sid={session}")
+        assert detector.check("https://example.com/page?sid=99") == "query_explosion"
+        assert detector.allow("https://example.com/other?sid=99")
+
+    def test_repeated_query_is_not_a_variant(self) -> None:
+        """Test that admitting the same query string again adds no variant."""
+        detector = TrapDetector(max_query_variants=2)
+        for _ in range(5):
+            assert detector.allow("https://example.com/page?p=1")
+        assert detector.allow("https://example.com/page?p=2")
+        assert detector.allow("https://example.com/page?p=1")
+        assert detector.check("https://example.com/page?p=3") == "query_explosion"
+
+    def test_state_is_private(self) -> None:
+        """Test that internal state is neither a parameter nor compared."""
+        detector = TrapDetector()
+        with pytest.raises(TypeError):
+            TrapDetector(_lock=detector._lock)  # type: ignore[call-arg]
+        detector.allow("https://example.com/")
+        assert detector == TrapDetector()
+        assert "_hosts" not in repr(detector)
+
+    def test_rejected_counts_reasons(self) -> None:
+        """Test that rejections are tallied by reason."""
+        detector = TrapDetector(max_path_depth=1)
+        detector.allow("https://example.com/a/b")
+        detector.allow("https://example.com/a/b/c")
+        assert detector.rejected == {"path_depth": 2}
+
+    def test_concurrent_budget_is_exact(self) -> None:
+        """Test that the host budget holds under concurrent admission."""
+        detector = TrapDetector(max_urls_per_host=100)
+        admitted: list[bool] = []
+        lock = threading.Lock()
+
+        def worker(offset: int) -> None:
+            for i in range(50):
+                result = detector.allow(f"https://example.com/{offset}/{i}")
+                with lock:
+                    admitted.append(result)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert admitted.count(True) == 100
+
+
+class TestWebcrawlerTraps:
+    """Tests for trap detection on the crawl frontier."""
+
+    @staticmethod
+    def _calendar(path: str) -> str:
+        """Generate an infinite calendar where every page links to the next."""
+        match = re.fullmatch(r"/cal/(\d+)", path)
+        day = int(match.group(1)) if match else 0
+        return f'<a href="/cal/{day + 1}">next</a><a href="/cal/{day + 2}">skip</a>'
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_calendar_trap_is_bounded(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that the host budget bounds an infinite calendar crawl."""
+        root = local_site(self._calendar)
+        detector = TrapDetector(max_urls_per_host=5)
+        crawler = Webcrawler(
+            root, depth=0, concurrent=concurrent, max_workers=2, trap_detector=detector
+        )
+        crawler.crawl()
+        assert len(crawler.urls) <= 5
+        assert detector.rejected.get("host_budget", 0) > 0
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_root_links_are_checked(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that links found on the root page count toward the host budget."""
+        fetched: list[str] = []
+        lock = threading.Lock()
+
+        def page(path: str) -> str:
+            with lock:
+                fetched.append(path)
+            if path == "/":
+                return "".join(f'<a href="/p{i}">{i}</a>' for i in range(10))
+            return "leaf"
+
+        root = local_site(page)
+        detector = TrapDetector(max_urls_per_host=3)
+        crawler = Webcrawler(
+            root, depth=0, concurrent=concurrent, max_workers=2, trap_detector=detector
+        )
+        crawler.crawl()
+        assert sorted(fetched) == ["/", "/p0", "/p1", "/p2"]
+        assert detector.rejected["host_budget"] == 7
+
+    def test_root_links_are_counted_once(self, local_site: Callable[..., str]) -> None:
+        """Test that root links found again on other pages are not counted twice."""
+        links = "".join(f'<a href="/p{i}">{i}</a>' for i in range(3))
+        root = local_site({"/": links, **{f"/p{i}": links for i in range(3)}})
+        detector = TrapDetector(max_urls_per_host=3)
+        crawler = Webcrawler(root, depth=0, trap_detector=detector)
+        crawler.crawl()
+        assert crawler.urls == [f"{root}/p{i}" for i in range(3)]
+        assert detector.rejected == {}
@@ -0,0 +1,146 @@
+"""Unit tests for the interned URL table."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.linkfetcher import Linkfetcher
+from src.urltable import IDSet, URLTable
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TestURLTable:
+    """Tests for URLTable."""
+
+    def test_intern_assigns_sequential_ids(self) -> None:
+        """Test that new URLs receive dense sequential IDs."""
+        table = URLTable()
+        assert table.intern("https://example.com/a") == 0
+        assert table.intern("https://example.com/b") == 1
+        assert len(table) == 2
+
+    def test_intern_is_idempotent(self) -> None:
+        """Test that interning the same URL returns the same ID."""
+        table = URLTable()
+        first = table.intern("https://example.com/a")
+        assert table.intern("https://example.com/a") == first
+        assert table.intern_new("https://example.com/a") == (first, False)
+        assert len(table) == 1
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://example.com",
+            "https://example.com/",
+            "https://example.com/path?q=1#frag",
+            "mailto:someone@example.com",
+            "/relative/path",
+            "https://example.com/café",
+        ],
+    )
+    def test_round_trip(self, url: str) -> None:
+        """Test that URLs are materialized unchanged."""
+        table = URLTable()
+        assert table[table.intern(url)] == url
+
+    def test_host_prefix_is_shared(self) -> None:
+        """Test that URLs on the same host share one prefix entry."""
+        table = URLTable()
+        a = table.intern("https://example.com/a")
+        b = table.intern("https://example.com/b")
+        c = table.intern("https://other.com/a")
+        assert table.host_id(a) == table.host_id(b) != table.host_id(c)
+
+    def test_get_does_not_intern(self) -> None:
+        """Test that get() does not add unknown URLs."""
+        table = URLTable()
+        assert table.get("https://example.com") is None
+        assert "https://example.com" not in table
+        assert len(table) == 0
+
+    def test_invalid_id_raises(self) -> None:
+        """Test that unknown IDs raise IndexError."""
+        with pytest.raises(IndexError):
+            _ = URLTable()[0]
+
+    def test_hash_collision_is_resolved(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that distinct URLs with the same hash get distinct IDs."""
+        monkeypatch.setattr("src.urltable.hash", lambda _: 42, raising=False)
+        table = URLTable()
+        a = table.intern("https://example.com/a")
+        b = table.intern("https://example.com/b")
+        assert a != b
+        assert table.get("https://example.com/b") == b
+        assert table[b] == "https://example.com/b"
+
+    def test_concurrent_intern(self) -> None:
+        """Test that concurrent interning assigns one ID per URL."""
+        table = URLTable()
+        urls = [f"https://example.com/{i}" for i in range(200)]
+        results: list[list[int]] = []
+
+        def worker() -> None:
+            results.append([table.intern(url) for url in urls])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(table) == 200
+        assert all(ids == results[0] for ids in results)
+
+
+class TestIDSet:
+    """Tests for IDSet."""
+
+    def test_add_and_contains(self) -> None:
+        """Test adding IDs and membership checks."""
+        ids = IDSet()
+        assert ids.add(3)
+        assert not ids.add(3)
+        assert ids.add(1000)
+        assert 3 in ids
+        assert 1000 in ids
+        assert 4 not in ids
+        assert -1 not in ids
+        assert len(ids) == 2
+
+
+class TestSharedURLTable:
+    """Tests for URL table sharing between fetchers and the crawler."""
+
+    def test_linkfetchers_share_table(self) -> None:
+        """Test that fetchers sharing a table store each URL once."""
+        table = URLTable()
+        first = Linkfetcher("https://example.com", url_table=table)
+        second = Linkfetcher("https://example.com/other", url_table=table)
+        first.urls = ["https://example.com/a", "https://example.com/b"]
+        second.urls = ["https://example.com/b"]
+        assert len(table) == 2
+        assert second.ids[0] == first.ids[1]
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_crawl_urls_are_unique(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that crawled URLs are materialized once each from the table."""
+        root = local_site(
+            {
+                "/": '<a href="/a">a</a><a href="/b">b</a>',
+                "/a": '<a href="/b">b</a><a href="/">home</a>',
+                "/b": '<a href="/a">a</a>',
+            }
+        )
+        crawler = Webcrawler(root, depth=0, concurrent=concurrent, max_workers=2)
+        crawler.crawl()
+        assert crawler.urls
+        assert len(crawler.urls) == len(set(crawler.urls))
+        assert set(crawler.urls) <= {f"{root}/", f"{root}/a", f"{root}/b"}
+        assert crawler.links == len(crawler.url_ids)
@@ -0,0 +1,154 @@
+"""Unit tests for the WARC writer."""
+
+from __future__ import annotations
+
+import threading
+import zlib
+from typing import TYPE_CHECKING
+
+import pytest
+
+from src.warc import WarcWriter, warc_record
+from src.webcrawler import Webcrawler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+
+def read_members(path: Path) -> list[bytes]:
+    """Decompress each gzip member of a file separately."""
+    data = path.read_bytes()
+    members = []
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        members.append(decompressor.decompress(data))
+        assert decompressor.eof
+        data = decompressor.unused_data
+    return members
+
+
+def parse_record(record: bytes) -> tuple[dict[str, str], bytes]:
+    """Split a WARC record into its header fields and block."""
+    head, _, rest = record.partition(b"\r\n\r\n")
+    version, *lines = head.decode("utf-8").split("\r\n")
+    assert version == "WARC/1.1"
+    fields = dict(line.split(": ", 1) for line in lines)
+    length = int(fields["Content-Length"])
+    assert rest[length:] == b"\r\n\r\n"
+    return fields, rest[:length]
+
+
+def responses(warc: WarcWriter) -> list[tuple[dict[str, str], bytes]]:
+    """Return the response records of every file written."""
+    records = [
+        parse_record(member) for path in warc.files for member in read_members(path)
+    ]
+    return [record for record in records if record[0]["WARC-Type"] == "response"]
+
+
+class TestWarcRecord:
+    """Tests for warc_record."""
+
+    def test_fields(self) -> None:
+        """Test the mandatory header fields and block framing."""
+        record = warc_record("resource", "text/plain", b"hello", 0.0, [("X-A", "b")])
+        fields, block = parse_record(record)
+        assert block == b"hello"
+        assert fields["WARC-Type"] == "resource"
+        assert fields["WARC-Date"] == "1970-01-01T00:00:00Z"
+        assert fields["WARC-Record-ID"].startswith("<urn:uuid:")
+        assert fields["X-A"] == "b"
+        assert fields["WARC-Block-Digest"].startswith("sha1:")
+
+
+class TestWarcWriter:
+    """Tests for WarcWriter."""
+
+    def test_response_record(self, tmp_path: Path) -> None:
+        """Test that a response is archived with its HTTP header and body."""
+        headers = [("Content-Type", "text/html"), ("Transfer-Encoding", "chunked")]
+        with WarcWriter(tmp_path) as warc:
+            warc.write_response("http://a/", 200, "OK", headers, b"<html>")
+        assert warc.records == 1
+        assert len(warc.files) == 1
+        members = read_members(warc.files[0])
+        info, _ = parse_record(members[0])
+        assert info["WARC-Type"] == "warcinfo"
+        assert info["WARC-Filename"] == warc.files[0].name
+        ((fields, block),) = responses(warc)
+        assert fields["WARC-Target-URI"] == "http://a/"
+        assert fields["Content-Type"] == "application/http;msgtype=response"
+        assert block == (
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n<html>"
+        )
+
+    def test_rotation(self, tmp_path: Path) -> None:
+        """Test that files are rotated once they reach the size limit."""
+        with WarcWriter(tmp_path, max_file_size=1) as warc:
+            for index in range(3):
+                warc.write_response(f"http://a/{index}", 200, "OK", [], b"x")
+        assert len(warc.files) == 3
+        assert all(path.name.endswith(".warc.gz") for path in warc.files)
+        uris = [fields["WARC-Target-URI"] for fields, _ in responses(warc)]
+        assert uris == ["http://a/0", "http://a/1", "http://a/2"]
+
+    def test_closed(self, tmp_path: Path) -> None:
+        """Test that writing to a closed writer fails."""
+        warc = WarcWriter(tmp_path)
+        warc.close()
+        warc.close()
+        assert warc.files == []
+        with pytest.raises(RuntimeError):
+            warc.write_response("http://a/", 200, "OK", [], b"")
+
+    def test_invalid_compresslevel(self, tmp_path: Path) -> None:
+        """Test that an invalid compression level is rejected up front."""
+        with pytest.raises(ValueError, match="compresslevel"):
+            WarcWriter(tmp_path, compresslevel=10)
+
+    def test_unexpected_error_keeps_draining(self, tmp_path: Path) -> None:
+        """Test that a failing record disables output without blocking writers."""
+        warc = WarcWriter(tmp_path, queue_size=1)
+
+        def write() -> None:
+            for _ in range(5):
+                # A malformed header makes serialization fail on the writer thread
+                warc.write_response("http://a/", 200, "OK", [("X",)], b"")  # type: ignore[list-item]
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(timeout=10)
+        assert not writer.is_alive()
+        warc.close()
+        assert isinstance(warc.error, ValueError)
+        assert warc.records == 0
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_crawl(
+        self, local_site: Callable[..., str], tmp_path: Path, concurrent: bool
+    ) -> None:
+        """Test that every page read during a crawl is archived once."""
+        base = local_site(
+            {
+                "/": '<a href="/a">a</a><a href="/missing">m</a>',
+                "/a": '<a href="/b">b</a>',
+                "/b": "leaf",
+            }
+        )
+        with WarcWriter(tmp_path, queue_size=1) as warc:
+            Webcrawler(base + "/", 0, concurrent=concurrent, warc=warc).crawl()
+        archived = {fields["WARC-Target-URI"]: block for fields, block in responses(warc)}
+        assert sorted(archived) == [base + "/", base + "/a", base + "/b"]
+        assert archived[base + "/b"].startswith(b"HTTP/1.1 200 ")
+        assert archived[base + "/b"].endswith(b"\r\n\r\nleaf")
+
+    def test_crawl_redirects(self, local_site: Callable[..., str], tmp_path: Path) -> None:
+        """Test that redirects the crawler does not follow are archived."""
+        base = local_site({"/": '<a href="/old">old</a>', "/old": (301, "/new"), "/new": "x"})
+        with WarcWriter(tmp_path) as warc:
+            Webcrawler(base + "/", 0, warc=warc).crawl()
+        archived = {fields["WARC-Target-URI"]: block for fields, block in responses(warc)}
+        assert sorted(archived) == [base + "/", base + "/new", base + "/old"]
+        assert archived[base + "/old"].startswith(b"HTTP/1.1 301 ")
+        assert b"\r\nLocation: /new\r\n" in archived[base + "/old"]
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
+from contextlib import aclosing
 from typing import TYPE_CHECKING
 
 import pytest
 
-from src.webcrawler import Webcrawler
+from src.webcrawler import PageResult, Webcrawler
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from src.linkfetcher import BrowserType
 
 
@@ -150,3 +155,77 @@ class TestWebcrawlerRealCrawl:
         crawler.crawl()
         # links counter should equal length of urls
         assert crawler.links == len(crawler.urls)
+
+
+SITE = {
+    "/": '<a href="/a">a</a><a href="/b">b</a>',
+    "/a": '<a href="/c">c</a>',
+    "/b": (404, "gone"),
+    "/c": "leaf",
+}
+
+
+class TestIterCrawl:
+    """Tests for the streaming crawl API."""
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_yields_each_page(
+        self, local_site: Callable[..., str], concurrent: bool
+    ) -> None:
+        """Test that every fetched page is yielded with its outcome."""
+        base = local_site(SITE)
+        crawler = Webcrawler(base + "/", 0, concurrent=concurrent)
+        pages = list(crawler.iter_crawl())
+        assert pages[0].url == base + "/"
+        assert pages[0].depth == 0
+        assert pages[0].links == [base + "/a", base + "/b"]
+        by_url = {page.url: page for page in pages}
+        assert set(by_url) == {base + p for p in SITE}
+        assert by_url[base + "/a"].depth == 1
+        assert by_url[base + "/a"].links == [base + "/c"]
+        assert by_url[base + "/c"].depth == 2
+        assert by_url[base + "/b"].status == 404
+        assert not by_url[base + "/b"].ok
+        assert all(page.timings.total > 0 for page in pages)
+        assert crawler.urls == [base + "/c"]
+
+    def test_backpressure(self, local_site: Callable[..., str]) -> None:
+        """Test that no new fetches start while the consumer does not pull."""
+        requests: list[str] = []
+        lock = threading.Lock()
+
+        def page(path: str) -> str:
+            with lock:
+                requests.append(path)
+            n = int(path.strip("/") or 0)
+            return "".join(f'<a href="/{n * 10 + i}">x</a>' for i in range(1, 10))
+
+        base = local_site(page)
+        crawler = Webcrawler(base + "/", 0, concurrent=True, max_workers=2)
+        pages = crawler.iter_crawl()
+        assert isinstance(next(pages), PageResult)
+        next(pages)
+        threading.Event().wait(0.2)
+        paused = len(requests)
+        threading.Event().wait(0.2)
+        assert len(requests) == paused
+        # At most the root plus two batches of in-flight fetches
+        assert paused <= 1 + 2 * 4
+        pages.close()
+
+    def test_async_iteration(self, local_site: Callable[..., str]) -> None:
+        """Test that a crawler can be consumed with async for."""
+        base = local_site(SITE)
+        crawler = Webcrawler(base + "/", 0, concurrent=True)
+
+        async def consume() -> list[PageResult]:
+            pages = []
+            async with aclosing(aiter(crawler)) as results:
+                async for page in results:
+                    pages.append(page)
+                    if len(pages) == 2:
+                        break
+            return pages
+
+        pages = asyncio.run(consume())
+        assert [page.depth for page in pages] == [0, 1]